@@ -1,10 +1,12 @@
 # -*- coding: utf-8 -*-
 
 import functools
+import math
 import os
 import re
 import tempfile
 import sys
+import time
 
 # 确保Python 2.7兼容的Unicode处理
 try:
@@ -14,6 +16,25 @@ except:
     pass
 
 from maya import cmds, mel
+import maya.api.OpenMaya as om
+import maya.api.OpenMayaAnim as oma
+
+# 世界空间采样写入的变换通道
+_TRANSFORM_CHANNELS = ['translateX', 'translateY', 'translateZ',
+                       'rotateX', 'rotateY', 'rotateZ',
+                       'scaleX', 'scaleY', 'scaleZ']
+
+# 直接导出时offsetParentMatrix必须等于单位矩阵
+_IDENTITY_MATRIX = [1.0, 0.0, 0.0, 0.0,
+                    0.0, 1.0, 0.0, 0.0,
+                    0.0, 0.0, 1.0, 0.0,
+                    0.0, 0.0, 0.0, 1.0]
+
+# 除可关键帧属性外，世界空间相机还需要复制的形状属性（胶片背、裁剪面等）
+_CAMERA_SHAPE_ATTRS = ['focalLength', 'horizontalFilmAperture', 'verticalFilmAperture',
+                       'horizontalFilmOffset', 'verticalFilmOffset', 'filmFit', 'lensSqueezeRatio',
+                       'nearClipPlane', 'farClipPlane', 'orthographic', 'orthographicWidth',
+                       'centerOfInterest']
 
 def _is_referenced(node):
     """检查节点是否是引用节点
@@ -122,7 +143,247 @@ def _fbx_export_selection(fbx, range_, add_border_keys=True):
     
     # 设置FBX导出选项
     cmds.file(fbx, force=True, options="v=0;", typ="FBX export", preserveReferences=True, exportSelected=True)
-    
+
+def _bake_world_space_duplicates(dups, constraints, range_):
+    """一次bakeResults烘焙所有副本相机，然后删除约束。
+
+    每次bakeResults都会在整个帧范围内计算一遍场景，多个相机合并烘焙时只计算一次。
+
+    Args:
+        dups (Camera list): setup_world_space_duplicate创建的副本相机
+        constraints (str list): 烘焙后需要删除的约束节点
+        range_ (tuple): start/end frames
+    """
+    _nodes = []
+    for _dup in dups:
+        _nodes.extend([_dup.tfm, _dup.shp])
+    print("烘焙 %d 个相机的动画，范围: %s - %s..." % (len(dups), range_[0], range_[1]))
+    cmds.bakeResults(_nodes, time=range_)
+
+    print("删除约束...")
+    _constraints = [_cons for _cons in constraints if cmds.objExists(_cons)]
+    if _constraints:
+        cmds.delete(_constraints)
+
+def _write_progress(fbx_directory, progress, message):
+    """写入导出进度文件，供导出界面读取。
+
+    Args:
+        fbx_directory (str): 输出目录路径
+        progress (int): 进度百分比
+        message (str): 进度信息
+    """
+    progress_file = os.path.join(fbx_directory, "export_progress.txt")
+    try:
+        with open(progress_file, 'w') as f:
+            # 确保message是str类型
+            if isinstance(message, unicode):
+                message = message.encode('utf-8')
+            f.write(str(int(progress)) + "\n" + message)
+        print("更新进度: %s%% - %s" % (progress, message))
+    except Exception as e:
+        print("更新进度文件时出错: %s" % str(e))
+
+def _frame_times(range_):
+    """返回帧范围内每一帧的时间（与bakeResults默认的sampleBy=1一致）。
+
+    Args:
+        range_ (tuple): start/end frames
+
+    Returns:
+        (float list): 帧列表，包含结束帧
+    """
+    _start, _end = float(range_[0]), float(range_[1])
+    _frames = [_start + _i for _i in range(int(math.floor(_end - _start)) + 1)]
+    if _frames and _frames[-1] < _end:
+        _frames.append(_end)
+    return _frames
+
+def _is_float_plug(plug):
+    """属性是否为可以写入动画曲线的浮点/单位类型（布尔、整数和枚举属性只复制静态值）。"""
+    _attr = plug.attribute()
+    if _attr.hasFn(om.MFn.kUnitAttribute):
+        return True
+    if _attr.hasFn(om.MFn.kNumericAttribute):
+        return om.MFnNumericAttribute(_attr).numericType() in (
+            om.MFnNumericData.kFloat, om.MFnNumericData.kDouble)
+    return False
+
+def _sample_world_space(cams, range_):
+    """通过API在时间上下文中逐帧读取相机的世界矩阵和形状属性，不修改场景。
+
+    所有相机在同一个帧循环中采样，每一帧只计算一次场景。
+
+    Args:
+        cams (Camera list): 需要采样的相机
+        range_ (tuple): start/end frames
+
+    Returns:
+        (tuple): (时间MTimeArray, {相机: 采样结果})，采样结果包含
+            rotate_order、transform {通道: MDoubleArray}、shape {属性: MDoubleArray}、static {属性: 值}；
+            无法采样的相机不在结果中
+    """
+    _unit = om.MTime.uiUnit()
+    _frames = _frame_times(range_)
+    _times = om.MTimeArray()
+    for _frame in _frames:
+        _times.append(om.MTime(_frame, _unit))
+
+    _targets = {}
+    for _cam in cams:
+        try:
+            _selection = om.MSelectionList()
+            _selection.add(_cam.tfm)
+            _selection.add(_cam.shp)
+            _dag_path = _selection.getDagPath(0)
+            _shape_fn = om.MFnDependencyNode(_selection.getDependNode(1))
+            _matrix_plug = om.MFnDependencyNode(_dag_path.node()).findPlug(
+                'worldMatrix', False).elementByLogicalIndex(_dag_path.instanceNumber())
+
+            _shape_plugs = []
+            _static = {}
+            _attrs = [_attr for _attr in cmds.listAttr(_cam.shp, keyable=True) or [] if '.' not in _attr]
+            _attrs += [_attr for _attr in _CAMERA_SHAPE_ATTRS if _attr not in _attrs]
+            for _attr in _attrs:
+                if not _shape_fn.hasAttribute(_attr):
+                    continue
+                _plug = _shape_fn.findPlug(_attr, False)
+                if _plug.isArray or _plug.isCompound:
+                    continue
+                # 只有被驱动的浮点属性需要逐帧采样，其余属性复制当前值
+                if _plug.isDestination and _is_float_plug(_plug):
+                    _shape_plugs.append((_attr, _plug))
+                else:
+                    _static[_attr] = cmds.getAttr('{}.{}'.format(_cam.shp, _attr))
+
+            _targets[_cam] = {
+                'matrix_plug': _matrix_plug,
+                'shape_plugs': _shape_plugs,
+                'rotate_order': cmds.getAttr('{}.rotateOrder'.format(_cam.tfm)),
+                'transform': dict((_chan, om.MDoubleArray()) for _chan in _TRANSFORM_CHANNELS),
+                'shape': dict((_attr, om.MDoubleArray()) for _attr, _ in _shape_plugs),
+                'static': _static,
+                'previous': None,
+            }
+        except Exception as e:
+            print("无法采样相机 %s: %s" % (_cam.tfm, str(e)))
+
+    # Maya 2018+使用makeCurrent切换上下文，旧版本把上下文传给每次读取
+    _make_current = hasattr(om.MDGContext, 'makeCurrent')
+    for _time in _times:
+        _context = om.MDGContext(_time)
+        _args = () if _make_current else (_context,)
+        _previous_context = _context.makeCurrent() if _make_current else None
+        try:
+            for _cam, _target in list(_targets.items()):
+                try:
+                    _matrix = om.MFnMatrixData(_target['matrix_plug'].asMObject(*_args)).matrix()
+                    _tm = om.MTransformationMatrix(_matrix)
+                    _translate = _tm.translation(om.MSpace.kWorld)
+                    _rotate = _tm.rotation().reorder(_target['rotate_order'])
+                    # 与上一帧的欧拉角保持连续，避免±180度跳变
+                    if _target['previous'] is not None:
+                        _rotate = _rotate.closestSolution(_target['previous'])
+                    _target['previous'] = _rotate
+                    _scale = _tm.scale(om.MSpace.kWorld)
+
+                    _values = (_translate.x, _translate.y, _translate.z,
+                               _rotate.x, _rotate.y, _rotate.z,
+                               _scale[0], _scale[1], _scale[2])
+                    for _chan, _value in zip(_TRANSFORM_CHANNELS, _values):
+                        _target['transform'][_chan].append(_value)
+                    for _attr, _plug in _target['shape_plugs']:
+                        _target['shape'][_attr].append(_plug.asDouble(*_args))
+                except Exception as e:
+                    print("采样相机 %s 失败: %s" % (_cam.tfm, str(e)))
+                    del _targets[_cam]
+        finally:
+            if _previous_context is not None:
+                _previous_context.makeCurrent()
+
+    return _times, _targets
+
+def _write_sampled_curves(node, channels, times):
+    """把采样值一次写入新建的动画曲线。
+
+    Args:
+        node (str): 节点名称
+        channels (dict): 属性 -> MDoubleArray
+        times (MTimeArray): 采样时间
+    """
+    _selection = om.MSelectionList()
+    _selection.add(node)
+    _node_fn = om.MFnDependencyNode(_selection.getDependNode(0))
+    for _attr, _values in channels.items():
+        _curve_fn = oma.MFnAnimCurve()
+        _curve_fn.create(_node_fn.findPlug(_attr, False))
+        _curve_fn.addKeys(times, _values)
+
+def _create_world_space_cameras(cams, range_, use_api_sampler=True):
+    """为相机创建带烘焙动画的世界空间相机。
+
+    优先通过API采样（不修改原相机，不需要约束）；无法采样的相机使用约束，
+    所有约束副本在一次bakeResults中烘焙。需要先把当前命名空间设置为:export_tmp。
+
+    Args:
+        cams (Camera list): 需要导出的相机
+        range_ (tuple): start/end frames
+        use_api_sampler (bool): 是否使用API采样
+
+    Returns:
+        (tuple): ({相机: 世界空间相机}, {相机: 使用的方法}, 失败的相机列表)
+    """
+    _dups = {}
+    _methods = {}
+    _failed = []
+    _pending = list(cams)
+
+    if use_api_sampler and _pending:
+        _start_time = time.time()
+        try:
+            _times, _samples = _sample_world_space(_pending, range_)
+        except Exception as e:
+            print("API采样失败，使用约束烘焙: %s" % str(e))
+            _times, _samples = None, {}
+        for _cam in list(_pending):
+            if _cam not in _samples:
+                continue
+            try:
+                _dups[_cam] = _cam.create_sampled_camera(_samples[_cam], _times)
+                _methods[_cam] = "API采样"
+                _pending.remove(_cam)
+                print("相机 %s 使用API采样" % _cam.tfm)
+            except Exception as e:
+                print("写入相机 %s 的采样动画失败，使用约束烘焙: %s" % (_cam.tfm, str(e)))
+        print("API采样 %d 个相机, 耗时 %.2f 秒" % (len(_dups), time.time() - _start_time))
+
+    _baked = []
+    _constraints = []
+    for _cam in _pending:
+        try:
+            _dup, _cons = _cam.setup_world_space_duplicate()
+            _baked.append((_cam, _dup))
+            _constraints.extend(_cons)
+        except Exception as e:
+            print("创建相机 %s 的世界空间副本失败: %s" % (_cam.tfm, str(e)))
+            _failed.append(_cam)
+
+    # 所有约束副本在一次bakeResults中烘焙，时间轴只计算一遍
+    if _baked:
+        try:
+            _bake_world_space_duplicates([_dup for _, _dup in _baked], _constraints, range_)
+            for _cam, _dup in _baked:
+                _dups[_cam] = _dup
+                _methods[_cam] = "约束烘焙"
+                print("相机 %s 使用约束烘焙" % _cam.tfm)
+        except Exception as e:
+            print("烘焙相机动画失败: %s" % str(e))
+            import traceback
+            print(traceback.format_exc())
+            _failed.extend(_cam for _cam, _ in _baked)
+
+    return _dups, _methods, _failed
+
 class _Exportable(object):
     """Base class for any exportable."""
 
@@ -210,158 +471,199 @@ class _Camera(_Exportable):
                 print("无法解锁属性 %s.%s: %s" % (node, attr, str(e)))
                 continue  # 忽略无法修改的属性
 
-    def export_fbx_in_world_space(
-        self, fbx, range_, add_border_keys=True, cleanup=True):
-        """Export fbx of this canera in world space.
+    def setup_world_space_duplicate(self):
+        """创建由本相机驱动的世界空间副本相机，尚未烘焙。
 
-        Args:
-            fbx (str): fbx path
-            range_ (tuple): start/end frames
-            add_border_keys (bool): add start/end frame keys
-            cleanup (bool): clean tmp nodes
+        需要先把当前命名空间设置为:export_tmp，副本相机创建在该命名空间中。
+
+        Returns:
+            (tuple): (副本相机, 需要在烘焙后删除的约束节点列表)
         """
+        # 检查相机是否为引用节点
+        is_ref_cam = _is_referenced(self.tfm) or _is_referenced(self.shp)
+        if is_ref_cam:
+            print("检测到引用相机，需要特殊处理")
+        
+        # 解锁相机和其形状节点的所有属性
+        print("解锁相机属性...")
+        self._unlock_attributes(self.tfm)
+        self._unlock_attributes(self.shp)
+        
+        # 特别处理center of interest
         try:
-            print("开始导出相机 %s 到 %s" % (self.name, fbx))
-            
-            # 检查相机是否为引用节点
-            is_ref_cam = _is_referenced(self.tfm) or _is_referenced(self.shp)
-            if is_ref_cam:
-                print("检测到引用相机，需要特殊处理")
-            
-            print("设置临时命名空间...")
-            _set_namespace(':export_tmp', clean=True)
-            
-            # 解锁相机和其形状节点的所有属性
-            print("解锁相机属性...")
-            self._unlock_attributes(self.tfm)
-            self._unlock_attributes(self.shp)
-            
-            # 特别处理center of interest
-            try:
-                print("处理centerOfInterest属性...")
-                if cmds.getAttr('{}.centerOfInterest'.format(self.shp), lock=True):
-                    cmds.setAttr('{}.centerOfInterest'.format(self.shp), lock=False)
-            except Exception as e:
-                print("无法解锁centerOfInterest属性: %s" % str(e))
+            print("处理centerOfInterest属性...")
+            if cmds.getAttr('{}.centerOfInterest'.format(self.shp), lock=True):
+                cmds.setAttr('{}.centerOfInterest'.format(self.shp), lock=False)
+        except Exception as e:
+            print("无法解锁centerOfInterest属性: %s" % str(e))
 
-            # Create duplicate cam in world
-            print("创建相机副本...")
-            # 如果是引用相机，使用不同的复制方法
-            if is_ref_cam:
-                print("使用特殊方法复制引用相机...")
-                try:
-                    # 创建一个全新的相机
-                    new_cam_shape = cmds.camera()[0]
-                    new_cam_tfm = cmds.listRelatives(new_cam_shape, parent=True)[0]
-                    
-                    # 重命名为与原相机相似的名称
-                    new_cam_tfm = cmds.rename(new_cam_tfm, "export_tmp:" + self.tfm.split(":")[-1])
-                    new_cam_shape = cmds.listRelatives(new_cam_tfm, shapes=True)[0]
-                    
-                    _dup = _Camera(new_cam_tfm)
-                    print("创建引用相机副本: %s" % _dup.tfm)
-                except Exception as e:
-                    print("特殊方法创建相机失败，回退到标准方法: %s" % str(e))
-                    _dup = _Camera(cmds.duplicate(self.tfm)[0])
-            else:
-                _dup = _Camera(cmds.duplicate(self.tfm)[0])
+        # Create duplicate cam in world
+        print("创建相机副本...")
+        # 如果是引用相机，使用不同的复制方法
+        if is_ref_cam:
+            print("使用特殊方法复制引用相机...")
+            try:
+                # 创建一个全新的相机
+                new_cam_shape = cmds.camera()[0]
+                new_cam_tfm = cmds.listRelatives(new_cam_shape, parent=True)[0]
                 
-            print("创建的副本相机: %s" % _dup.tfm)
-            if cmds.listRelatives(_dup.tfm, parent=True):
-                print("将副本相机移至世界空间...")
-                cmds.parent(_dup.tfm, world=True)
-            
-            # 确保复制的相机也完全解锁
-            print("解锁复制相机的属性...")
-            self._unlock_attributes(_dup.tfm)
-            self._unlock_attributes(_dup.shp)
-            
-            # 额外解锁可能用于约束的属性
-            for attr in ['tx', 'ty', 'tz', 'rx', 'ry', 'rz', 'sx', 'sy', 'sz']:
-                try:
-                    cmds.setAttr('{}.{}'.format(_dup.tfm, attr), lock=False)
-                except Exception as e:
-                    print("无法解锁约束所需属性 %s.%s: %s" % (_dup.tfm, attr, str(e)))
+                # 重命名为与原相机相似的名称
+                new_cam_tfm = cmds.rename(new_cam_tfm, "export_tmp:" + self.tfm.split(":")[-1])
+                new_cam_shape = cmds.listRelatives(new_cam_tfm, shapes=True)[0]
                 
-            # Drive dup cam by orig
-            print("连接相机属性...")
-            for _attr in cmds.listAttr(self.shp, keyable=True):
-                _type = cmds.attributeQuery(
-                    _attr, node=self.shp, attributeType=True)
-                if _type in ['message']:
-                    continue
-                try:
-                    cmds.connectAttr('{}.{}'.format(self.shp, _attr),
-                                    '{}.{}'.format(_dup.shp, _attr))
-                except Exception as e:
-                    print("无法连接属性 %s.%s 到 %s.%s: %s" % (self.shp, _attr, _dup.shp, _attr, str(e)))
+                _dup = _Camera(new_cam_tfm)
+                print("创建引用相机副本: %s" % _dup.tfm)
+            except Exception as e:
+                print("特殊方法创建相机失败，回退到标准方法: %s" % str(e))
+                _dup = _Camera(cmds.duplicate(self.tfm)[0])
+        else:
+            _dup = _Camera(cmds.duplicate(self.tfm)[0])
             
-            print("创建约束...")
-            # 尝试确保不会有连接问题
+        print("创建的副本相机: %s" % _dup.tfm)
+        if cmds.listRelatives(_dup.tfm, parent=True):
+            print("将副本相机移至世界空间...")
+            # 多个副本同时存在时移到世界下可能与其它副本重名，使用parent返回的名称
+            _dup = _Camera(cmds.parent(_dup.tfm, world=True)[0])
+        
+        # 确保复制的相机也完全解锁
+        print("解锁复制相机的属性...")
+        self._unlock_attributes(_dup.tfm)
+        self._unlock_attributes(_dup.shp)
+        
+        # 额外解锁可能用于约束的属性
+        for attr in ['tx', 'ty', 'tz', 'rx', 'ry', 'rz', 'sx', 'sy', 'sz']:
             try:
-                # 检查是否有父级约束
-                existing_constraints = cmds.listConnections(_dup.tfm, type="constraint")
-                if existing_constraints:
-                    print("检测到现有的约束，尝试删除...")
-                    cmds.delete(existing_constraints)
-                
-                # 断开可能阻止约束的连接
-                for attr in ['tx', 'ty', 'tz', 'rx', 'ry', 'rz', 'sx', 'sy', 'sz']:
-                    connections = cmds.listConnections('{}.{}'.format(_dup.tfm, attr), 
-                                                     source=True, destination=False, plugs=True)
-                    if connections:
-                        for connection in connections:
-                            print("断开现有连接: %s -> %s.%s" % (connection, _dup.tfm, attr))
-                            cmds.disconnectAttr(connection, '{}.{}'.format(_dup.tfm, attr))
+                cmds.setAttr('{}.{}'.format(_dup.tfm, attr), lock=False)
             except Exception as e:
-                print("处理现有连接时出错: %s" % str(e))
+                print("无法解锁约束所需属性 %s.%s: %s" % (_dup.tfm, attr, str(e)))
             
-            # 使用try-except来分别创建约束，如果失败可以单独处理
+        # Drive dup cam by orig
+        print("连接相机属性...")
+        for _attr in cmds.listAttr(self.shp, keyable=True):
+            _type = cmds.attributeQuery(
+                _attr, node=self.shp, attributeType=True)
+            if _type in ['message']:
+                continue
             try:
-                _p_cons = cmds.parentConstraint(
-                    self.tfm, _dup.tfm, maintainOffset=False)[0]
-                print("创建父级约束成功: %s" % _p_cons)
+                cmds.connectAttr('{}.{}'.format(self.shp, _attr),
+                                '{}.{}'.format(_dup.shp, _attr))
             except Exception as e:
-                print("创建父级约束失败，尝试替代方法: %s" % str(e))
-                try:
-                    # 尝试直接连接位置和旋转属性
-                    for attr in ['tx', 'ty', 'tz', 'rx', 'ry', 'rz']:
-                        src_attr = '{}.{}'.format(self.tfm, attr)
-                        dst_attr = '{}.{}'.format(_dup.tfm, attr)
-                        if not cmds.isConnected(src_attr, dst_attr):
-                            cmds.connectAttr(src_attr, dst_attr, force=True)
-                    _p_cons = None
-                except Exception as e2:
-                    print("替代连接方法也失败: %s" % str(e2))
-                    _p_cons = None
+                print("无法连接属性 %s.%s 到 %s.%s: %s" % (self.shp, _attr, _dup.shp, _attr, str(e)))
+        
+        print("创建约束...")
+        # 尝试确保不会有连接问题
+        try:
+            # 检查是否有父级约束
+            existing_constraints = cmds.listConnections(_dup.tfm, type="constraint")
+            if existing_constraints:
+                print("检测到现有的约束，尝试删除...")
+                cmds.delete(existing_constraints)
             
+            # 断开可能阻止约束的连接
+            for attr in ['tx', 'ty', 'tz', 'rx', 'ry', 'rz', 'sx', 'sy', 'sz']:
+                connections = cmds.listConnections('{}.{}'.format(_dup.tfm, attr), 
+                                                 source=True, destination=False, plugs=True)
+                if connections:
+                    for connection in connections:
+                        print("断开现有连接: %s -> %s.%s" % (connection, _dup.tfm, attr))
+                        cmds.disconnectAttr(connection, '{}.{}'.format(_dup.tfm, attr))
+        except Exception as e:
+            print("处理现有连接时出错: %s" % str(e))
+        
+        # 使用try-except来分别创建约束，如果失败可以单独处理
+        try:
+            _p_cons = cmds.parentConstraint(
+                self.tfm, _dup.tfm, maintainOffset=False)[0]
+            print("创建父级约束成功: %s" % _p_cons)
+        except Exception as e:
+            print("创建父级约束失败，尝试替代方法: %s" % str(e))
             try:
-                _s_cons = cmds.scaleConstraint(
-                    self.tfm, _dup.tfm, maintainOffset=False)[0]
-                print("创建缩放约束成功: %s" % _s_cons)
-            except Exception as e:
-                print("创建缩放约束失败，尝试替代方法: %s" % str(e))
-                try:
-                    # 尝试直接连接缩放属性
-                    for attr in ['sx', 'sy', 'sz']:
-                        src_attr = '{}.{}'.format(self.tfm, attr)
-                        dst_attr = '{}.{}'.format(_dup.tfm, attr)
-                        if not cmds.isConnected(src_attr, dst_attr):
-                            cmds.connectAttr(src_attr, dst_attr, force=True)
-                    _s_cons = None
-                except Exception as e2:
-                    print("替代连接方法也失败: %s" % str(e2))
-                    _s_cons = None
+                # 尝试直接连接位置和旋转属性
+                for attr in ['tx', 'ty', 'tz', 'rx', 'ry', 'rz']:
+                    src_attr = '{}.{}'.format(self.tfm, attr)
+                    dst_attr = '{}.{}'.format(_dup.tfm, attr)
+                    if not cmds.isConnected(src_attr, dst_attr):
+                        cmds.connectAttr(src_attr, dst_attr, force=True)
+                _p_cons = None
+            except Exception as e2:
+                print("替代连接方法也失败: %s" % str(e2))
+                _p_cons = None
         
-            # Bake anim
-            print("烘焙动画，范围: %s - %s..." % (range_[0], range_[1]))
-            cmds.bakeResults([_dup.tfm, _dup.shp], time=range_)
-         
-            print("删除约束...")
-            if _p_cons:
-                cmds.delete(_p_cons)
-            if _s_cons:
-                cmds.delete(_s_cons)
+        try:
+            _s_cons = cmds.scaleConstraint(
+                self.tfm, _dup.tfm, maintainOffset=False)[0]
+            print("创建缩放约束成功: %s" % _s_cons)
+        except Exception as e:
+            print("创建缩放约束失败，尝试替代方法: %s" % str(e))
+            try:
+                # 尝试直接连接缩放属性
+                for attr in ['sx', 'sy', 'sz']:
+                    src_attr = '{}.{}'.format(self.tfm, attr)
+                    dst_attr = '{}.{}'.format(_dup.tfm, attr)
+                    if not cmds.isConnected(src_attr, dst_attr):
+                        cmds.connectAttr(src_attr, dst_attr, force=True)
+                _s_cons = None
+            except Exception as e2:
+                print("替代连接方法也失败: %s" % str(e2))
+                _s_cons = None
+        return _dup, [_cons for _cons in (_p_cons, _s_cons) if _cons]
+
+    def create_sampled_camera(self, sample, times):
+        """用_sample_world_space的采样结果创建一个干净的世界空间相机。
+
+        新相机不连接原相机，也不需要约束，采样值直接写入动画曲线。
+        需要先把当前命名空间设置为:export_tmp。
+
+        Args:
+            sample (dict): 本相机的采样结果
+            times (MTimeArray): 采样时间
+
+        Returns:
+            (Camera): 世界空间相机
+        """
+        _tfm = cmds.camera()[0]
+        _tfm = cmds.rename(_tfm, "export_tmp:" + self.tfm.split("|")[-1].split(":")[-1])
+        _new = _Camera(_tfm)
+        cmds.setAttr('{}.rotateOrder'.format(_new.tfm), sample['rotate_order'])
+        for _attr, _value in sample['static'].items():
+            try:
+                cmds.setAttr('{}.{}'.format(_new.shp, _attr), _value)
+            except Exception as e:
+                print("无法复制属性 %s.%s: %s" % (_new.shp, _attr, str(e)))
+        _write_sampled_curves(_new.tfm, sample['transform'], times)
+        _write_sampled_curves(_new.shp, sample['shape'], times)
+        return _new
+
+    def export_fbx_in_world_space(
+        self, fbx, range_, add_border_keys=True, cleanup=True, use_api_sampler=True):
+        """Export fbx of this canera in world space.
+
+        Args:
+            fbx (str): fbx path
+            range_ (tuple): start/end frames
+            add_border_keys (bool): add start/end frame keys
+            cleanup (bool): clean tmp nodes
+            use_api_sampler (bool): 优先使用API采样，不创建约束
+        """
+        try:
+            print("开始导出相机 %s 到 %s" % (self.name, fbx))
+
+            if self.is_world_space_keyed():
+                print("相机 %s 已在世界空间且只有关键帧动画，直接导出" % self.name)
+                self.export_fbx(
+                    fbx=fbx, range_=range_, add_border_keys=add_border_keys)
+                print("相机 %s 导出完成" % self.name)
+                return
+
+            print("设置临时命名空间...")
+            _set_namespace(':export_tmp', clean=True)
+            _dups, _methods, _failed = _create_world_space_cameras(
+                [self], range_, use_api_sampler=use_api_sampler)
+            if _failed:
+                raise RuntimeError("无法创建相机 %s 的世界空间副本" % self.name)
+            _dup = _dups[self]
+            print("相机 %s 使用%s" % (self.name, _methods[self]))
+
             print("导出FBX...")
             _dup.export_fbx(
                 fbx=fbx, range_=range_, add_border_keys=add_border_keys)
@@ -382,6 +684,54 @@ class _Camera(_Exportable):
                 pass
             raise
     
+    def is_world_space_keyed(self):
+        """相机是否可以直接导出：变换没有父级、没有约束，可关键帧属性只由关键帧驱动。
+
+        变换节点除可关键帧通道上的关键帧曲线外不能有其它输入（offsetParentMatrix、rotatePivot、
+        rotateAxis、shear等不可关键帧属性的连接同样会改变世界矩阵，只允许显示层的连接），
+        offsetParentMatrix（Maya 2020+）必须是单位矩阵。
+        满足条件时原相机的动画就是世界空间动画，不需要创建副本和烘焙。
+
+        Returns:
+            (bool): 是否可以直接导出
+        """
+        if cmds.listRelatives(self.tfm, parent=True):
+            return False
+        if cmds.listConnections(self.tfm, type='constraint', source=True, destination=False):
+            return False
+        if cmds.attributeQuery('offsetParentMatrix', node=self.tfm, exists=True):
+            _matrix = cmds.getAttr('{}.offsetParentMatrix'.format(self.tfm))
+            if any(abs(_value - _identity) > 1e-9 for _value, _identity in zip(_matrix, _IDENTITY_MATRIX)):
+                return False
+
+        _curves = set()
+        for _node in (self.tfm, self.shp):
+            _keyable = set(cmds.listAttr(_node, keyable=True) or [])
+            # connections=True时返回[目标属性, 源节点, ...]，一次查询节点的所有输入
+            _connections = cmds.listConnections(
+                _node, source=True, destination=False, connections=True,
+                skipConversionNodes=False) or []
+            for _plug, _source in zip(_connections[::2], _connections[1::2]):
+                _attr = _plug.split('.', 1)[-1]
+                if _attr not in _keyable:
+                    # 形状节点上不可关键帧属性的输入（图像平面等）不影响相机运动
+                    if _node == self.shp:
+                        continue
+                    if _attr == 'drawOverride' and cmds.nodeType(_source) == 'displayLayer':
+                        continue
+                    return False
+                # 只接受时间驱动的动画曲线（animCurveTL/TA/TU/TT），驱动关键帧、表达式、pairBlend等都需要烘焙
+                if not cmds.nodeType(_source).startswith('animCurveT'):
+                    return False
+                _curves.add(_source)
+
+        # 输入被连接的曲线（时间扭曲等）也需要烘焙
+        if _curves and cmds.listConnections(
+                ['{}.input'.format(_curve) for _curve in _curves],
+                source=True, destination=False):
+            return False
+        return True
+
     def find_nodes(self):
         """Get nodes in this camera.
 
@@ -420,7 +770,8 @@ class _Camera(_Exportable):
             print(traceback.format_exc())
             return False
 
-def export_all_cameras(fbx_directory, add_border_keys=True, maya_file_path=None, use_underscore_index=2):
+def export_all_cameras(fbx_directory, add_border_keys=True, maya_file_path=None, use_underscore_index=2,
+                       frame_range=None, use_api_sampler=True):
     """Export all cameras in the scene to FBX files with the current timeline range.
     
     Args:
@@ -428,6 +779,8 @@ def export_all_cameras(fbx_directory, add_border_keys=True, maya_file_path=None,
         add_border_keys (bool): 是否添加首尾关键帧
         maya_file_path (str): Maya文件路径，用于命名输出文件夹
         use_underscore_index (int): 使用第几个下划线前的字符作为子文件夹名称（默认为2）
+        frame_range (tuple): 导出的(起始帧, 结束帧)，例如镜头列表中的剪辑范围；None时使用时间轴范围
+        use_api_sampler (bool): 优先通过API逐帧采样世界矩阵，False时全部使用约束烘焙
     """
     
     try:
@@ -472,9 +825,12 @@ def export_all_cameras(fbx_directory, add_border_keys=True, maya_file_path=None,
             os.makedirs(export_dir)
         print("创建子子文件夹: %s" % export_dir)
         
-        # 获取当前时间轴的起始和结束帧
-        start_frame = cmds.playbackOptions(q=True, min=True)
-        end_frame = cmds.playbackOptions(q=True, max=True)
+        # 获取当前时间轴的起始和结束帧，指定了帧范围时使用指定的范围
+        if frame_range:
+            start_frame, end_frame = frame_range
+        else:
+            start_frame = cmds.playbackOptions(q=True, min=True)
+            end_frame = cmds.playbackOptions(q=True, max=True)
         range_ = (start_frame, end_frame)
         print("导出帧范围: %s - %s" % (start_frame, end_frame))
         
@@ -523,47 +879,82 @@ def export_all_cameras(fbx_directory, add_border_keys=True, maya_file_path=None,
             print("未找到可导出的相机")
             return
         
-        # 对指定相机进行导出
-        for i, cam in enumerate(exportable_cams):
-            # 获取相机的名称
-            camera_name = cam.name
-            print("\n正在处理相机 (%d/%d): %s" % (i+1, total_cams, camera_name))
-            
-            # 更新进度
-            progress = 10 + int(80 * (i / total_cams))  # 10-90%的进度
-            progress_file = os.path.join(fbx_directory, "export_progress.txt")
-            try:
-                with open(progress_file, 'w') as f:
-                    message = "正在导出相机: " + camera_name
-                    # 确保message是str类型
-                    if isinstance(message, unicode):
-                        message = message.encode('utf-8')
-                    f.write(str(int(progress)) + "\n" + message)
-                print("更新进度: %s%% - %s" % (progress, message))
-            except Exception as e:
-                print("更新进度文件时出错: %s" % str(e))
-            
+        # 为所有相机创建世界空间相机，时间轴只计算一遍
+        print("设置临时命名空间...")
+        _set_namespace(':export_tmp', clean=True)
+        fbx_paths = {}
+        for cam in exportable_cams:
             # 定义导出文件路径（直接在以当前文件名命名的目录中）
-            fbx_filepath = os.path.join(export_dir, "{}.fbx".format(camera_name))
-            fbx_filepath = fbx_filepath.replace("\\", "/")  # 替换为正斜杠
-            print("导出路径: %s" % fbx_filepath)
+            fbx_filepath = os.path.join(export_dir, "{}.fbx".format(cam.name))
+            fbx_paths[cam] = fbx_filepath.replace("\\", "/")  # 替换为正斜杠
+            print("相机 %s 导出路径: %s" % (cam.name, fbx_paths[cam]))
 
-            # 调用相机的导出函数
-            print("开始导出相机 %s 到 %s" % (camera_name, fbx_filepath))
-            # 首先尝试标准导出方法
+        # 已在世界空间且只有关键帧动画的相机直接导出原相机
+        direct_cams = []
+        for cam in exportable_cams:
             try:
-                cam.export_fbx_in_world_space(fbx=fbx_filepath, range_=range_, add_border_keys=add_border_keys)
-                print("标准方法导出相机成功: %s" % camera_name)
+                if cam.is_world_space_keyed():
+                    direct_cams.append(cam)
             except Exception as e:
-                print("标准方法导出相机 %s 失败: %s" % (camera_name, str(e)))
-                print("尝试使用简化方法导出...")
-                # 尝试使用简化方法导出
-                if cam.export_fbx_simple(fbx=fbx_filepath, range_=range_, add_border_keys=add_border_keys):
-                    print("简化方法导出相机成功: %s" % camera_name)
-                else:
-                    print("所有导出方法都失败，无法导出相机: %s" % camera_name)
-            
-            print("已导出相机: %s" % camera_name)
+                print("检查相机 %s 是否可以直接导出时出错: %s" % (cam.name, str(e)))
+        baked_cams = [cam for cam in exportable_cams if cam not in direct_cams]
+        methods = dict((cam, "直接导出") for cam in direct_cams)
+        print("直接导出 %d 个相机，需要烘焙 %d 个相机" % (len(direct_cams), len(baked_cams)))
+
+        dups = {}
+        failed = []
+        if baked_cams:
+            _write_progress(fbx_directory, 10, "正在计算相机动画")
+            dups, baked_methods, failed = _create_world_space_cameras(
+                baked_cams, range_, use_api_sampler=use_api_sampler)
+            methods.update(baked_methods)
+        prepared = [(cam, dups.get(cam, cam), fbx_paths[cam]) for cam in exportable_cams
+                    if cam in direct_cams or cam in dups]
+        fallback = [(cam, fbx_paths[cam]) for cam in failed]
+
+        # 逐个导出世界空间相机
+        try:
+            for i, (cam, _dup, fbx_filepath) in enumerate(prepared):
+                camera_name = cam.name
+                print("\n正在导出相机 (%d/%d): %s" % (i+1, total_cams, camera_name))
+
+                # 更新进度
+                progress = 10 + int(80 * (float(i) / total_cams))  # 10-90%的进度
+                _write_progress(fbx_directory, progress, "正在导出相机: " + camera_name)
+
+                print("开始导出相机 %s 到 %s (%s)" % (camera_name, fbx_filepath, methods[cam]))
+                _start_time = time.time()
+                try:
+                    _dup.export_fbx(fbx=fbx_filepath, range_=range_, add_border_keys=add_border_keys)
+                    print("%s导出相机成功: %s, 耗时 %.2f 秒" % (
+                        methods[cam], camera_name, time.time() - _start_time))
+                except Exception as e:
+                    print("%s导出相机 %s 失败: %s" % (methods[cam], camera_name, str(e)))
+                    fallback.append((cam, fbx_filepath))
+                    continue
+                print("已导出相机: %s" % camera_name)
+        finally:
+            print("清理临时命名空间...")
+            try:
+                _set_namespace(':export_tmp', clean=True)
+            finally:
+                _set_namespace(':')
+
+        # 标准方法失败的相机使用简化方法导出
+        for cam, fbx_filepath in fallback:
+            camera_name = cam.name
+            print("\n尝试使用简化方法导出相机: %s" % camera_name)
+            _write_progress(fbx_directory, 90, "正在导出相机: " + camera_name)
+            if cam.export_fbx_simple(fbx=fbx_filepath, range_=range_, add_border_keys=add_border_keys):
+                methods[cam] = "简化方法"
+                print("简化方法导出相机成功: %s" % camera_name)
+            else:
+                methods[cam] = "失败"
+                print("所有导出方法都失败，无法导出相机: %s" % camera_name)
+
+        print("\n相机导出方法:")
+        for cam in exportable_cams:
+            print("  %s: %s" % (cam.name, methods.get(cam, "失败")))
         
         print("\n所有相机导出完成!")
     except Exception as e:
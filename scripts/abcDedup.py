@@ -0,0 +1,186 @@
+# -*- coding: utf-8 -*-
+#abcDedup.py
+
+"""
+按内容哈希对导出的ABC文件去重。
+
+很多镜头会导出字节完全相同的ABC（例如没有动画的道具）。每个导出文件计算SHA-256后
+放入输出目录下的内容寻址仓库（.abc_store/<前两位>/<哈希>.abc），内容重复的文件
+替换为指向仓库文件的硬链接，或者删除后写入一个记录仓库路径的清单文件（<文件>.ref）。
+
+新内容以硬链接放入仓库，不产生第二份数据。输出目录所在的卷不支持硬链接时（SMB/NAS上的
+常见情况）复制进仓库会让每个文件在网络上写两遍，因此对该仓库关闭去重并记录原因。
+"""
+
+import hashlib
+import json
+import os
+
+
+STORE_DIR_NAME = '.abc_store'
+MANIFEST_SUFFIX = '.ref'
+DEDUP_MODES = ['hardlink', 'manifest']
+
+HASH_BLOCK_SIZE = 8 * 1024 * 1024
+
+# 不支持硬链接的仓库 -> 原因，同一进程中只检测和记录一次
+_unsupported_stores = {}
+
+
+def file_hash(file_path):
+    """计算文件的SHA-256。"""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        while True:
+            block = f.read(HASH_BLOCK_SIZE)
+            if not block:
+                break
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class DedupStore(object):
+    """内容寻址的ABC仓库。
+
+    同一个仓库只应由一个线程写入，调用方负责串行化。
+    """
+
+    def __init__(self, store_root, mode='hardlink', log=None):
+        """Constructor.
+
+        Args:
+            store_root (str): 仓库目录
+            mode (str): 重复文件的处理方式，'hardlink'或'manifest'
+            log (callable): 日志函数
+        """
+        self.store_root = store_root
+        self.mode = mode if mode in DEDUP_MODES else 'hardlink'
+        self.log = log
+
+    def unsupported_reason(self, file_path):
+        """检测能否从输出文件硬链接到仓库，不能时返回原因（该仓库不再去重）。
+
+        用一个临时硬链接检测，不读取文件内容。
+        """
+        if self.store_root in _unsupported_stores:
+            return _unsupported_stores[self.store_root]
+        probe = os.path.join(self.store_root, '.link_probe.%d' % os.getpid())
+        try:
+            if not os.path.exists(self.store_root):
+                os.makedirs(self.store_root)
+            if os.path.exists(probe):
+                os.remove(probe)
+            os.link(file_path, probe)
+            os.remove(probe)
+            return None
+        except (OSError, AttributeError) as e:
+            reason = str(e)
+            _unsupported_stores[self.store_root] = reason
+            if self.log:
+                self.log('输出目录不支持硬链接，关闭去重（复制到仓库会让每个文件写入两遍）: %s (%s)' % (
+                    self.store_root, reason))
+            return reason
+
+    def store_path(self, digest):
+        return os.path.join(self.store_root, digest[:2], digest + '.abc')
+
+    def add(self, file_path):
+        """把文件加入仓库，内容已存在时替换为硬链接或清单文件。
+
+        Returns:
+            (dict): file, digest, size, duplicate, saved（节省的字节数）, method；
+                仓库不支持硬链接时method为'unsupported'，不计算哈希
+        """
+        size = os.path.getsize(file_path)
+        if self.unsupported_reason(file_path):
+            return {'file': file_path, 'digest': None, 'size': size,
+                    'duplicate': False, 'saved': 0, 'method': 'unsupported'}
+        digest = file_hash(file_path)
+        target = self.store_path(digest)
+        result = {'file': file_path, 'digest': digest, 'size': size,
+                  'duplicate': False, 'saved': 0, 'method': None}
+
+        if not os.path.exists(target):
+            target_folder = os.path.dirname(target)
+            if not os.path.exists(target_folder):
+                os.makedirs(target_folder)
+            # 新内容：用硬链接放入仓库，不占用额外空间
+            os.link(file_path, target)
+            result['method'] = 'stored'
+            return result
+
+        result['duplicate'] = True
+        if _same_file(file_path, target):
+            result['method'] = 'linked'
+            return result
+
+        if self.mode == 'manifest':
+            with open(file_path + MANIFEST_SUFFIX, 'w') as f:
+                json.dump({'digest': digest, 'size': size, 'store_path': target}, f, indent=2)
+            os.remove(file_path)
+            result['method'] = 'manifest'
+            result['saved'] = size
+            return result
+
+        temp_path = file_path + '.dedup'
+        try:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            os.link(target, temp_path)
+        except (OSError, AttributeError) as e:
+            # 文件系统不支持硬链接（或跨设备），保留原文件
+            if self.log:
+                self.log('无法创建硬链接，保留文件: %s (%s)' % (file_path, str(e)))
+            result['method'] = 'kept'
+            return result
+        _replace(temp_path, file_path)
+        result['method'] = 'hardlink'
+        result['saved'] = size
+        return result
+
+
+def _same_file(path_a, path_b):
+    try:
+        return os.path.samefile(path_a, path_b)
+    except (OSError, AttributeError):
+        return False
+
+
+def _replace(source, destination):
+    """用source覆盖destination（Windows下os.rename不能覆盖已有文件）。"""
+    try:
+        os.replace(source, destination)
+    except AttributeError:
+        if os.path.exists(destination):
+            os.remove(destination)
+        os.rename(source, destination)
+
+
+def dedup_folder(folder, store_root, mode='hardlink', log=None):
+    """对目录下所有导出的ABC去重。
+
+    Returns:
+        (dict): files, duplicates, bytes_saved, results, unsupported（不支持硬链接的原因，支持时为None）
+    """
+    store = DedupStore(store_root, mode=mode, log=log)
+    results = []
+    for file_name in sorted(os.listdir(folder)):
+        file_path = os.path.join(folder, file_name)
+        if not file_name.lower().endswith('.abc') or not os.path.isfile(file_path):
+            continue
+        try:
+            result = store.add(file_path)
+        except (IOError, OSError) as e:
+            if log:
+                log('去重时出错: %s: %s' % (file_path, str(e)))
+            continue
+        if result['method'] == 'unsupported':
+            break
+        results.append(result)
+    return {
+        'files': len(results),
+        'duplicates': sum(1 for result in results if result['duplicate']),
+        'bytes_saved': sum(result['saved'] for result in results),
+        'results': results,
+        'unsupported': _unsupported_stores.get(store_root),
+    }
@@ -20,18 +20,58 @@ current_dir = os.path.dirname(os.path.abspath(__file__))
 if current_dir not in sys.path:
     sys.path.append(current_dir)
 
+# 扩展参数以 --key=value 形式传入，位置参数保持原有顺序
+# 支持的扩展参数:
+#   verbose        是否逐条记录对象明细 (true/false)
+#   frame_range    只导出指定帧范围，格式为 起始帧:结束帧（镜头列表和帧范围分片导出时使用）
+#   preroll_start  预卷起始帧，只计算不写入
+#   output_suffix  输出文件名后缀，如 .part00
+#   progress_file  进度文件路径
+#   log_file       日志文件路径
+#   discover_only  只读取顶层引用列表并写入该JSON文件，不导出（命名空间分组并行导出时使用）
+#   load_namespaces          只加载这些命名空间的引用，逗号分隔（命名空间分组并行导出时使用）
+#   include_local_namespaces 同时导出非引用的命名空间 (true/false)
+#   eval_mode      导出时的求值模式 scene/off/serial/parallel，默认parallel
+#   eval_prune     是否禁用与导出对象无关的动力学、图像平面和表达式节点 (true/false)，默认true
+#   report_file    导出报告路径，默认为子子文件夹下的export_report.json
+#   report_label   写入导出报告的进程名称（并行导出时使用）
+#   prune_scene    导出前精简场景 off/freeze/delete，默认off
+#   static_detect  检测帧范围内不变的模型并单独导出为单采样的静态文件 (true/false)
+#   static_samples 静态检测的抽样帧数，默认5
+#   resolve_names  导出前重命名去掉命名空间后重名的节点 (true/false)，默认true
+#   batch_session  关闭撤销队列、构造历史和视口刷新 (true/false)，默认true
+#   shader_plans   按资产缓存材质指定方案到输出目录下的.shader_plans (true/false)，默认true
+#   rename_shading_groups    导出前把所有着色组重命名为<材质>_SG (true/false)
+#   export_dir     ABC写入的目录（本地缓存），默认为子子文件夹；日志和报告仍写入子子文件夹
+extra_options = {}
+positional_args = []
+for arg in sys.argv:
+    if arg.startswith('--') and '=' in arg:
+        key, value = arg[2:].split('=', 1)
+        extra_options[key] = value
+    else:
+        positional_args.append(arg)
+
+def get_option(name, default=None):
+    return extra_options.get(name, default)
+
+def get_bool_option(name, default=False):
+    if name not in extra_options:
+        return default
+    return extra_options[name].lower() == 'true'
+
 # 命令行参数支持
-if len(sys.argv) > 1:
+if len(positional_args) > 1:
     # 如果提供了参数，则解析这些参数
     # 支持的参数: maya_file, output_path, namespaces, apply_shader, triangulate, use_underscore_index, enable_smooth, smooth_divisions
-    maya_file = sys.argv[1] if len(sys.argv) > 1 else ""
-    output_path = sys.argv[2] if len(sys.argv) > 2 else "."
-    namespaces_str = sys.argv[3] if len(sys.argv) > 3 else "tbx_chr,tbx_prp"
-    apply_shader = True if len(sys.argv) <= 4 or sys.argv[4].lower() == "true" else False
-    triangulate = True if len(sys.argv) > 5 and sys.argv[5].lower() == "true" else False
-    use_underscore_index = int(sys.argv[6]) if len(sys.argv) > 6 else 3
-    enable_smooth = True if len(sys.argv) > 7 and sys.argv[7].lower() == "true" else False
-    smooth_divisions = int(sys.argv[8]) if len(sys.argv) > 8 else 1
+    maya_file = positional_args[1] if len(positional_args) > 1 else ""
+    output_path = positional_args[2] if len(positional_args) > 2 else "."
+    namespaces_str = positional_args[3] if len(positional_args) > 3 else "tbx_chr,tbx_prp"
+    apply_shader = True if len(positional_args) <= 4 or positional_args[4].lower() == "true" else False
+    triangulate = True if len(positional_args) > 5 and positional_args[5].lower() == "true" else False
+    use_underscore_index = int(positional_args[6]) if len(positional_args) > 6 else 3
+    enable_smooth = True if len(positional_args) > 7 and positional_args[7].lower() == "true" else False
+    smooth_divisions = int(positional_args[8]) if len(positional_args) > 8 else 1
 else:
     # 默认值
     maya_file = ""
@@ -43,6 +83,16 @@ else:
     enable_smooth = False
     smooth_divisions = 1
 
+# 是否逐条记录对象明细
+verbose = get_bool_option('verbose')
+
+# 命名空间分组导出：只加载本组的引用，None表示加载全部引用
+discover_file = get_option('discover_only')
+load_namespaces = get_option('load_namespaces')
+if load_namespaces is not None:
+    load_namespaces = set(ns.strip() for ns in load_namespaces.split(',') if ns.strip())
+include_local_namespaces = get_bool_option('include_local_namespaces')
+
 # 解析命名空间
 namespaces = [ns.strip() for ns in namespaces_str.split(",")]
 
@@ -71,21 +121,32 @@ subfolder_path = os.path.join(project_folder_path, maya_file_name)
 if not os.path.exists(subfolder_path):
     os.makedirs(subfolder_path)
 
+# ABC先写入的目录，使用本地缓存时由界面在导出完成后上传到子子文件夹
+export_dir = get_option('export_dir') or subfolder_path
+if not os.path.exists(export_dir):
+    os.makedirs(export_dir)
+
 # 创建日志文件
-log_file = os.path.join(subfolder_path, 'export_log.txt')
-def write_log(message):
-    with open(log_file, 'a') as f:
-        current_time = time.strftime('%Y-%m-%d %H:%M:%S')
-        f.write('[' + current_time + '] ' + message + '\n')
+import workerLogger
+log_file = get_option('log_file') or os.path.join(subfolder_path, 'export_log.txt')
+logger = workerLogger.WorkerLogger(log_file, verbose=verbose)
+write_log = logger.info
 
-write_log('开始初始化Maya独立模式...')
+logger.stage('初始化Maya独立模式')
 write_log('使用第%d个下划线前的字符作为子文件夹名称' % use_underscore_index)
 write_log('子文件夹名称: ' + subfolder_name)
 write_log('子子文件夹名称: ' + maya_file_name)
 write_log('将导出到路径: ' + subfolder_path)
+if export_dir != subfolder_path:
+    write_log('先写入本地缓存目录: ' + export_dir)
 
 # 创建进度文件
-progress_file = os.path.join(output_path, 'export_progress.txt')
+progress_file = get_option('progress_file') or os.path.join(output_path, 'export_progress.txt')
+
+# 导出报告，只读取引用列表时不写报告
+import exportReport
+report = None if discover_file else exportReport.ExportReport(maya_file, label=get_option('report_label', ''))
+report_file = get_option('report_file') or os.path.join(subfolder_path, exportReport.REPORT_FILE_NAME)
 
 try:
     # 初始化Maya独立模式
@@ -128,8 +189,14 @@ try:
     cmds.optionVar(intValue=['CIP', 0])  # 禁用客户参与计划
     cmds.optionVar(intValue=['CER', 0])  # 禁用崩溃报告
 
+    # 批量会话：导出期间的编辑不进入撤销队列，也不默认保留构造历史
+    import batchSession
+    batch_session = batchSession.BatchSession(log=write_log)
+    if get_bool_option('batch_session', True):
+        batch_session.apply()
+
     # 打开Maya文件
-    write_log('打开Maya文件...')
+    logger.stage('打开Maya文件')
     # 禁用自动加载插件
     cmds.optionVar(intValue=['autoLoadPlugins', 0])
     
@@ -164,6 +231,11 @@ try:
         'loadNoReferences': False,    # 允许加载引用
         'returnNewNodes': False       # 不返回新节点列表，提高性能
     }
+    load_selected_references = discover_file or load_namespaces is not None
+    if load_selected_references:
+        # 先不加载任何引用，之后只加载需要的引用
+        file_options.pop('loadNoReferences')
+        file_options['loadReferenceDepth'] = 'none'
 
     write_log('尝试打开文件: ' + maya_file)
     # 尝试加载文件, 忽略未知节点错误
@@ -179,17 +251,58 @@ try:
         try:
             write_log('使用MEL命令尝试打开文件...')
             # 不使用setConstructionHistory命令，直接使用file命令打开
-            mel.eval('file -open -force -ignoreVersion -prompt false "' + maya_file.replace('\\', '\\\\') + '";')
+            mel.eval('file -open -force -ignoreVersion -prompt false ' +
+                     ('-loadReferenceDepth "none" ' if load_selected_references else '') +
+                     '"' + maya_file.replace('\\', '\\\\') + '";')
             write_log('使用MEL命令打开文件成功')
             file_open_success = True
         except Exception as e2:
             write_log('使用MEL命令打开文件失败: ' + str(e2))
             write_log('将继续尝试导出，但可能不成功')
     
+    # 只读取引用列表
+    if discover_file:
+        logger.stage('读取引用列表')
+        import json
+        reference_infos = []
+        for ref in cmds.file(query=True, reference=True) or []:
+            ref_node = cmds.referenceQuery(ref, referenceNode=True)
+            reference_infos.append({
+                'namespace': cmds.file(ref, query=True, namespace=True),
+                'ref_node': ref_node,
+                'path': cmds.referenceQuery(ref_node, filename=True, withoutCopyNumber=True),
+                'deferred': bool(cmds.file(ref, query=True, deferReference=True)),
+            })
+        with open(discover_file, 'w') as f:
+            json.dump(reference_infos, f)
+        write_log('找到 %d 个顶层引用，已写入: %s' % (len(reference_infos), discover_file))
+        sys.exit(0)
+
+    # 只加载本组命名空间的引用，其余引用保持卸载，由下面的流程移除
+    reference_namespaces = set()
+    if load_namespaces is not None:
+        logger.stage('加载本组引用')
+        for ref in cmds.file(query=True, reference=True) or []:
+            ref_namespace = cmds.file(ref, query=True, namespace=True)
+            reference_namespaces.add(ref_namespace)
+            if ref_namespace in load_namespaces:
+                cmds.file(loadReference=cmds.referenceQuery(ref, referenceNode=True))
+                logger.detail('加载引用', '加载引用: ' + ref_namespace)
+        write_log('本组加载的命名空间: ' + ', '.join(sorted(load_namespaces)))
+
+    # 导入引用前记录每个引用的资产文件，用于按资产缓存材质指定方案
+    reference_assets = {}
+    if apply_shader and get_bool_option('shader_plans', True):
+        try:
+            import shaderPlanCache
+            reference_assets = shaderPlanCache.collect_reference_assets()
+        except Exception as e:
+            write_log('读取引用资产信息时出错，不使用材质方案缓存: ' + str(e))
+
     # 导入引用文件
     file_open_success = True
     if file_open_success:
-        write_log('开始导入引用文件...')
+        logger.stage('导入引用文件')
         try:
             # 获取所有引用
             references = cmds.file(query=True, reference=True) or []
@@ -237,17 +350,23 @@ try:
         except Exception as e:
             write_log('更新进度出错: ' + str(e))
 
+    # 删除上次导出的文件再写入：去重后的输出可能是仓库文件的硬链接，直接覆盖会改写仓库内容
+    def remove_previous_output(file_path):
+        for path in (file_path, file_path + abcDedup.MANIFEST_SUFFIX):
+            if os.path.exists(path):
+                os.remove(path)
+
     # 优化后的可见性检查函数
     def is_object_visible(obj_path):
         # 检查对象是否存在
         if not cmds.objExists(obj_path):
-            write_log('警告: 对象不存在 ' + obj_path)
+            logger.detail('警告: 对象不存在', '警告: 对象不存在 ' + obj_path)
             return False
 
         # 检查visibility属性 - 基本的可见性检查
         if cmds.attributeQuery('visibility', node=obj_path, exists=True):
             if not cmds.getAttr(obj_path + '.visibility'):
-                write_log('对象不可见: ' + obj_path)
+                logger.detail('对象不可见', '对象不可见: ' + obj_path)
                 return False
 
         # 检查overrideEnabled和overrideVisibility
@@ -255,7 +374,7 @@ try:
             if cmds.getAttr(obj_path + '.overrideEnabled'):
                 if cmds.attributeQuery('overrideVisibility', node=obj_path, exists=True):
                     if not cmds.getAttr(obj_path + '.overrideVisibility'):
-                        write_log('覆盖可见性设置导致不可见: ' + obj_path)
+                        logger.detail('覆盖可见性设置导致不可见', '覆盖可见性设置导致不可见: ' + obj_path)
                         return False
 
         # 递归检查父级可见性
@@ -285,12 +404,20 @@ try:
         import setShadersTool
         import singleExport
         import alembicExport
+        import meshPreprocess
+        import exportProgress
+        import evalProfile
+        import scenePrune
+        import staticDetect
+        import abcDedup
+        import nameResolve
         write_log('模块导入成功')
     except Exception as e:
         write_log('导入模块失败: ' + str(e))
         raise
 
     # 开始导出过程
+    logger.stage('筛选场景对象')
     update_progress(10, '开始筛选场景对象...')
 
     # 获取命名空间过滤条件
@@ -314,6 +441,15 @@ try:
                     filtered_namespaces.add(ns_1)
                     break
 
+    # 命名空间分组导出时只保留本组的命名空间
+    if load_namespaces is not None:
+        def in_namespace_group(ns):
+            top_namespace = ns.split('|')[-1].split(':')[0]
+            if top_namespace in load_namespaces:
+                return True
+            return include_local_namespaces and top_namespace not in reference_namespaces
+        filtered_namespaces = set(ns for ns in filtered_namespaces if in_namespace_group(ns))
+
     write_log('找到匹配的命名空间: ' + str(list(filtered_namespaces)))
 
     # 按命名空间查找cache组
@@ -348,7 +484,7 @@ try:
                     valid_shapes = get_valid_shapes(obj)
                     if valid_shapes:
                         mesh_objects.append(obj)
-                        write_log('找到可见模型: ' + obj + ' (有效形状节点: ' + str(len(valid_shapes)) + '个)')
+                        logger.detail('找到可见模型', '找到可见模型: ' + obj + ' (有效形状节点: ' + str(len(valid_shapes)) + '个)')
                     else:
                         skipped_objects.append(obj)
 
@@ -370,15 +506,35 @@ try:
     if not found_cache_groups:
         write_log('未找到符合条件的cache组！')
         update_progress(100, '未找到符合条件的对象，导出终止')
+        report.status = 'failed'
         sys.exit(1)
 
     write_log('找到 ' + str(len(found_cache_groups)) + ' 个符合条件的cache组')
+
+    # 着色组名称会写入ABC的面集，Unreal中作为材质槽名称
+    if apply_shader and get_bool_option('rename_shading_groups'):
+        try:
+            renameShadingGroup.rename_all_shading_groups(log=write_log)
+        except Exception as e:
+            write_log('重命名着色组时出错: ' + str(e))
+            write_log(traceback.format_exc())
+
+    plan_cache = None
+    if reference_assets:
+        plan_cache = shaderPlanCache.ShaderPlanCache(
+            os.path.join(output_path, shaderPlanCache.PLAN_DIR_NAME), reference_assets, log=write_log)
     update_progress(20, '找到 ' + str(len(found_cache_groups)) + ' 个符合条件的cache组')
 
-    # 获取当前时间轴范围
+    # 获取当前时间轴范围，分片导出时由调度方指定本段的帧范围
     start_frame = cmds.playbackOptions(q=True, min=True)
     end_frame = cmds.playbackOptions(q=True, max=True)
-    write_log('帧范围: ' + str(start_frame) + ' - ' + str(end_frame))
+    if get_option('frame_range'):
+        start_frame, end_frame = [float(value) for value in get_option('frame_range').split(':')]
+    preroll_start = float(get_option('preroll_start')) if get_option('preroll_start') else None
+    if preroll_start is not None and preroll_start >= start_frame:
+        preroll_start = None
+    write_log('帧范围: ' + str(start_frame) + ' - ' + str(end_frame) +
+              (' (预卷起始帧: %s)' % preroll_start if preroll_start is not None else ''))
     
     # 解锁initialShadingGroup节点，防止"Destination is locked"错误
     write_log('解锁initialShadingGroup节点...')
@@ -388,110 +544,184 @@ try:
     except Exception as lock_err:
         write_log('解锁initialShadingGroup时出错: ' + str(lock_err))
 
-    # 遍历每个cache组进行导出
-    total_groups = len(found_cache_groups)
-    current_group = 0
-    total_exported_objects = 0
+    all_mesh_objects = [obj for data in found_cache_groups.values() for obj in data['mesh_objects']]
 
-    for ns, data in found_cache_groups.items():
-        current_group += 1
-        group_progress = 20 + (current_group * 80 / total_groups)
-        update_progress(group_progress, '正在处理 (' + str(current_group) + '/' + str(total_groups) + '): ' + ns)
-        write_log('开始处理: ' + ns)
+    # 切换求值模式并禁用与导出对象无关的节点
+    eval_profile = evalProfile.EvalProfile(
+        mode=get_option('eval_mode', 'parallel'),
+        export_objects=all_mesh_objects,
+        prune=get_bool_option('eval_prune', True),
+        log=write_log)
+    try:
+        eval_profile.apply()
+        report.eval_profile = eval_profile.summary()
+
+        # 冻结或删除与导出模型无关的DAG分支和变形器链；在切换求值模式之后执行，
+        # DG模式的检查针对导出时实际使用的求值模式
+        prune_mode = get_option('prune_scene', 'off')
+        if prune_mode != 'off':
+            logger.stage('精简场景')
+            try:
+                prune_stats = scenePrune.prune_scene(all_mesh_objects, mode=prune_mode, log=write_log)
+                report.scene_prune = prune_stats
+                write_log('场景精简完成(%s): 冻结 %d 个节点, 删除 %d 个分支, 耗时 %.2f 秒' % (
+                    prune_mode, prune_stats['frozen'], prune_stats['deleted'], prune_stats['time']))
+            except Exception as e:
+                write_log('精简场景时出错: ' + str(e))
+                write_log(traceback.format_exc())
 
-        try:
-            cache_path = data['cache_path']
-            mesh_objects = data['mesh_objects']
+        # 遍历每个cache组进行导出
+        total_groups = len(found_cache_groups)
+        current_group = 0
+        total_exported_objects = 0
 
-            if not mesh_objects:
-                write_log('警告: ' + cache_path + ' 下没有可导出模型，跳过')
-                continue
+        for ns, data in found_cache_groups.items():
+            current_group += 1
+            group_start_progress = 20 + ((current_group - 1) * 80 / total_groups)
+            group_progress = 20 + (current_group * 80 / total_groups)
+            logger.stage('处理 ' + ns)
+            update_progress(group_start_progress, '正在处理 (' + str(current_group) + '/' + str(total_groups) + '): ' + ns)
 
-            # 将材质指定到面上
-            if apply_shader:
-                write_log('正在将材质指定到面上...')
-                try:
-                    if not mesh_objects:
-                        write_log('警告: 没有找到有形状节点的模型对象，跳过材质应用')
-                    else:
+            try:
+                cache_path = data['cache_path']
+                mesh_objects = data['mesh_objects']
+
+                if not mesh_objects:
+                    write_log('警告: ' + cache_path + ' 下没有可导出模型，跳过')
+                    continue
+
+                # 将材质指定到面上
+                if apply_shader:
+                    write_log('正在将材质指定到面上...')
+                    try:
+                        if not mesh_objects:
+                            write_log('警告: 没有找到有形状节点的模型对象，跳过材质应用')
+                        else:
                         
                             
-                        # 只对实际的模型对象应用材质
-                        write_log('对 ' + str(len(mesh_objects)) + ' 个模型对象应用材质')
-                        cmds.select(mesh_objects, replace=True)
-                        # 使用setShadersTool将材质指定到面上
-                        setShadersTool.SetShader()
-                        write_log('材质指定到面上成功')
-                except Exception as e:
-                    write_log('将材质指定到面上时出错: ' + str(e))
-                    write_log(traceback.format_exc())
-
-            # 如果需要，应用多边形光滑
-            if enable_smooth and smooth_divisions > 0:
-                write_log('正在应用多边形光滑(层数: %d)...' % smooth_divisions)
-                try:
-                    smoothed_count = 0
-                    for mesh in mesh_objects:
-                        # 获取形状节点
-                        shapes = cmds.listRelatives(mesh, shapes=True, fullPath=True) or []
-                        for shape in shapes:
-                            if cmds.nodeType(shape) == 'mesh':
-                                # 确保形状节点不是中间对象
-                                if not cmds.getAttr(shape + '.intermediateObject'):
-                                    # 应用多边形光滑
-                                    cmds.polySmooth(mesh, 
-                                                   divisions=smooth_divisions,
-                                                   keepBorder=True,  # 保持边界
-                                                   keepHardEdge=False,  # 保持硬边
-                                                   keepMapBorders=True,  # 保持UV边界
-                                                   ch=True)  # 不保留历史记录
-                                    smoothed_count += 1
-                    write_log('成功光滑处理 %d 个模型' % smoothed_count)
-                except Exception as e:
-                    write_log('应用多边形光滑时出错: ' + str(e))
-                    write_log(traceback.format_exc())
-
-            # 如果需要，将模型三角化
-            if triangulate:
-                write_log('正在将模型转换为三角面...')
+                            # 只对实际的模型对象应用材质
+                            write_log('对 ' + str(len(mesh_objects)) + ' 个模型对象应用材质')
+                            cmds.select(mesh_objects, replace=True)
+                            # 使用setShadersTool将材质指定到面上
+                            shader_tool = setShadersTool.SetShader(planCache=plan_cache)
+                            if plan_cache:
+                                plan_cache.flush()
+                            write_log('材质指定到面上成功: 已符合要求(跳过) %d 个, 两步法 %d 个, 多材质拆分 %d 个' % (
+                                shader_tool.stats[setShadersTool.STATUS_COMPLIANT],
+                                shader_tool.stats[setShadersTool.STATUS_TWO_STEP],
+                                shader_tool.stats[setShadersTool.STATUS_MULTI_MATERIAL]))
+                            report.add_shader_check(ns, shader_tool.stats)
+                    except Exception as e:
+                        write_log('将材质指定到面上时出错: ' + str(e))
+                        write_log(traceback.format_exc())
+
+                # -stripNamespaces导出时同一层级不能有重名节点
+                if get_bool_option('resolve_names', True):
+                    try:
+                        mesh_objects, renamed = nameResolve.resolve_duplicate_names(mesh_objects, log=write_log)
+                        for old_path, new_name in renamed:
+                            logger.detail('重命名重名节点', '重命名重名节点: ' + old_path + ' -> ' + new_name)
+                    except Exception as e:
+                        write_log('处理重名节点时出错: ' + str(e))
+                        write_log(traceback.format_exc())
+
+                # 检测帧范围内完全不变的模型，单独导出为只有一个采样的静态文件
+                static_objects = []
+                if get_bool_option('static_detect'):
+                    try:
+                        static_objects, animated_objects = staticDetect.split_static_meshes(
+                            mesh_objects, start_frame, end_frame,
+                            samples=int(get_option('static_samples', 5)), log=write_log)
+                    except Exception as e:
+                        write_log('静态模型检测出错，全部按动画导出: ' + str(e))
+                        write_log(traceback.format_exc())
+                        static_objects = []
+
+                # 光滑与三角化预处理：一次性找出符合条件的形状节点后批量处理
+                if (enable_smooth and smooth_divisions > 0) or triangulate:
+                    write_log('正在预处理模型(光滑: %s, 三角化: %s)...' % (
+                        smooth_divisions if enable_smooth else 0, triangulate))
+                    try:
+                        preprocess_stats = meshPreprocess.run_preprocess(
+                            mesh_objects,
+                            smooth_divisions=smooth_divisions if enable_smooth else 0,
+                            triangulate=triangulate,
+                            log=write_log)
+                        write_log('预处理完成: 光滑 %d 个, 三角化 %d 个模型' % (
+                            preprocess_stats['smoothed'], preprocess_stats['triangulated']))
+                    except Exception as e:
+                        write_log('预处理模型时出错: ' + str(e))
+                        write_log(traceback.format_exc())
+
+                # 创建输出文件路径到子文件夹
+                file_name = ns.replace(':', '_') + get_option('output_suffix', '') + '.abc'
+                abc_file_path = os.path.join(export_dir, file_name)
+
+                # 静态模型只导出起始帧；全部静态时直接写入命名空间的主文件
+                if static_objects:
+                    static_set = set(static_objects)
+                    animated_objects = [obj for obj in mesh_objects if obj not in static_set]
+                    if animated_objects:
+                        static_file_name = ns.replace(':', '_') + '.static' + get_option('output_suffix', '') + '.abc'
+                        static_file_path = os.path.join(export_dir, static_file_name)
+                    else:
+                        static_file_path = abc_file_path
+                    write_log('正在导出静态模型(%d 个): %s' % (len(static_objects), static_file_path))
+                    try:
+                        export_start_time = time.time()
+                        remove_previous_output(static_file_path)
+                        cmds.select(static_objects, replace=True)
+                        singleExport.SingleExport.exportSelection(static_file_path, start_frame, start_frame)
+                        report.add_export(ns, os.path.join(subfolder_path, os.path.basename(static_file_path)),
+                                          (start_frame, start_frame), 1,
+                                          time.time() - export_start_time, 0.0, len(static_objects))
+                        total_exported_objects += len(static_objects)
+                        mesh_objects = animated_objects
+                    except Exception as e:
+                        write_log('导出静态模型时出错，改为按动画导出: ' + str(e))
+                        write_log(traceback.format_exc())
+
+                if not mesh_objects:
+                    write_log('命名空间 ' + ns + ' 下的模型全部为静态，已导出: ' + abc_file_path)
+                    continue
+
+                # 导出ABC
+                write_log('正在导出: ' + abc_file_path)
+                logger.flush()
                 try:
-                    original_meshes = mesh_objects[:]
-                    triangulated_count = 0
-                    for mesh in original_meshes:
-                        # 获取形状节点
-                        shapes = cmds.listRelatives(mesh, shapes=Tue, fullPath=True) or []
-                        for shape in shapes:
-                            if cmds.nodeType(shape) == 'mesh':
-                                # 确保形状节点不是中间对象
-                                if not cmds.getAttr(shape + '.intermediateObject'):
-                                    # 使用polyTriangulate命令三角化
-                                    cmds.polyTriangulate(mesh, ch=False)
-                                    triangulated_count += 1
-                    write_log('成功三角化 %d 个模型' % triangulated_count)
+                    remove_previous_output(abc_file_path)
+                    # 直接选择所有模型对象
+                    cmds.select(mesh_objects, replace=True)
+                    # 使用singleExport导出，保持原始名称；逐帧回调上报导出进度
+                    exportProgress.begin(progress_file, start_frame, end_frame,
+                                         progress_start=group_start_progress, progress_end=group_progress,
+                                         label=ns, log=write_log)
+                    export_start_time = time.time()
+                    try:
+                        singleExport.SingleExport.exportSelection(
+                            abc_file_path, start_frame, end_frame,
+                            perFrameCallback=exportProgress.CALLBACK_COMMAND,
+                            preRollStartFrame=preroll_start)
+                    finally:
+                        frame_progress = exportProgress.end()
+                    write_log('导出成功: ' + abc_file_path + ' (%d 帧, %.1f fps)' % (
+                        frame_progress.frames_done, frame_progress.fps))
+                    report.add_export(ns, os.path.join(subfolder_path, file_name), (start_frame, end_frame),
+                                      frame_progress.frames_done, time.time() - export_start_time,
+                                      frame_progress.fps, len(mesh_objects))
+                    total_exported_objects += len(mesh_objects)
                 except Exception as e:
-                    write_log('三角化模型时出错: ' + str(e))
+                    write_log('导出ABC时出错: ' + str(e))
                     write_log(traceback.format_exc())
-                    
-            # 创建输出文件路径到子文件夹
-            file_name = ns.replace(':', '_') + '.abc'
-            abc_file_path = os.path.join(subfolder_path, file_name)
 
-            # 导出ABC
-            write_log('正在导出: ' + abc_file_path)
-            try:
-                # 直接选择所有模型对象
-                cmds.select(mesh_objects, replace=True)
-                # 使用singleExport导出，保持原始名称
-                singleExport.SingleExport.exportSelection(abc_file_path, start_frame, end_frame)
-                write_log('导出成功: ' + abc_file_path)
-                total_exported_objects += len(mesh_objects)
             except Exception as e:
-                write_log('导出ABC时出错: ' + str(e))
+                write_log('处理 ' + ns + ' 时出错: ' + str(e))
                 write_log(traceback.format_exc())
-
-        except Exception as e:
-            write_log('处理 ' + ns + ' 时出错: ' + str(e))
-            write_log(traceback.format_exc())
+    finally:
+        # 导出出错时也要恢复求值模式和冻结的节点
+        eval_profile.restore()
+    batch_session.restore()
+    report.status = 'success'
 
     write_log('导出统计：总共导出 ' + str(total_exported_objects) + ' 个对象，共 ' + str(len(found_cache_groups)) + ' 个命名空间')
     update_progress(100, '所有ABC导出完成！')
@@ -499,14 +729,22 @@ try:
 
 except Exception as e:
     error_trace = traceback.format_exc()
-    write_log('发生错误: ' + str(e) + '\n' + error_trace)
+    logger.error('发生错误: ' + str(e) + '\n' + error_trace)
     sys.stderr.write('错误: ' + str(e) + '\n' + error_trace + '\n')
+    if report:
+        report.status = 'failed'
     sys.exit(1)
 finally:
-    write_log('关闭Maya独立模式...')
+    if report:
+        try:
+            report.write(report_file)
+        except Exception as report_error:
+            write_log('写入导出报告时出错: ' + str(report_error))
+    logger.stage('关闭Maya独立模式')
     # 关闭Maya
     try:
         maya.standalone.uninitialize()
         write_log('Maya独立模式已关闭')
     except:
-        write_log('关闭Maya时出错') 
\ No newline at end of file
+        write_log('关闭Maya时出错')
+    logger.close() 
\ No newline at end of file
@@ -0,0 +1,334 @@
+# -*- coding: utf-8 -*-
+#abcMerge.py
+
+"""
+按帧范围分片导出ABC，以及分片文件的合并。
+
+长镜头可以把帧范围拆成K段，由K个mayapy进程并行导出，每段前面带少量预卷帧
+（只计算不写入，保证动力学/运动模糊在分段边界处正确），最后把分片合并为一个ABC。
+
+合并不需要Maya：
+    1. 优先使用Alembic Python模块（alembic）逐对象复制采样；
+    2. 没有Python模块时使用Alembic自带的abcstitcher命令行工具。
+"""
+
+import os
+import re
+import subprocess
+
+
+# 分片文件名: <命名空间>.part00.abc
+CHUNK_SUFFIX_PATTERN = re.compile(r'^(.*)\.part(\d+)\.abc$')
+
+# 合并时认为是同一时间采样的误差
+TIME_EPSILON = 1e-6
+
+# 每段至少的帧数：只有一帧的分片文件使用常量时间采样，合并时无法确定它的时间
+MIN_CHUNK_FRAMES = 2
+
+
+def split_frame_range(start_frame, end_frame, count, handles=0):
+    """把帧范围拆分为连续且不重叠的若干段。
+
+    每段至少MIN_CHUNK_FRAMES帧，帧数不足时减少分段数量。
+
+    Args:
+        start_frame (float): 起始帧
+        end_frame (float): 结束帧
+        count (int): 分段数量
+        handles (int): 每段（第一段除外）前面的预卷帧数
+
+    Returns:
+        (list): [(起始帧, 结束帧, 预卷起始帧), ...]
+    """
+    start = int(round(start_frame))
+    end = int(round(end_frame))
+    total = end - start + 1
+    count = max(1, min(int(count), total // MIN_CHUNK_FRAMES))
+    base, remainder = divmod(total, count)
+
+    ranges = []
+    chunk_start = start
+    for i in range(count):
+        size = base + (1 if i < remainder else 0)
+        chunk_end = chunk_start + size - 1
+        preroll = chunk_start if i == 0 else max(start, chunk_start - handles)
+        ranges.append((chunk_start, chunk_end, preroll))
+        chunk_start = chunk_end + 1
+    return ranges
+
+
+def chunk_suffix(index):
+    """分片输出文件名后缀。"""
+    return '.part%02d' % index
+
+
+def find_chunk_groups(folder):
+    """查找目录中的分片文件并按目标文件分组。
+
+    Returns:
+        (dict): {合并后的文件路径: [按序号排序的分片文件路径]}
+    """
+    groups = {}
+    for file_name in os.listdir(folder):
+        match = CHUNK_SUFFIX_PATTERN.match(file_name)
+        if not match:
+            continue
+        target = os.path.join(folder, match.group(1) + '.abc')
+        groups.setdefault(target, []).append((int(match.group(2)), os.path.join(folder, file_name)))
+    return dict((target, [path for _, path in sorted(chunks)]) for target, chunks in groups.items())
+
+
+def find_stitcher():
+    """在PATH中查找abcstitcher命令行工具。"""
+    names = ['abcstitcher', 'AbcStitcher']
+    if os.name == 'nt':
+        names = [name + '.exe' for name in names]
+    for folder in os.environ.get('PATH', '').split(os.pathsep):
+        for name in names:
+            path = os.path.join(folder, name)
+            if os.path.isfile(path):
+                return path
+    return None
+
+
+def merge_chunks(chunk_files, output_file, log=None):
+    """把按帧范围导出的分片ABC合并为一个文件。
+
+    Args:
+        chunk_files (str list): 按时间顺序排列的分片文件
+        output_file (str): 合并后的文件路径
+        log (callable): 日志函数
+
+    Returns:
+        (str): 使用的合并方式，'alembic'、'abcstitcher'，只有一个分片时为'rename'
+
+    Raises:
+        RuntimeError: 没有可用的合并方式
+    """
+    # 先删除旧文件，旧文件可能是去重仓库的硬链接
+    if os.path.exists(output_file):
+        os.remove(output_file)
+
+    if len(chunk_files) == 1:
+        os.rename(chunk_files[0], output_file)
+        return 'rename'
+
+    try:
+        import alembic
+    except ImportError:
+        alembic = None
+
+    if alembic is not None:
+        if log:
+            log('使用Alembic Python模块合并 %d 个分片: %s' % (len(chunk_files), output_file))
+        _merge_with_alembic(chunk_files, output_file, log)
+        method = 'alembic'
+    else:
+        stitcher = find_stitcher()
+        if not stitcher:
+            raise RuntimeError('未找到Alembic Python模块或abcstitcher，无法合并分片: %s' % output_file)
+        if log:
+            log('使用abcstitcher合并 %d 个分片: %s' % (len(chunk_files), output_file))
+        subprocess.check_call([stitcher, output_file] + list(chunk_files))
+        method = 'abcstitcher'
+
+    for chunk_file in chunk_files:
+        os.remove(chunk_file)
+    return method
+
+
+def _merge_with_alembic(chunk_files, output_file, log=None):
+    """使用Alembic Python模块合并分片。
+
+    AbcExport导出的缓存只包含Xform和PolyMesh（以及可见性属性），逐对象按时间复制采样，
+    分片之间时间重复的采样只保留一次。其他类型的对象只保留层级。
+    """
+    from alembic import Abc
+
+    archives = [Abc.IArchive(path) for path in chunk_files]
+    out_archive = Abc.OArchive(output_file, asOgawa=True)
+    merger = _AlembicMerger(out_archive, log)
+    for child_index in range(archives[0].getTop().getNumChildren()):
+        sources = [archive.getTop().getChild(child_index) for archive in archives]
+        merger.copy_object(sources, out_archive.getTop())
+    # OArchive在释放时才写入文件尾
+    del merger
+    del out_archive
+
+
+class _AlembicMerger(object):
+    """按对象复制多个分片中的采样。"""
+
+    def __init__(self, out_archive, log=None):
+        self.out_archive = out_archive
+        self.log = log
+        self._time_sampling_indices = {}
+
+    def _time_sampling_index(self, time_sampling):
+        """为分片的均匀采样创建（或复用）合并后的时间采样。"""
+        time_per_cycle = time_sampling.getTimeSamplingType().getTimePerCycle()
+        start_time = time_sampling.getSampleTime(0)
+        key = (round(time_per_cycle, 9), round(start_time, 9))
+        if key not in self._time_sampling_indices:
+            from alembic import Abc
+            self._time_sampling_indices[key] = self.out_archive.addTimeSampling(
+                Abc.TimeSampling(time_per_cycle, start_time))
+        return self._time_sampling_indices[key]
+
+    @staticmethod
+    def _sampling_schema(schemas):
+        """返回第一个有多个采样的分片，它的时间采样决定合并后的起始时间和帧间隔。
+
+        只有一个采样的分片使用常量时间采样，不能作为合并后的时间采样；
+        所有分片都只有一个采样时返回None，合并结果为静态对象。
+        """
+        for schema in schemas:
+            if schema.getNumSamples() > 1:
+                return schema
+        return None
+
+    @staticmethod
+    def _iter_samples(schemas):
+        """按时间顺序遍历所有动画分片的采样，跳过与前一分片重复的时间。
+
+        只有一个采样的分片没有有效的采样时间，跳过。
+
+        Yields:
+            (tuple): (schema, 采样序号)
+        """
+        last_time = None
+        for schema in schemas:
+            if schema.getNumSamples() <= 1:
+                continue
+            time_sampling = schema.getTimeSampling()
+            for index in range(schema.getNumSamples()):
+                sample_time = time_sampling.getSampleTime(index)
+                if last_time is not None and sample_time <= last_time + TIME_EPSILON:
+                    continue
+                last_time = sample_time
+                yield schema, index
+
+    def copy_object(self, sources, out_parent):
+        from alembic import AbcGeom
+
+        name = sources[0].getName()
+        metadata = sources[0].getMetaData()
+        if AbcGeom.IPolyMesh.matches(metadata):
+            out_object = self._copy_mesh(sources, out_parent, name)
+        elif AbcGeom.IXform.matches(metadata):
+            out_object = self._copy_xform(sources, out_parent, name)
+        else:
+            from alembic import Abc
+            if self.log:
+                self.log('警告: 合并时不支持的对象类型，只保留层级: %s' % sources[0].getFullName())
+            out_object = Abc.OObject(out_parent, name)
+
+        self._copy_visibility(sources, out_object)
+
+        for child_index in range(sources[0].getNumChildren()):
+            child_sources = [source.getChild(child_index) for source in sources]
+            self.copy_object(child_sources, out_object)
+        return out_object
+
+    def _copy_xform(self, sources, out_parent, name):
+        from alembic import Abc, AbcGeom
+
+        schemas = [AbcGeom.IXform(source, Abc.WrapExistingFlag.kWrapExisting).getSchema()
+                   for source in sources]
+        out_xform = AbcGeom.OXform(out_parent, name)
+        out_schema = out_xform.getSchema()
+        sampling_schema = self._sampling_schema(schemas)
+        if sampling_schema is None:
+            out_schema.set(schemas[0].getValue(Abc.ISampleSelector(0)))
+            return out_xform
+        out_schema.setTimeSampling(self._time_sampling_index(sampling_schema.getTimeSampling()))
+        for schema, index in self._iter_samples(schemas):
+            out_schema.set(schema.getValue(Abc.ISampleSelector(index)))
+        return out_xform
+
+    def _copy_mesh(self, sources, out_parent, name):
+        from alembic import Abc, AbcGeom
+
+        schemas = [AbcGeom.IPolyMesh(source, Abc.WrapExistingFlag.kWrapExisting).getSchema()
+                   for source in sources]
+        out_mesh = AbcGeom.OPolyMesh(out_parent, name)
+        out_schema = out_mesh.getSchema()
+
+        first = schemas[0]
+        sampling_schema = self._sampling_schema(schemas)
+        if sampling_schema is None:
+            samples = [(first, 0)]
+        else:
+            out_schema.setTimeSampling(self._time_sampling_index(sampling_schema.getTimeSampling()))
+            samples = self._iter_samples(schemas)
+
+        for schema, index in samples:
+            selector = Abc.ISampleSelector(index)
+            sample = schema.getValue(selector)
+            out_sample = AbcGeom.OPolyMeshSchemaSample(
+                sample.getPositions(), sample.getFaceIndices(), sample.getFaceCounts())
+            uvs = self._geom_param_sample(schema.getUVsParam(), selector, AbcGeom.OV2fGeomParamSample)
+            if uvs is not None:
+                out_sample.setUVs(uvs)
+            normals = self._geom_param_sample(schema.getNormalsParam(), selector, AbcGeom.ON3fGeomParamSample)
+            if normals is not None:
+                out_sample.setNormals(normals)
+            out_schema.set(out_sample)
+
+        # 面集（材质分配）在整个时间范围内不变，取第一个分片
+        for face_set_name in first.getFaceSetNames():
+            faces = first.getFaceSet(face_set_name).getSchema().getValue().getFaces()
+            out_schema.createFaceSet(face_set_name).getSchema().set(
+                AbcGeom.OFaceSetSchemaSample(faces))
+
+        self._copy_uv_sets(first, out_schema)
+        return out_mesh
+
+    @staticmethod
+    def _geom_param_sample(param, selector, sample_class):
+        if not param or not param.valid():
+            return None
+        if param.isIndexed():
+            value = param.getIndexedValue(selector)
+            return sample_class(value.getVals(), value.getIndices(), param.getScope())
+        value = param.getExpandedValue(selector)
+        return sample_class(value.getVals(), param.getScope())
+
+    def _copy_uv_sets(self, schema, out_schema):
+        """复制额外的UV集（-writeUVSets写入arbGeomParams），取第一个分片的静态值。"""
+        from alembic import Abc, AbcGeom
+
+        arb_params = schema.getArbGeomParams()
+        if not arb_params or not arb_params.valid():
+            return
+        out_arb_params = None
+        for index in range(arb_params.getNumProperties()):
+            header = arb_params.getPropertyHeader(index)
+            if not AbcGeom.IV2fGeomParam.matches(header):
+                if self.log:
+                    self.log('警告: 合并时跳过不支持的arbGeomParam: %s' % header.getName())
+                continue
+            if out_arb_params is None:
+                out_arb_params = out_schema.getArbGeomParams()
+            param = AbcGeom.IV2fGeomParam(arb_params, header.getName())
+            out_param = AbcGeom.OV2fGeomParam(out_arb_params, header.getName(),
+                                              param.isIndexed(), param.getScope(), 1)
+            out_param.set(self._geom_param_sample(param, Abc.ISampleSelector(0),
+                                                  AbcGeom.OV2fGeomParamSample))
+
+    def _copy_visibility(self, sources, out_object):
+        from alembic import Abc, AbcGeom
+
+        properties = [AbcGeom.GetVisibilityProperty(source) for source in sources]
+        if not properties[0] or not properties[0].valid():
+            return
+        sampling_property = self._sampling_schema(properties)
+        if sampling_property is None:
+            out_property = AbcGeom.CreateVisibilityProperty(out_object, 0)
+            out_property.setValue(properties[0].getValue(Abc.ISampleSelector(0)))
+            return
+        out_property = AbcGeom.CreateVisibilityProperty(
+            out_object, self._time_sampling_index(sampling_property.getTimeSampling()))
+        for prop, index in self._iter_samples(properties):
+            out_property.setValue(prop.getValue(Abc.ISampleSelector(index)))
@@ -0,0 +1,248 @@
+# -*- coding: utf-8 -*-
+#abcValidate.py
+
+"""
+不需要Maya的ABC校验与统计。
+
+导出进程返回0并不代表ABC完整可用（写入中断、上传截断等）。这里直接读取导出的文件：
+    1. 有Alembic Python模块（alembic）时用IArchive遍历对象和时间采样；
+    2. 没有时直接解析Ogawa文件头和索引，检查文件是否正常关闭、所有偏移是否在文件范围内，
+       并读取对象层级和时间采样表。
+检查对象数量、采样数是否与帧范围一致以及起始时间，返回每个文件的统计信息。
+"""
+
+import os
+import struct
+
+
+OGAWA_MAGIC = b'Ogawa'
+OGAWA_HEADER_SIZE = 16
+# Ogawa中子节点偏移的最高位表示数据节点
+DATA_FLAG = 0x8000000000000000
+EMPTY_DATA = DATA_FLAG
+
+# AbcCoreOgawa根组的子节点
+ROOT_TOP_OBJECT = 2
+ROOT_TIME_SAMPLINGS = 4
+ROOT_MIN_CHILDREN = 6
+# 对象头数据末尾的属性/子对象哈希
+OBJECT_HEADER_HASH_SIZE = 32
+
+# 起始时间比较误差（帧）
+FRAME_TOLERANCE = 1e-3
+
+
+class OgawaError(Exception):
+    """Ogawa结构损坏。"""
+
+
+class _OgawaReader(object):
+    """只读取校验需要的Ogawa结构。"""
+
+    def __init__(self, f, size):
+        self.f = f
+        self.size = size
+        self.groups = 0
+
+    def _read(self, pos, length):
+        if pos < 0 or pos + length > self.size:
+            raise OgawaError('偏移超出文件范围: %d (文件大小 %d)' % (pos, self.size))
+        self.f.seek(pos)
+        data = self.f.read(length)
+        if len(data) != length:
+            raise OgawaError('读取不完整: %d' % pos)
+        return data
+
+    def _uint64(self, pos):
+        return struct.unpack('<Q', self._read(pos, 8))[0]
+
+    def header(self):
+        """返回(是否已正常关闭, 版本, 根组偏移)。"""
+        data = self._read(0, OGAWA_HEADER_SIZE)
+        if data[:5] != OGAWA_MAGIC:
+            raise OgawaError('不是Ogawa格式的ABC文件')
+        frozen = data[5:6] == b'\xff'
+        version = struct.unpack('<H', data[6:8])[0]
+        root = struct.unpack('<Q', data[8:16])[0]
+        return frozen, version, root
+
+    def group(self, pos):
+        """读取组的子节点偏移列表。"""
+        if pos == 0:
+            return []
+        count = self._uint64(pos)
+        if count > (self.size - pos) // 8:
+            raise OgawaError('组的子节点数量异常: %d' % pos)
+        self.groups += 1
+        if not count:
+            return []
+        return list(struct.unpack('<%dQ' % count, self._read(pos + 8, 8 * count)))
+
+    def data(self, child):
+        """读取数据节点内容。"""
+        pos = child & ~DATA_FLAG
+        if child == EMPTY_DATA or pos == 0:
+            return b''
+        length = self._uint64(pos)
+        return self._read(pos + 8, length)
+
+    @staticmethod
+    def is_data(child):
+        return bool(child & DATA_FLAG)
+
+
+def _parse_time_samplings(data):
+    """解析时间采样表: uint32最大采样数, float64周期, uint32时间数, float64时间..."""
+    samplings = []
+    pos = 0
+    while pos < len(data):
+        if pos + 16 > len(data):
+            raise OgawaError('时间采样数据不完整')
+        max_samples, time_per_cycle, count = struct.unpack('<IdI', data[pos:pos + 16])
+        pos += 16
+        if pos + 8 * count > len(data):
+            raise OgawaError('时间采样数据不完整')
+        times = struct.unpack('<%dd' % count, data[pos:pos + 8 * count])
+        pos += 8 * count
+        samplings.append({'time_per_cycle': time_per_cycle,
+                          'start_time': times[0] if times else 0.0,
+                          'max_samples': max_samples})
+    return samplings
+
+
+def _count_object_headers(data):
+    """对象头: uint32名称长度, 名称, uint8元数据索引(0xff时后跟uint32长度和元数据)。"""
+    count = 0
+    pos = 0
+    end = len(data) - OBJECT_HEADER_HASH_SIZE
+    while pos < end:
+        name_size = struct.unpack('<I', data[pos:pos + 4])[0]
+        pos += 4 + name_size
+        metadata_index = ord(data[pos:pos + 1])
+        pos += 1
+        if metadata_index == 0xff:
+            metadata_size = struct.unpack('<I', data[pos:pos + 4])[0]
+            pos += 4 + metadata_size
+        count += 1
+    if pos != end:
+        raise OgawaError('对象头数据异常')
+    return count
+
+
+def _walk_objects(reader, pos):
+    """递归统计对象数量：子节点0为属性，最后一个数据节点为子对象头，中间为子对象。"""
+    children = reader.group(pos)
+    if not children or not reader.is_data(children[-1]):
+        return 0
+    count = _count_object_headers(reader.data(children[-1]))
+    if count != len(children) - 2:
+        raise OgawaError('子对象数量与对象头不一致')
+    # 属性组只检查偏移范围
+    if children[0] and not reader.is_data(children[0]):
+        reader.group(children[0])
+    total = count
+    for child in children[1:-1]:
+        if reader.is_data(child):
+            raise OgawaError('对象层级结构异常')
+        total += _walk_objects(reader, child)
+    return total
+
+
+def read_ogawa_stats(file_path):
+    """直接解析Ogawa文件，返回对象数量和时间采样表。"""
+    size = os.path.getsize(file_path)
+    with open(file_path, 'rb') as f:
+        reader = _OgawaReader(f, size)
+        frozen, version, root = reader.header()
+        if not frozen:
+            raise OgawaError('文件未正常关闭（写入中断）')
+        root_children = reader.group(root)
+        if len(root_children) < ROOT_MIN_CHILDREN:
+            raise OgawaError('根组结构异常')
+        samplings = _parse_time_samplings(reader.data(root_children[ROOT_TIME_SAMPLINGS]))
+        objects = _walk_objects(reader, root_children[ROOT_TOP_OBJECT])
+    return {'objects': objects, 'time_samplings': samplings, 'ogawa_version': version}
+
+
+def read_alembic_stats(file_path):
+    """使用Alembic Python模块读取对象数量和时间采样表。"""
+    from alembic import Abc
+
+    archive = Abc.IArchive(file_path)
+
+    def count(obj):
+        return sum(1 + count(obj.getChild(i)) for i in range(obj.getNumChildren()))
+
+    samplings = []
+    for index in range(archive.getNumTimeSamplings()):
+        time_sampling = archive.getTimeSampling(index)
+        samplings.append({
+            'time_per_cycle': time_sampling.getTimeSamplingType().getTimePerCycle(),
+            'start_time': time_sampling.getSampleTime(0),
+            'max_samples': archive.getMaxNumSamplesForTimeSamplingIndex(index),
+        })
+    return {'objects': count(archive.getTop()), 'time_samplings': samplings}
+
+
+def validate_file(file_path, frame_range=None):
+    """校验一个ABC文件。
+
+    Args:
+        file_path (str): ABC文件路径
+        frame_range (tuple): 期望的(起始帧, 结束帧)，起止相同表示静态单帧文件，None表示不检查
+
+    Returns:
+        (dict): file, size, reader, objects, time_samplings, errors；errors为空表示通过
+    """
+    stats = {'file': file_path, 'size': 0, 'reader': None, 'objects': None,
+             'time_samplings': [], 'errors': []}
+    if not os.path.isfile(file_path):
+        stats['errors'].append('文件不存在')
+        return stats
+    stats['size'] = os.path.getsize(file_path)
+    if stats['size'] < OGAWA_HEADER_SIZE:
+        stats['errors'].append('文件过小')
+        return stats
+
+    try:
+        import alembic
+        stats['reader'] = 'alembic'
+        reader = read_alembic_stats
+    except ImportError:
+        stats['reader'] = 'ogawa'
+        reader = read_ogawa_stats
+
+    try:
+        stats.update(reader(file_path))
+    except Exception as e:
+        stats['errors'].append('读取失败: %s' % str(e))
+        return stats
+
+    if not stats['objects']:
+        stats['errors'].append('没有任何对象')
+    if frame_range is not None:
+        stats['errors'].extend(_check_samples(stats['time_samplings'], frame_range))
+    return stats
+
+
+def _check_samples(samplings, frame_range):
+    start_frame, end_frame = frame_range
+    expected = int(round(end_frame - start_frame)) + 1
+    max_samples = max([sampling['max_samples'] for sampling in samplings] or [0])
+    if expected <= 1:
+        if max_samples > 1:
+            return ['静态文件包含 %d 个采样' % max_samples]
+        return []
+
+    # AbcExport为导出帧范围创建一个均匀时间采样，周期为1/fps
+    for sampling in samplings:
+        if sampling['max_samples'] != expected or sampling['time_per_cycle'] <= 0:
+            continue
+        start = sampling['start_time'] / sampling['time_per_cycle']
+        if abs(start - start_frame) > FRAME_TOLERANCE:
+            return ['起始帧不符: %.3f (期望 %s)' % (start, start_frame)]
+        return []
+    if max_samples <= 1:
+        # 所有对象都没有动画时AbcExport只写一个采样
+        return []
+    return ['采样数不符: 最多 %d 个采样 (期望 %d 帧)' % (max_samples, expected)]
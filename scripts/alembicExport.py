@@ -22,7 +22,7 @@ class BaseExport(object):
     
     def setFramerange(self, min=None, max=None):
         """Sets and returns the framerange."""
-        if min or max is None:
+        if min is None or max is None:
             min = cmds.playbackOptions(q=1, min=1)
             max = cmds.playbackOptions(q=1, max=1)
             self.framerange = '{0} {1}'.format(min, max)
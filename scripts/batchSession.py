@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+#batchSession.py
+
+"""
+无界面批量导出的会话设置。
+
+mayapy中撤销队列默认开启，材质指定、光滑等操作都会被记录，构造历史也会保留在场景中，
+内存随编辑次数增长。批量会话期间关闭撤销队列（同时清空已有记录）和默认的构造历史，
+并暂停视口刷新，结束后恢复原设置。
+"""
+
+import maya.cmds as cmds
+
+
+# 当前是否处于批量会话中，供材质工具等模块跳过撤销块和强制刷新
+_active_sessions = 0
+
+
+def _print_log(message):
+    print(message)
+
+
+def is_active():
+    """是否处于批量会话中。"""
+    return _active_sessions > 0
+
+
+class BatchSession(object):
+    """批量会话设置，可作为with语句的上下文管理器使用。"""
+
+    def __init__(self, undo=False, history=False, refresh=False, log=None):
+        """Constructor.
+
+        Args:
+            undo (bool): 是否保留撤销队列
+            history (bool): 是否保留默认的构造历史（命令显式指定ch时不受影响）
+            refresh (bool): 是否保留视口刷新
+            log (callable): 日志函数
+        """
+        self.undo = undo
+        self.history = history
+        self.refresh = refresh
+        self.log = log or _print_log
+
+        self.previous_undo = None
+        self.previous_history = None
+        self.refresh_suspended = False
+        self.applied = False
+
+    def __enter__(self):
+        self.apply()
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        self.restore()
+        return False
+
+    def apply(self):
+        """关闭撤销队列、构造历史和视口刷新。"""
+        global _active_sessions
+        if self.applied:
+            return
+        self.previous_undo = cmds.undoInfo(query=True, state=True)
+        if not self.undo and self.previous_undo:
+            # state=False会清空已有的撤销记录
+            cmds.undoInfo(state=False)
+
+        self.previous_history = cmds.constructionHistory(query=True, toggle=True)
+        if not self.history and self.previous_history:
+            cmds.constructionHistory(toggle=False)
+
+        if not self.refresh:
+            try:
+                cmds.refresh(suspend=True)
+                self.refresh_suspended = True
+            except RuntimeError:
+                pass
+
+        self.applied = True
+        _active_sessions += 1
+        self.log('批量会话: 撤销队列 %s, 构造历史 %s, 视口刷新 %s' % (
+            '开启' if cmds.undoInfo(query=True, state=True) else '关闭',
+            '开启' if cmds.constructionHistory(query=True, toggle=True) else '关闭',
+            '暂停' if self.refresh_suspended else '开启'))
+
+    def restore(self):
+        """恢复原设置。"""
+        global _active_sessions
+        if not self.applied:
+            return
+        if self.refresh_suspended:
+            cmds.refresh(suspend=False)
+            self.refresh_suspended = False
+        if self.previous_history is not None:
+            cmds.constructionHistory(toggle=self.previous_history)
+        if self.previous_undo is not None:
+            cmds.undoInfo(state=self.previous_undo)
+        self.applied = False
+        _active_sessions -= 1
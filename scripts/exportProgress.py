@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+#exportProgress.py
+
+"""
+AbcExport逐帧进度上报。
+
+AbcExport的 -pythonPerFrameCallback 每导出一帧执行一次 CALLBACK_COMMAND，
+这里按时间节流后把帧级进度和导出速度(fps)写入进度文件，供批量导出界面显示。
+
+进度文件格式（与worker的update_progress一致，额外增加第三行）:
+    百分比
+    消息
+    当前帧序号 总帧数 fps
+"""
+
+import time
+
+
+# AbcExport按空格拆分job参数，回调命令中不能包含空格；#FRAME#会被替换为当前帧
+CALLBACK_COMMAND = "__import__('exportProgress').frame_tick(#FRAME#)"
+
+_current = None
+
+
+class FrameProgress(object):
+    """记录一次AbcExport导出的逐帧进度。"""
+
+    def __init__(self, progress_file, start_frame, end_frame, progress_start=0, progress_end=100,
+                 label='', log=None, write_interval=1.0, log_interval=10.0):
+        """Constructor.
+
+        Args:
+            progress_file (str): 进度文件路径
+            start_frame (float): 起始帧
+            end_frame (float): 结束帧
+            progress_start (float): 该次导出开始时的总进度百分比
+            progress_end (float): 该次导出结束时的总进度百分比
+            label (str): 显示在进度消息中的名称（如命名空间）
+            log (callable): 日志函数
+            write_interval (float): 写入进度文件的最小间隔（秒）
+            log_interval (float): 写入日志的最小间隔（秒）
+        """
+        self.progress_file = progress_file
+        self.start_frame = start_frame
+        self.end_frame = end_frame
+        self.total_frames = max(int(round(end_frame - start_frame)) + 1, 1)
+        self.progress_start = progress_start
+        self.progress_end = progress_end
+        self.label = label
+        self.log = log
+        self.write_interval = write_interval
+        self.log_interval = log_interval
+
+        self.frames_done = 0
+        self.start_time = None
+        self.last_write = 0
+        self.last_log = 0
+
+    @property
+    def fps(self):
+        if not self.start_time or self.frames_done < 2:
+            return 0.0
+        elapsed = time.time() - self.start_time
+        if elapsed <= 0:
+            return 0.0
+        return (self.frames_done - 1) / elapsed
+
+    def tick(self, frame):
+        """AbcExport每导出一帧调用一次。"""
+        now = time.time()
+        if self.start_time is None:
+            self.start_time = now
+        self.frames_done += 1
+        is_last = self.frames_done >= self.total_frames
+        if self.frames_done == 1 or is_last or now - self.last_write >= self.write_interval:
+            self.last_write = now
+            self._write(frame)
+        if self.log and (is_last or now - self.last_log >= self.log_interval):
+            self.last_log = now
+            self.log('导出进度: %s 帧 %s (%d/%d), %.1f fps' % (
+                self.label, frame, self.frames_done, self.total_frames, self.fps))
+
+    def _write(self, frame):
+        ratio = min(float(self.frames_done) / self.total_frames, 1.0)
+        progress = self.progress_start + (self.progress_end - self.progress_start) * ratio
+        message = '正在导出 %s: 帧 %s (%d/%d) %.1f fps' % (
+            self.label, frame, self.frames_done, self.total_frames, self.fps)
+        try:
+            with open(self.progress_file, 'w') as f:
+                # 确保message是str类型
+                try:
+                    if isinstance(message, unicode):
+                        message = message.encode('utf-8')
+                except NameError:
+                    pass
+                f.write(str(int(progress)) + '\n' + str(message) + '\n' +
+                        '%d %d %.2f' % (self.frames_done, self.total_frames, self.fps))
+        except (IOError, OSError):
+            pass
+
+
+def begin(progress_file, start_frame, end_frame, progress_start=0, progress_end=100, label='', log=None):
+    """开始一次导出的逐帧进度记录，返回FrameProgress对象。"""
+    global _current
+    _current = FrameProgress(progress_file, start_frame, end_frame,
+                             progress_start=progress_start, progress_end=progress_end,
+                             label=label, log=log)
+    return _current
+
+
+def frame_tick(frame):
+    """CALLBACK_COMMAND调用的入口。"""
+    if _current is not None:
+        _current.tick(frame)
+
+
+def end():
+    """结束当前进度记录，返回FrameProgress对象（没有则返回None）。"""
+    global _current
+    progress, _current = _current, None
+    return progress
@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+#exportReport.py
+
+"""
+导出任务报告。
+
+worker把每个命名空间的导出帧数、耗时、fps以及求值设置写入export_report.json，
+方便按项目比较DG与并行求值的导出速度。并行导出时每个进程写一份，由界面合并。
+"""
+
+import json
+import os
+import time
+
+
+REPORT_FILE_NAME = 'export_report.json'
+
+
+class ExportReport(object):
+    """一次导出任务的报告。"""
+
+    def __init__(self, maya_file, label=''):
+        """Constructor.
+
+        Args:
+            maya_file (str): 导出的Maya文件
+            label (str): 并行导出时的进程名称（分片/分组）
+        """
+        self.maya_file = maya_file
+        self.label = label
+        self.start_time = time.time()
+        self.eval_profile = None
+        self.scene_prune = None
+        self.shader_checks = []
+        self.exports = []
+        self.status = 'running'
+
+    def add_export(self, namespace, file_path, frame_range, frames, seconds, fps, objects):
+        """记录一个ABC文件的导出结果。"""
+        self.exports.append({
+            'namespace': namespace,
+            'file': file_path,
+            'frame_range': list(frame_range),
+            'frames': frames,
+            'seconds': round(seconds, 3),
+            'fps': round(fps, 2),
+            'objects': objects,
+            'label': self.label,
+        })
+
+    def add_shader_check(self, namespace, stats):
+        """记录一个命名空间的材质预检查结果（已符合要求/两步法/多材质的模型数量）。"""
+        entry = {'namespace': namespace, 'label': self.label}
+        entry.update(stats)
+        self.shader_checks.append(entry)
+
+    def to_dict(self):
+        return {
+            'maya_file': self.maya_file,
+            'status': self.status,
+            'seconds': round(time.time() - self.start_time, 3),
+            'eval_profile': self.eval_profile,
+            'scene_prune': self.scene_prune,
+            'shader_checks': self.shader_checks,
+            'exports': self.exports,
+        }
+
+    def write(self, report_file):
+        _write_json(report_file, self.to_dict())
+
+
+def _write_json(report_file, data):
+    # 使用ASCII转义，避免Python 2中str/unicode混用时的编码问题
+    with open(report_file, 'w') as f:
+        json.dump(data, f, indent=2)
+
+
+def update_report(report_file, key, value):
+    """在已写入的报告中增加一项（例如导出后的去重统计），报告不存在时忽略。"""
+    if not os.path.exists(report_file):
+        return False
+    try:
+        with open(report_file, 'r') as f:
+            data = json.load(f)
+    except (IOError, OSError, ValueError):
+        return False
+    data[key] = value
+    _write_json(report_file, data)
+    return True
+
+
+def merge_reports(report_files, output_file):
+    """合并并行导出进程的报告，合并后删除各进程的报告文件。
+
+    Returns:
+        (dict): 合并后的报告，没有可读取的报告时返回None
+    """
+    reports = []
+    for report_file in report_files:
+        if not os.path.exists(report_file):
+            continue
+        try:
+            with open(report_file, 'r') as f:
+                reports.append(json.load(f))
+        except (IOError, OSError, ValueError):
+            continue
+        os.remove(report_file)
+    if not reports:
+        return None
+
+    statuses = set(report.get('status') for report in reports)
+    merged = {
+        'maya_file': reports[0].get('maya_file'),
+        'status': 'success' if statuses == set(['success']) else 'failed',
+        # 并行进程的总耗时取最长的一个
+        'seconds': max(report.get('seconds', 0) for report in reports),
+        'eval_profile': reports[0].get('eval_profile'),
+        'scene_prune': [report.get('scene_prune') for report in reports],
+        'shader_checks': [check for report in reports for check in report.get('shader_checks', [])],
+        'exports': [export for report in reports for export in report.get('exports', [])],
+        'workers': len(reports),
+    }
+    _write_json(output_file, merged)
+    return merged
@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+#meshPreprocess.py
+
+"""
+导出前的模型预处理阶段（多边形光滑、三角化）。
+
+先一次性找出所有符合条件的mesh形状节点，再按批次调用polySmooth/polyTriangulate，
+并记录每个阶段的耗时。
+"""
+
+import time
+
+import maya.cmds as cmds
+import maya.api.OpenMaya as om
+
+
+def _print_log(message):
+    print(message)
+
+
+def collect_mesh_shapes(mesh_objects):
+    """一次性获取模型对象下所有非中间对象的mesh形状节点。
+
+    Args:
+        mesh_objects (str list): 模型transform节点（完整路径）
+
+    Returns:
+        (str list): 去重后的mesh形状节点完整路径
+    """
+    if not mesh_objects:
+        return []
+    shapes = cmds.listRelatives(mesh_objects, shapes=True, fullPath=True,
+                                noIntermediate=True, type='mesh') or []
+    # 父子模型同时传入时可能返回重复路径，只处理一次
+    unique_shapes = []
+    seen = set()
+    for shape in shapes:
+        if shape not in seen:
+            seen.add(shape)
+            unique_shapes.append(shape)
+    return unique_shapes
+
+
+def split_by_history(shapes):
+    """按是否有上游历史（变形器等）将形状节点分为两组。
+
+    有历史的模型（如蒙皮角色）必须保留构建历史，否则变形动画会丢失；
+    没有历史的静态模型可以不产生任何历史节点。
+
+    Args:
+        shapes (str list): mesh形状节点
+
+    Returns:
+        (tuple): (有历史的形状节点列表, 无历史的形状节点列表)
+    """
+    with_history = []
+    without_history = []
+    if not shapes:
+        return with_history, without_history
+
+    selection = om.MSelectionList()
+    for shape in shapes:
+        selection.add(shape)
+    for i, shape in enumerate(shapes):
+        node = om.MFnDependencyNode(selection.getDependNode(i))
+        if node.findPlug('inMesh', False).isDestination:
+            with_history.append(shape)
+        else:
+            without_history.append(shape)
+    return with_history, without_history
+
+
+def smooth_shapes(with_history, without_history, divisions):
+    """批量光滑模型，静态模型不保留历史。
+
+    Returns:
+        (int): 光滑的形状节点数量
+    """
+    options = {
+        'divisions': divisions,
+        'keepBorder': True,  # 保持边界
+        'keepHardEdge': False,
+        'keepMapBorders': True,  # 保持UV边界
+    }
+    if without_history:
+        cmds.polySmooth(without_history, ch=False, **options)
+    if with_history:
+        # 变形模型的光滑节点必须留在历史中才能跟随动画
+        cmds.polySmooth(with_history, ch=True, **options)
+    return len(with_history) + len(without_history)
+
+
+def triangulate_shapes(with_history, without_history):
+    """批量三角化模型，静态模型不保留历史。
+
+    Returns:
+        (int): 三角化的形状节点数量
+    """
+    if without_history:
+        cmds.polyTriangulate(without_history, ch=False)
+    if with_history:
+        cmds.polyTriangulate(with_history, ch=True)
+    return len(with_history) + len(without_history)
+
+
+def run_preprocess(mesh_objects, smooth_divisions=0, triangulate=False, log=None):
+    """对一组模型执行预处理，并返回各阶段耗时。
+
+    Args:
+        mesh_objects (str list): 模型transform节点
+        smooth_divisions (int): 光滑层数，0表示不光滑
+        triangulate (bool): 是否三角化
+        log (callable): 日志函数，默认使用print
+
+    Returns:
+        (dict): 处理数量与每个阶段的耗时（秒）
+    """
+    log = log or _print_log
+    stats = {'shapes': 0, 'smoothed': 0, 'triangulated': 0, 'timings': {}}
+    if not smooth_divisions and not triangulate:
+        return stats
+
+    start = time.time()
+    shapes = collect_mesh_shapes(mesh_objects)
+    with_history, without_history = split_by_history(shapes)
+    stats['shapes'] = len(shapes)
+    stats['timings']['collect'] = time.time() - start
+    log('预处理: 找到 %d 个mesh形状节点 (有历史: %d, 无历史: %d), 耗时 %.2f 秒' % (
+        len(shapes), len(with_history), len(without_history), stats['timings']['collect']))
+
+    if smooth_divisions > 0 and shapes:
+        start = time.time()
+        stats['smoothed'] = smooth_shapes(with_history, without_history, smooth_divisions)
+        stats['timings']['smooth'] = time.time() - start
+        log('预处理: 光滑 %d 个模型(层数: %d), 耗时 %.2f 秒' % (
+            stats['smoothed'], smooth_divisions, stats['timings']['smooth']))
+
+    if triangulate and shapes:
+        start = time.time()
+        stats['triangulated'] = triangulate_shapes(with_history, without_history)
+        stats['timings']['triangulate'] = time.time() - start
+        log('预处理: 三角化 %d 个模型, 耗时 %.2f 秒' % (
+            stats['triangulated'], stats['timings']['triangulate']))
+
+    return stats
@@ -8,10 +8,25 @@ import subprocess
 import tempfile
 import time
 import codecs
+import json
 import re
 import gc
+import queue
+import shutil
+import threading
+
+import abcDedup
+import abcMerge
+import abcValidate
+import exportReport
+import outputUploader
+import scenePrescan
+import shotList
 
 class ABCExportWindow(QMainWindow):
+    # 逐帧进度超过该时间没有变化时提示导出可能停滞（秒）
+    STALL_WARNING_SECONDS = 300
+    
     def __init__(self):
         super().__init__()
         self.setWindowTitle("Maya ABC批量导出工具")
@@ -21,9 +36,25 @@ class ABCExportWindow(QMainWindow):
             sys.exit(1)
         self.setup_ui()
         self.files_to_export = []  # 存储待导出的文件列表
+        self.shot_entries = None  # 镜头列表条目
         self.current_export_index = -1  # 当前正在导出的文件索引
         self.export_running = False  # 是否有导出任务正在运行
         self.shader_errors = []  # 存储材质应用错误的列表
+        self.last_frames_done = -1  # 最近一次读取到的已导出帧数
+        self.last_frame_time = time.time()
+        self.stall_warned = False
+        self.parallel_workers = []  # 并行导出时正在运行的进程
+        self.parallel_finished_callback = None
+        self.current_job = None  # 当前文件的导出任务信息
+        
+        # 后台线程（去重等）不能直接操作界面，日志先放入队列再由定时器输出
+        self.background_messages = queue.Queue()
+        self.background_timer = QTimer()
+        self.background_timer.timeout.connect(self.drain_background_messages)
+        self.background_timer.start(500)
+        self.dedup_queue = queue.Queue()
+        self.dedup_thread = None
+        self.uploader = None  # 先写入本地缓存时才创建上传线程池
         
     def _find_maya_path(self):
         """查找Maya安装路径"""
@@ -140,14 +171,95 @@ class ABCExportWindow(QMainWindow):
         output_layout.addWidget(self.output_input)
         output_layout.addWidget(output_btn)
         
+        # 镜头列表：按场景名匹配剪辑帧范围
+        shot_list_layout = QHBoxLayout()
+        self.shot_list_input = QLineEdit()
+        self.shot_list_input.setPlaceholderText("可选，CSV或JSON；不设置时导出场景时间轴的完整范围")
+        shot_list_btn = QPushButton("选择镜头列表")
+        shot_list_btn.clicked.connect(self.select_shot_list)
+        shot_list_layout.addWidget(QLabel("镜头列表:"))
+        shot_list_layout.addWidget(self.shot_list_input)
+        shot_list_layout.addWidget(shot_list_btn)
+        
         # 材质设置选项
         self.apply_shader_to_faces = QCheckBox("将材质指定到面上")
         self.apply_shader_to_faces.setChecked(True)
+        self.shader_plans = QCheckBox("按资产缓存材质指定方案(输出目录下的.shader_plans)")
+        self.shader_plans.setChecked(True)
+        self.apply_shader_to_faces.toggled.connect(self.shader_plans.setEnabled)
+        self.rename_shading_groups = QCheckBox("应用材质前将着色组重命名为<材质>_SG")
+        self.rename_shading_groups.setChecked(False)
+        self.apply_shader_to_faces.toggled.connect(self.rename_shading_groups.setEnabled)
         
         # 三角面选项
         self.triangulate_meshes = QCheckBox("导出前将模型转换为三角面")
         self.triangulate_meshes.setChecked(False)  # 默认不选中
         
+        # 静态模型选项
+        self.static_detect = QCheckBox("静态模型单独导出为单帧文件(*.static.abc)")
+        self.static_detect.setChecked(False)  # 默认不选中
+        
+        # 重名节点选项
+        self.resolve_names = QCheckBox("导出前重命名去掉命名空间后重名的节点")
+        self.resolve_names.setChecked(True)
+        
+        # 详细日志选项
+        self.verbose_log = QCheckBox("详细日志(逐个对象记录)")
+        self.verbose_log.setChecked(False)  # 默认只记录汇总
+        
+        # 导出时的求值设置
+        eval_layout = QHBoxLayout()
+        eval_layout.addWidget(QLabel("导出求值模式:"))
+        self.eval_mode = QComboBox()
+        for label, mode in (("并行", "parallel"), ("串行", "serial"), ("DG", "off"), ("保持场景设置", "scene")):
+            self.eval_mode.addItem(label, mode)
+        eval_layout.addWidget(self.eval_mode)
+        self.eval_prune = QCheckBox("禁用无关的动力学/图像平面/表达式节点")
+        self.eval_prune.setChecked(True)
+        eval_layout.addWidget(self.eval_prune)
+        eval_layout.addWidget(QLabel("场景精简:"))
+        self.prune_scene = QComboBox()
+        for label, mode in (("不精简", "off"), ("冻结无关节点", "freeze"), ("删除无关分支", "delete")):
+            self.prune_scene.addItem(label, mode)
+        self.prune_scene.setToolTip("导出前冻结或删除不影响cache组模型的DAG分支和变形器链")
+        eval_layout.addWidget(self.prune_scene)
+        eval_layout.addStretch()
+        
+        # 导出后校验选项
+        self.validate_outputs_check = QCheckBox("导出后校验ABC(对象数量、采样数与帧范围)")
+        self.validate_outputs_check.setChecked(True)
+        
+        # 输出去重选项
+        dedup_layout = QHBoxLayout()
+        self.dedup_outputs = QCheckBox("导出后按内容去重(相同的ABC只保存一份)")
+        self.dedup_outputs.setChecked(False)
+        dedup_layout.addWidget(self.dedup_outputs)
+        self.dedup_mode = QComboBox()
+        self.dedup_mode.addItem("硬链接", "hardlink")
+        self.dedup_mode.addItem("清单文件(.ref)", "manifest")
+        self.dedup_mode.setEnabled(False)
+        self.dedup_outputs.toggled.connect(self.dedup_mode.setEnabled)
+        dedup_layout.addWidget(self.dedup_mode)
+        dedup_layout.addStretch()
+        
+        # 本地缓存与后台上传选项
+        scratch_layout = QHBoxLayout()
+        self.use_local_scratch = QCheckBox("先写入本地缓存再后台上传")
+        self.use_local_scratch.setChecked(False)
+        scratch_layout.addWidget(self.use_local_scratch)
+        self.scratch_input = QLineEdit(os.path.join(tempfile.gettempdir(), "abc_export_scratch"))
+        self.scratch_input.setEnabled(False)
+        scratch_layout.addWidget(self.scratch_input)
+        scratch_layout.addWidget(QLabel("上传并发数:"))
+        self.upload_workers = QSpinBox()
+        self.upload_workers.setMinimum(1)
+        self.upload_workers.setMaximum(8)
+        self.upload_workers.setValue(2)
+        self.upload_workers.setEnabled(False)
+        scratch_layout.addWidget(self.upload_workers)
+        self.use_local_scratch.toggled.connect(self.scratch_input.setEnabled)
+        self.use_local_scratch.toggled.connect(self.upload_workers.setEnabled)
+        
         # 添加多边形光滑选项
         smooth_group = QGroupBox("多边形光滑")
         smooth_layout = QHBoxLayout()
@@ -170,6 +282,31 @@ class ABCExportWindow(QMainWindow):
         smooth_layout.addWidget(self.smooth_divisions)
         smooth_group.setLayout(smooth_layout)
         
+        # 帧范围分片导出选项
+        shard_group = QGroupBox("并行导出")
+        shard_layout = QHBoxLayout()
+        shard_layout.addWidget(QLabel("帧范围分片数:"))
+        self.frame_shard_count = QSpinBox()
+        self.frame_shard_count.setMinimum(1)  # 1表示不分片
+        self.frame_shard_count.setMaximum(16)
+        self.frame_shard_count.setValue(1)
+        shard_layout.addWidget(self.frame_shard_count)
+        shard_layout.addWidget(QLabel("分片预卷帧数:"))
+        self.frame_shard_handles = QSpinBox()
+        self.frame_shard_handles.setMinimum(0)
+        self.frame_shard_handles.setMaximum(100)
+        self.frame_shard_handles.setValue(5)
+        shard_layout.addWidget(self.frame_shard_handles)
+        shard_layout.addWidget(QLabel("命名空间分组数:"))
+        self.namespace_group_count = QSpinBox()
+        self.namespace_group_count.setMinimum(1)  # 1表示不分组
+        self.namespace_group_count.setMaximum(16)
+        self.namespace_group_count.setValue(1)
+        self.namespace_group_count.setToolTip("按引用拆分为多组，每组由一个mayapy进程只加载本组引用并导出，优先于帧范围分片")
+        shard_layout.addWidget(self.namespace_group_count)
+        shard_layout.addStretch()
+        shard_group.setLayout(shard_layout)
+        
         # 状态与进度区域
         status_group = QGroupBox("状态与进度")
         status_layout = QVBoxLayout()
@@ -233,10 +370,21 @@ class ABCExportWindow(QMainWindow):
         main_layout.addWidget(file_group)
         main_layout.addWidget(filter_group)
         main_layout.addLayout(output_layout)
+        main_layout.addLayout(shot_list_layout)
         main_layout.addWidget(folder_option_group)
         main_layout.addWidget(self.apply_shader_to_faces)
+        main_layout.addWidget(self.shader_plans)
+        main_layout.addWidget(self.rename_shading_groups)
         main_layout.addWidget(self.triangulate_meshes)
+        main_layout.addWidget(self.static_detect)
+        main_layout.addWidget(self.resolve_names)
+        main_layout.addWidget(self.verbose_log)
+        main_layout.addLayout(eval_layout)
+        main_layout.addWidget(self.validate_outputs_check)
+        main_layout.addLayout(dedup_layout)
+        main_layout.addLayout(scratch_layout)
         main_layout.addWidget(smooth_group)  # 添加光滑选项组
+        main_layout.addWidget(shard_group)
         main_layout.addWidget(status_group)
         main_layout.addWidget(log_group)
         main_layout.addLayout(action_layout)
@@ -252,6 +400,16 @@ class ABCExportWindow(QMainWindow):
         )
         if dir_name:
             self.output_input.setText(dir_name)
+    
+    def select_shot_list(self):
+        file_name, _ = QFileDialog.getOpenFileName(
+            self,
+            "选择镜头列表",
+            "",
+            "镜头列表 (*.csv *.json)"
+        )
+        if file_name:
+            self.shot_list_input.setText(file_name)
             
     def log(self, message):
         """添加日志到日志区域"""
@@ -290,6 +448,17 @@ class ABCExportWindow(QMainWindow):
                 QMessageBox.critical(self, "错误", f"无法创建输出目录: {str(e)}")
                 return
         
+        # 读取镜头列表
+        self.shot_entries = None
+        shot_list_path = self.shot_list_input.text().strip()
+        if shot_list_path:
+            try:
+                self.shot_entries = shotList.load_shot_list(shot_list_path)
+            except (IOError, OSError, ValueError) as e:
+                QMessageBox.critical(self, "错误", f"无法读取镜头列表: {str(e)}")
+                return
+            self.log(f"已读取镜头列表: {shot_list_path} ({len(self.shot_entries)} 个镜头)")
+        
         # 更新UI状态
         self.export_running = True
         self.export_btn.setEnabled(False)
@@ -480,40 +649,61 @@ class ABCExportWindow(QMainWindow):
                 ",".join(fbx_namespaces) if fbx_namespaces else ""  # FBX命名空间
             ]
             
-            # 完整的命令
-            cmd = [
-                mayapy, 
-                export_script_path
-            ] + cmd_args
-            
-            self.log("启动导出进程...")
-            
-            # 使用QProcess替代subprocess
-            self.process = QProcess()
-            
-            # 连接信号
-            self.process.readyReadStandardOutput.connect(self.read_process_output)
-            self.process.readyReadStandardError.connect(self.read_process_error)
-            self.process.finished.connect(self.on_process_finished)
+            # 使用本地缓存时ABC先写入本地目录，导出完成后再上传
+            export_dir = subfolder_path
+            if self.use_local_scratch.isChecked() and self.scratch_input.text():
+                export_dir = os.path.join(self.scratch_input.text(), subfolder_name, maya_file_name)
+                if os.path.exists(export_dir):
+                    shutil.rmtree(export_dir)  # 清理上次失败留下的文件
+                os.makedirs(export_dir)
             
-            # 设置环境变量
-            process_env = QProcessEnvironment()
-            for key, value in env.items():
-                process_env.insert(key, value)
-            self.process.setProcessEnvironment(process_env)
+            # 扩展参数
+            if export_dir != subfolder_path:
+                cmd_args.append(f"--export_dir={export_dir}")
+            if self.verbose_log.isChecked():
+                cmd_args.append("--verbose=true")
+            cmd_args.append(f"--eval_mode={self.eval_mode.currentData()}")
+            cmd_args.append(f"--eval_prune={str(self.eval_prune.isChecked()).lower()}")
+            cmd_args.append(f"--prune_scene={self.prune_scene.currentData()}")
+            if self.static_detect.isChecked():
+                cmd_args.append("--static_detect=true")
+            cmd_args.append(f"--resolve_names={str(self.resolve_names.isChecked()).lower()}")
+            cmd_args.append(f"--shader_plans={str(self.shader_plans.isChecked()).lower()}")
+            if self.rename_shading_groups.isChecked():
+                cmd_args.append("--rename_shading_groups=true")
             
-            # 启动进程
-            self.process.start(cmd[0], cmd[1:])
+            # 镜头列表中的剪辑范围（含手柄帧）
+            frame_range = None
+            if self.shot_entries:
+                frame_range = shotList.match_range(self.shot_entries, maya_file)
+                if frame_range:
+                    self.log(f"镜头列表帧范围: {frame_range[0]:g} - {frame_range[1]:g}")
+                    cmd_args.append(f"--frame_range={frame_range[0]:g}:{frame_range[1]:g}")
+                else:
+                    self.log(f"警告: 镜头列表中没有匹配 {maya_file_name} 的镜头，导出完整时间轴范围")
             
-            # 监控进度文件和日志文件
-            self.log("开始监控导出进度...")
-            start_time = time.time()
-            self.timer = QTimer()
-            self.timer.timeout.connect(lambda: self.check_progress(start_time, subfolder_path, progress_file, log_file))
-            self.timer.start(1000)  # 每秒检查一次
-            
-            # 进程信息记录到类变量
+            # 导出任务信息，单进程、帧范围分片和命名空间分组共用
+            job = {
+                "maya_file": maya_file,
+                "mayapy": mayapy,
+                "export_script_path": export_script_path,
+                "cmd_args": cmd_args,
+                "env": env,
+                "namespaces": namespaces,
+                "output_path": output_path,
+                "subfolder_path": subfolder_path,
+                "export_dir": export_dir,
+                "progress_file": progress_file,
+                "log_file": log_file,
+                "frame_range": frame_range,
+            }
             self.progress_file = progress_file
+            self.current_job = job
+            
+            if self.namespace_group_count.value() > 1:
+                self.start_namespace_groups(job)
+            else:
+                self.start_export_job(job)
             
         except Exception as e:
             self.log(f"导出设置失败: {str(e)}")
@@ -522,10 +712,373 @@ class ABCExportWindow(QMainWindow):
             # 继续下一个文件
             self.export_next_file()
 
-    def update_file_status(self, status, message=""):
-        """更新当前处理文件的状态"""
-        if 0 <= self.current_export_index < len(self.files_to_export):
-            file_info = self.files_to_export[self.current_export_index]
+    def start_export_job(self, job):
+        """设置了帧范围分片时并行导出各帧段，否则使用单个进程导出"""
+        frame_shards = self.plan_frame_shards(job["maya_file"], job.get("frame_range"))
+        if frame_shards:
+            self.start_frame_shards(job, frame_shards)
+        else:
+            self.start_single_worker(job)
+    
+    def start_single_worker(self, job):
+        """使用单个mayapy进程导出"""
+        progress_file = job["progress_file"]
+        log_file = job["log_file"]
+        subfolder_path = job["subfolder_path"]
+        
+        # 完整的命令
+        cmd = [
+            job["mayapy"], 
+            job["export_script_path"]
+        ] + job["cmd_args"]
+        
+        self.log("启动导出进程...")
+        
+        # 使用QProcess替代subprocess
+        self.process = QProcess()
+        
+        # 连接信号
+        self.process.readyReadStandardOutput.connect(self.read_process_output)
+        self.process.readyReadStandardError.connect(self.read_process_error)
+        self.process.finished.connect(self.on_process_finished)
+        
+        # 设置环境变量
+        process_env = QProcessEnvironment()
+        for key, value in job["env"].items():
+            process_env.insert(key, value)
+        self.process.setProcessEnvironment(process_env)
+        
+        # 启动进程
+        self.process.start(cmd[0], cmd[1:])
+        
+        # 监控进度文件和日志文件
+        self.log("开始监控导出进度...")
+        start_time = time.time()
+        self.last_frames_done = -1
+        self.last_frame_time = start_time
+        self.stall_warned = False
+        self.timer = QTimer()
+        self.timer.timeout.connect(lambda: self.check_progress(start_time, subfolder_path, progress_file, log_file))
+        self.timer.start(1000)  # 每秒检查一次
+    
+    def start_frame_shards(self, job, frame_shards):
+        """帧范围分片：多个进程并行导出同一场景的不同帧段，最后合并"""
+        # 各分片只能在自己的帧段内判断模型是否静态，分到的对象不同时分片文件无法按层级合并
+        shard_args = [arg for arg in job["cmd_args"] if not arg.startswith("--static_detect=")]
+        if len(shard_args) != len(job["cmd_args"]):
+            self.log("帧范围分片导出时不单独导出静态模型，所有模型按动画导出")
+        worker_specs = []
+        for i, (shard_start, shard_end, preroll_start) in enumerate(frame_shards):
+            worker_specs.append({
+                "label": f"分片{i + 1}",
+                "args": shard_args + [
+                    f"--frame_range={shard_start}:{shard_end}",
+                    f"--preroll_start={preroll_start}",
+                    f"--output_suffix={abcMerge.chunk_suffix(i)}",
+                ],
+                "progress_file": os.path.join(job["output_path"], f"export_progress.shard{i}.txt"),
+                "log_file": os.path.join(job["subfolder_path"], f"export_log.shard{i}.txt"),
+                "report_file": os.path.join(job["subfolder_path"], f"export_report.shard{i}.json"),
+            })
+        self.start_parallel_workers(job["mayapy"], job["export_script_path"], worker_specs, job["env"], job["log_file"],
+                                    lambda workers: self.finish_frame_shards(workers, job))
+    
+    def start_namespace_groups(self, job):
+        """命名空间分组：每个进程只加载并导出一组引用"""
+        references = scenePrescan.read_reference_namespaces(job["maya_file"])
+        if references is not None:
+            self.log(f"从场景文件头部读取到 {len(references)} 个顶层引用")
+            self.start_namespace_group_workers(job, references)
+            return
+        
+        # .mb文件需要先由mayapy读取引用列表（不加载引用）
+        self.log("读取场景引用列表...")
+        discover_file = os.path.join(job["subfolder_path"], "references.json")
+        if os.path.exists(discover_file):
+            os.remove(discover_file)
+        worker_specs = [{
+            "label": "读取引用",
+            "args": job["cmd_args"] + [f"--discover_only={discover_file}"],
+            "progress_file": os.path.join(job["output_path"], "export_progress.discover.txt"),
+            "log_file": os.path.join(job["subfolder_path"], "export_log.discover.txt"),
+        }]
+        self.start_parallel_workers(job["mayapy"], job["export_script_path"], worker_specs, job["env"], job["log_file"],
+                                    lambda workers: self.on_references_discovered(job, workers, discover_file))
+    
+    def on_references_discovered(self, job, workers, discover_file):
+        """引用列表读取完成后启动分组导出"""
+        self.collect_parallel_logs(workers, job["log_file"])
+        references = None
+        if workers[0]["exit_code"] == 0 and os.path.exists(discover_file):
+            try:
+                with codecs.open(discover_file, 'r', encoding='utf-8') as f:
+                    references = json.load(f)
+                os.remove(discover_file)
+            except (IOError, ValueError) as e:
+                self.log(f"读取引用列表失败: {str(e)}")
+        
+        try:
+            if references is None:
+                self.log("未能读取引用列表，不进行命名空间分组导出")
+                self.start_export_job(job)
+            else:
+                self.start_namespace_group_workers(job, references)
+        except Exception as e:
+            self.log(f"导出设置失败: {str(e)}")
+            self.update_file_status("failed", "设置失败")
+            self.export_next_file()
+    
+    def plan_namespace_groups(self, references, namespaces):
+        """按引用文件大小把匹配的引用均衡分配到各组
+        
+        Returns:
+            (list): 每组要加载的命名空间列表，第一组同时加载未匹配的引用并导出本地命名空间
+        """
+        group_count = self.namespace_group_count.value()
+        matched = []
+        unmatched = []
+        for ref in references:
+            if ref.get("deferred"):
+                continue  # 保存为卸载状态的引用原本就不会导出
+            if any(filter_ns in ref["namespace"] for filter_ns in namespaces):
+                matched.append(ref)
+            else:
+                unmatched.append(ref)
+        
+        if len(matched) < 2:
+            return None
+        
+        def ref_size(ref):
+            try:
+                return os.path.getsize(ref["path"])
+            except OSError:
+                return 0
+        
+        # 从大到小依次放入当前最轻的一组
+        groups = [[] for _ in range(min(group_count, len(matched)))]
+        weights = [0] * len(groups)
+        for ref in sorted(matched, key=ref_size, reverse=True):
+            lightest = weights.index(min(weights))
+            groups[lightest].append(ref["namespace"])
+            weights[lightest] += max(ref_size(ref), 1)
+        
+        # 未匹配的引用里可能有嵌套的匹配命名空间，由第一组加载
+        groups[0].extend(ref["namespace"] for ref in unmatched)
+        return groups
+    
+    def start_namespace_group_workers(self, job, references):
+        """按命名空间分组启动并行导出，分组不足两组时按原方式导出"""
+        groups = self.plan_namespace_groups(references, job["namespaces"])
+        if not groups:
+            self.log("匹配的引用不足两个，不进行命名空间分组导出")
+            self.start_export_job(job)
+            return
+        
+        self.log(f"按命名空间拆分为 {len(groups)} 组并行导出")
+        worker_specs = []
+        for i, group in enumerate(groups):
+            self.log(f"  分组{i + 1}: {', '.join(group)}")
+            args = job["cmd_args"] + [f"--load_namespaces={','.join(group)}"]
+            if i == 0:
+                args.append("--include_local_namespaces=true")
+            worker_specs.append({
+                "label": f"分组{i + 1}",
+                "args": args,
+                "progress_file": os.path.join(job["output_path"], f"export_progress.group{i}.txt"),
+                "log_file": os.path.join(job["subfolder_path"], f"export_log.group{i}.txt"),
+                "report_file": os.path.join(job["subfolder_path"], f"export_report.group{i}.json"),
+            })
+        self.start_parallel_workers(job["mayapy"], job["export_script_path"], worker_specs, job["env"], job["log_file"],
+                                    lambda workers: self.finish_namespace_groups(workers, job["log_file"]))
+    
+    def finish_namespace_groups(self, workers, log_file):
+        """所有命名空间分组导出完成"""
+        self.collect_parallel_logs(workers, log_file)
+        failed_workers = [w for w in workers if w["exit_code"] != 0]
+        exit_code = failed_workers[0]["exit_code"] if failed_workers else 0
+        self.on_process_finished(exit_code, QProcess.NormalExit)
+    
+    def plan_frame_shards(self, maya_file, frame_range=None):
+        """根据分片设置和帧范围规划帧范围分片，不分片时返回None
+        
+        Args:
+            maya_file (str): Maya文件路径
+            frame_range (tuple): 镜头列表中的帧范围，None时使用场景时间轴范围
+        """
+        shard_count = self.frame_shard_count.value()
+        if shard_count <= 1:
+            return None
+        
+        playback_range = frame_range or scenePrescan.read_playback_range(maya_file)
+        if not playback_range:
+            self.log("未能从场景文件读取时间轴范围，不进行分片导出")
+            return None
+        
+        frame_shards = abcMerge.split_frame_range(playback_range[0], playback_range[1], shard_count,
+                                                  self.frame_shard_handles.value())
+        if len(frame_shards) < shard_count:
+            self.log(f"帧范围 {playback_range[0]:g} - {playback_range[1]:g} 只有 "
+                     f"{int(round(playback_range[1])) - int(round(playback_range[0])) + 1} 帧，"
+                     f"每个分片至少 {abcMerge.MIN_CHUNK_FRAMES} 帧，分片数量从 {shard_count} 减少为 {len(frame_shards)}")
+        if len(frame_shards) <= 1:
+            return None
+        
+        self.log(f"帧范围 {playback_range[0]:g} - {playback_range[1]:g} 拆分为 {len(frame_shards)} 个分片并行导出")
+        for i, (shard_start, shard_end, preroll_start) in enumerate(frame_shards):
+            self.log(f"  分片{i + 1}: {shard_start} - {shard_end} (预卷起始帧: {preroll_start})")
+        return frame_shards
+    
+    def start_parallel_workers(self, mayapy, export_script_path, worker_specs, env, log_file, on_all_finished):
+        """并行启动多个导出进程，全部结束后调用on_all_finished(workers)
+        
+        worker_specs中每项包含: label, args, progress_file, log_file，可选report_file
+        """
+        process_env = QProcessEnvironment()
+        for key, value in env.items():
+            process_env.insert(key, value)
+        
+        self.parallel_workers = []
+        self.parallel_finished_callback = on_all_finished
+        for spec in worker_specs:
+            for path in (spec["progress_file"], spec["log_file"]):
+                if os.path.exists(path):
+                    os.remove(path)
+            
+            worker = dict(spec)
+            worker["exit_code"] = None
+            worker["args"] = spec["args"] + [
+                f"--progress_file={spec['progress_file']}",
+                f"--log_file={spec['log_file']}",
+            ]
+            if spec.get("report_file"):
+                worker["args"] += [
+                    f"--report_file={spec['report_file']}",
+                    f"--report_label={spec['label']}",
+                ]
+            process = QProcess()
+            process.readyReadStandardOutput.connect(lambda p=process: self.read_process_output(p))
+            process.readyReadStandardError.connect(lambda p=process: self.read_process_error(p))
+            process.finished.connect(lambda exit_code, exit_status, w=worker: self.on_parallel_worker_finished(w, exit_code))
+            process.setProcessEnvironment(process_env)
+            worker["process"] = process
+            self.parallel_workers.append(worker)
+        
+        for worker in self.parallel_workers:
+            self.log(f"启动导出进程: {worker['label']}")
+            worker["process"].start(mayapy, [export_script_path] + worker["args"])
+        
+        self.log("开始监控导出进度...")
+        start_time = time.time()
+        self.timer = QTimer()
+        self.timer.timeout.connect(lambda: self.check_parallel_progress(start_time, log_file))
+        self.timer.start(1000)  # 每秒检查一次
+    
+    def on_parallel_worker_finished(self, worker, exit_code):
+        """单个并行导出进程结束"""
+        worker["exit_code"] = exit_code
+        if exit_code == 0:
+            self.log(f"{worker['label']} 导出完成")
+        else:
+            self.log(f"{worker['label']} 导出进程返回错误代码: {exit_code}")
+        
+        if all(w["exit_code"] is not None for w in self.parallel_workers):
+            self.timer.stop()
+            workers = self.parallel_workers
+            self.parallel_workers = []
+            self.parallel_finished_callback(workers)
+    
+    def check_parallel_progress(self, start_time, log_file):
+        """汇总所有并行导出进程的进度和日志"""
+        if time.time() - start_time > 18000:
+            self.log("导出过程超时，中止任务")
+            for worker in self.parallel_workers:
+                if worker["process"].state() != QProcess.NotRunning:
+                    worker["process"].terminate()
+            return
+        
+        progress_values = []
+        for worker in self.parallel_workers:
+            progress = 100 if worker["exit_code"] is not None else 0
+            if worker["exit_code"] is None and os.path.exists(worker["progress_file"]):
+                try:
+                    with codecs.open(worker["progress_file"], 'r', encoding='utf-8') as f:
+                        progress = int(f.readline().strip() or 0)
+                except (IOError, ValueError):
+                    pass
+            progress_values.append(progress)
+            self.tail_log_file(worker["log_file"], worker["label"])
+        
+        if progress_values:
+            self.task_progress_bar.setValue(int(sum(progress_values) / len(progress_values)))
+            finished_count = sum(1 for w in self.parallel_workers if w["exit_code"] is not None)
+            self.current_task_label.setText(f"并行导出中: {finished_count}/{len(self.parallel_workers)} 个进程完成")
+    
+    def tail_log_file(self, log_file, prefix=""):
+        """把导出进程日志文件中新增的最后几行显示到日志区域"""
+        if not os.path.exists(log_file):
+            return
+        try:
+            with codecs.open(log_file, 'r', encoding='utf-8') as f:
+                logs = f.readlines()
+            log_text = self.log_text.toPlainText()
+            for log_line in logs[-10:]:  # 只读取最新的10行
+                line = log_line.strip()
+                if prefix and line:
+                    line = f"[{prefix}] {line}"
+                if line and line not in log_text:
+                    self.log(line)
+        except Exception as e:
+            self.log("读取日志文件时出错: %s" % str(e))
+    
+    def collect_parallel_logs(self, workers, log_file):
+        """把各并行进程的日志按顺序追加到主日志文件并删除临时文件"""
+        with codecs.open(log_file, 'a', encoding='utf-8') as out:
+            for worker in workers:
+                if os.path.exists(worker["log_file"]):
+                    with codecs.open(worker["log_file"], 'r', encoding='utf-8') as f:
+                        out.write(f"===== {worker['label']} =====\n")
+                        out.write(f.read())
+                    os.remove(worker["log_file"])
+                if os.path.exists(worker["progress_file"]):
+                    try:
+                        os.remove(worker["progress_file"])
+                    except OSError:
+                        pass
+        
+        # 合并各进程的导出报告
+        report_files = [w["report_file"] for w in workers if w.get("report_file")]
+        if report_files:
+            exportReport.merge_reports(report_files, os.path.join(os.path.dirname(log_file), exportReport.REPORT_FILE_NAME))
+    
+    def finish_frame_shards(self, workers, job):
+        """所有帧范围分片导出完成后合并分片文件"""
+        self.collect_parallel_logs(workers, job["log_file"])
+        
+        failed_workers = [w for w in workers if w["exit_code"] != 0]
+        exit_code = failed_workers[0]["exit_code"] if failed_workers else 0
+        if not failed_workers:
+            self.current_task_label.setText("正在合并分片...")
+            for target, chunk_files in abcMerge.find_chunk_groups(job["export_dir"]).items():
+                try:
+                    method = abcMerge.merge_chunks(chunk_files, target, log=self.log)
+                    self.log(f"分片合并完成({method}): {target}")
+                except Exception as e:
+                    self.log(f"合并分片时出错: {target}: {str(e)}")
+                    exit_code = 1
+                    # 合并失败时保留分片文件，便于排查或手动合并
+                    job["keep_export_dir"] = True
+        else:
+            self.log(f"存在失败的分片，保留分片文件，不进行合并: {job['export_dir']}")
+            job["keep_export_dir"] = True
+        
+        self.on_process_finished(exit_code, QProcess.NormalExit)
+    
+    def update_file_status(self, status, message="", index=None):
+        """更新当前处理文件（或指定序号的文件）的状态"""
+        if index is None:
+            index = self.current_export_index
+        if 0 <= index < len(self.files_to_export):
+            file_info = self.files_to_export[index]
             file_info["status"] = status
             row = file_info["row"]
             
@@ -589,6 +1142,10 @@ class ABCExportWindow(QMainWindow):
             if hasattr(self, 'process') and self.process.state() != QProcess.NotRunning:
                 self.process.terminate()
                 self.log("正在终止当前导出进程...")
+            for worker in self.parallel_workers:
+                if worker["process"].state() != QProcess.NotRunning:
+                    worker["process"].terminate()
+                    self.log(f"正在终止导出进程: {worker['label']}")
             
             self.status_label.setText("导出已停止")
             self.status_label.setStyleSheet("color: red;")
@@ -598,6 +1155,9 @@ class ABCExportWindow(QMainWindow):
                 self.update_file_status("failed", "用户中止")
 
     def finish_batch_export(self):
+        if self.uploader is not None and self.uploader.pending():
+            self.log(f"还有 {self.uploader.pending()} 个文件正在后台上传，上传结果会继续显示在日志中")
+        
         # 计算导出结果统计
         success_count = sum(1 for file in self.files_to_export if file["status"] == "success")
         failed_count = sum(1 for file in self.files_to_export if file["status"] == "failed" or file["status"] == "shader_error")
@@ -637,6 +1197,13 @@ class ABCExportWindow(QMainWindow):
         """处理单个文件导出进程结束事件"""
         self.timer.stop()
         
+        # 进程返回0时再检查实际写出的ABC
+        validation_error = None
+        if exit_code == 0 and self.current_job and self.validate_outputs_check.isChecked():
+            validation_error = self.validate_outputs(self.current_job)
+            if validation_error:
+                exit_code = 1
+        
         if exit_code == 0:
             self.log("文件导出成功")
             self.task_progress_bar.setValue(100)
@@ -663,16 +1230,24 @@ class ABCExportWindow(QMainWindow):
                 # 只有不是shader_error状态才设置为success
                 if self.files_to_export[self.current_export_index]["status"] != "shader_error":
                     self.update_file_status("success")
+            
+            if self.current_job:
+                self.finish_outputs(self.current_job)
         else:
             self.log(f"导出进程返回错误代码: {exit_code}")
             
             # 从日志中查找具体错误原因
-            error_reason = self.extract_error_reason()
+            error_reason = validation_error or self.extract_error_reason()
             if error_reason:
                 self.update_file_status("failed", error_reason)
                 self.log(f"导出失败原因: {error_reason}")
             else:
                 self.update_file_status("failed", f"代码: {exit_code}")
+            
+            # 失败的导出不上传，清理本地缓存中的残留文件（分片导出失败时保留分片文件）
+            if self.current_job and self.current_job["export_dir"] != self.current_job["subfolder_path"] \
+                    and not self.current_job.get("keep_export_dir"):
+                shutil.rmtree(self.current_job["export_dir"], ignore_errors=True)
         
         # 清理进度文件
         if hasattr(self, 'progress_file') and os.path.exists(self.progress_file):
@@ -688,6 +1263,127 @@ class ABCExportWindow(QMainWindow):
             gc.collect()
             QTimer.singleShot(2000, self.export_next_file)  # 增加到2秒
 
+    def validate_outputs(self, job):
+        """不启动Maya校验导出的ABC，结果写入导出报告
+        
+        Returns:
+            (str): 第一个错误的描述，全部通过时返回None
+        """
+        report_file = os.path.join(job["subfolder_path"], exportReport.REPORT_FILE_NAME)
+        expected = {}
+        try:
+            with open(report_file, 'r') as f:
+                exports = json.load(f).get("exports", [])
+        except (IOError, OSError, ValueError):
+            exports = None
+        
+        if exports is None:
+            # 没有报告时只检查文件本身
+            for file_name in os.listdir(job["export_dir"]):
+                if file_name.lower().endswith(".abc"):
+                    expected[file_name] = None
+        else:
+            for export in exports:
+                file_name = os.path.basename(export["file"])
+                start, end = export["frame_range"]
+                # 帧范围分片合并后按合并后的文件和总帧范围检查
+                match = abcMerge.CHUNK_SUFFIX_PATTERN.match(file_name)
+                if match:
+                    file_name = match.group(1) + ".abc"
+                    if expected.get(file_name):
+                        start = min(start, expected[file_name][0])
+                        end = max(end, expected[file_name][1])
+                expected[file_name] = (start, end)
+        
+        results = []
+        first_error = None
+        for file_name, frame_range in sorted(expected.items()):
+            stats = abcValidate.validate_file(os.path.join(job["export_dir"], file_name), frame_range)
+            results.append({key: stats[key] for key in ("file", "size", "reader", "objects", "errors")})
+            if stats["errors"]:
+                self.log(f"ABC校验失败: {file_name}: {'; '.join(stats['errors'])}")
+                first_error = first_error or f"ABC校验失败: {file_name}"
+            else:
+                self.log(f"ABC校验通过: {file_name} ({stats['objects']} 个对象, {stats['size'] / 1048576.0:.1f} MB)")
+        exportReport.update_report(report_file, "validation", results)
+        return first_error
+    
+    def finish_outputs(self, job):
+        """导出成功后的后处理：上传本地缓存中的文件，然后去重"""
+        dedup_mode = self.dedup_mode.currentData() if self.dedup_outputs.isChecked() else None
+        if job["export_dir"] == job["subfolder_path"]:
+            if dedup_mode:
+                self.queue_dedup(job["subfolder_path"], job["output_path"], dedup_mode)
+            return
+        
+        if self.uploader is None:
+            self.uploader = outputUploader.OutputUploader(self.upload_workers.value())
+        file_index = self.current_export_index
+        
+        def on_uploaded(results, errors):
+            # 在上传线程中执行，只能通过队列通知界面
+            total_mb = sum(r["size"] for r in results) / (1024.0 * 1024.0)
+            self.background_messages.put(
+                f"上传完成: {os.path.basename(job['subfolder_path'])}, {len(results)} 个文件, {total_mb:.1f} MB")
+            if errors:
+                for name, error in errors:
+                    self.background_messages.put(f"上传失败: {name}: {error}")
+                self.background_messages.put(
+                    lambda: self.update_file_status("failed", f"上传失败 {len(errors)} 个文件", index=file_index))
+                return
+            shutil.rmtree(job["export_dir"], ignore_errors=True)
+            if dedup_mode:
+                # 去重线程只在界面线程中创建，多个上传同时完成时不会启动两个写入线程
+                self.background_messages.put(
+                    lambda: self.queue_dedup(job["subfolder_path"], job["output_path"], dedup_mode))
+        
+        self.log(f"后台上传: {job['export_dir']} -> {job['subfolder_path']}")
+        self.uploader.submit_folder(job["export_dir"], job["subfolder_path"], on_uploaded)
+    
+    def queue_dedup(self, subfolder_path, output_path, mode):
+        """把导出完成的文件夹加入后台去重队列，不阻塞下一个文件的导出（只在界面线程中调用）"""
+        self.dedup_queue.put((subfolder_path, os.path.join(output_path, abcDedup.STORE_DIR_NAME), mode))
+        if self.dedup_thread is None:
+            self.dedup_thread = threading.Thread(target=self.dedup_worker, name="AbcDedup")
+            self.dedup_thread.daemon = True
+            self.dedup_thread.start()
+    
+    def dedup_worker(self):
+        """后台去重线程（常驻）：同一时间只有一个线程写入去重仓库"""
+        while True:
+            subfolder_path, store_root, mode = self.dedup_queue.get()
+            try:
+                stats = abcDedup.dedup_folder(subfolder_path, store_root, mode=mode,
+                                              log=self.background_messages.put)
+                if stats["unsupported"]:
+                    # 原因已由去重仓库记录，这里只更新报告
+                    exportReport.update_report(
+                        os.path.join(subfolder_path, exportReport.REPORT_FILE_NAME), "dedup",
+                        {"mode": mode, "disabled": stats["unsupported"]})
+                    continue
+                saved_mb = stats["bytes_saved"] / (1024.0 * 1024.0)
+                self.background_messages.put(
+                    f"去重完成: {os.path.basename(subfolder_path)}, {stats['files']} 个文件, "
+                    f"重复 {stats['duplicates']} 个, 节省 {saved_mb:.1f} MB")
+                exportReport.update_report(
+                    os.path.join(subfolder_path, exportReport.REPORT_FILE_NAME), "dedup",
+                    {"mode": mode, "files": stats["files"], "duplicates": stats["duplicates"],
+                     "bytes_saved": stats["bytes_saved"]})
+            except Exception as e:
+                self.background_messages.put(f"去重时出错: {subfolder_path}: {str(e)}")
+    
+    def drain_background_messages(self):
+        """输出后台线程的日志，队列中的函数在界面线程中执行"""
+        while True:
+            try:
+                message = self.background_messages.get_nowait()
+            except queue.Empty:
+                return
+            if callable(message):
+                message()
+            else:
+                self.log(message)
+    
     def extract_error_reason(self):
         """从日志和进程输出中提取具体的错误原因"""
         # 尝试从日志文本中提取错误原因
@@ -704,7 +1400,7 @@ class ABCExportWindow(QMainWindow):
             ("处理对象时出错", "对象处理错误"),
             ("导入引用.*出错", "导入引用失败"),
             ("将材质指定到面上时出错", "材质应用失败"),
-            ("三角化模型时出错", "三角化模型失败")
+            ("预处理模型时出错", "模型预处理失败")
         ]
         
         # 从最近的日志开始查找错误原因
@@ -839,9 +1535,9 @@ class ABCExportWindow(QMainWindow):
         self.file_list.setRowCount(0)
         self.log("已清空文件列表")
 
-    def read_process_output(self):
+    def read_process_output(self, process=None):
         """读取进程的标准输出"""
-        data = self.process.readAllStandardOutput()
+        data = (process or self.process).readAllStandardOutput()
         line_str = bytes(data).decode('utf-8', errors='ignore').strip()
         if line_str:
             self.log("输出: %s" % line_str)
@@ -853,9 +1549,9 @@ class ABCExportWindow(QMainWindow):
             elif "Set modification failed" in line_str or "Connection not made" in line_str:
                 self.update_file_status("shader_error", line_str)
 
-    def read_process_error(self):
+    def read_process_error(self, process=None):
         """读取进程的错误输出"""
-        data = self.process.readAllStandardError()
+        data = (process or self.process).readAllStandardError()
         line_str = bytes(data).decode('utf-8', errors='ignore').strip()
         if line_str:
             self.log("错误: %s" % line_str)
@@ -894,19 +1590,30 @@ class ABCExportWindow(QMainWindow):
                             self.current_task_label.setText(message)
                         except ValueError:
                             self.log("进度值格式错误: %s" % content[0])
+                    # 第三行为AbcExport逐帧进度: 已导出帧数 总帧数 fps
+                    if len(content) >= 3:
+                        self.check_frame_stall(content[2])
             except Exception as e:
                 self.log("读取进度文件时出错: %s" % str(e))
         
         # 检查日志文件
-        if os.path.exists(log_file):
-            try:
-                with codecs.open(log_file, 'r', encoding='utf-8') as f:
-                    logs = f.readlines()
-                    for log_line in logs[-10:]:  # 只读取最新的10行
-                        if log_line.strip() and not log_line.strip() in self.log_text.toPlainText():
-                            self.log(log_line.strip())
-            except Exception as e:
-                self.log("读取日志文件时出错: %s" % str(e))
+        self.tail_log_file(log_file)
+
+    def check_frame_stall(self, frame_line):
+        """根据逐帧进度检测AbcExport是否停滞"""
+        try:
+            frames_done = int(frame_line.split()[0])
+        except (ValueError, IndexError):
+            return
+        
+        now = time.time()
+        if frames_done != self.last_frames_done:
+            self.last_frames_done = frames_done
+            self.last_frame_time = now
+            self.stall_warned = False
+        elif not self.stall_warned and now - self.last_frame_time > self.STALL_WARNING_SECONDS:
+            self.stall_warned = True
+            self.log(f"警告: 已超过 {self.STALL_WARNING_SECONDS} 秒没有新的导出帧 (停留在第 {frames_done} 帧)，导出可能已停滞")
 
 def main():
     app = QApplication(sys.argv)
@@ -9,6 +9,8 @@ import tempfile
 import time
 import codecs
 
+import shotList
+
 class CameraExportWindow(QMainWindow):
     def __init__(self):
         super().__init__()
@@ -19,6 +21,7 @@ class CameraExportWindow(QMainWindow):
             sys.exit(1)
         self.setup_ui()
         self.files_to_export = []  # 存储待导出的文件列表
+        self.shot_entries = None  # 镜头列表条目
         self.current_export_index = -1  # 当前正在导出的文件索引
         self.export_running = False  # 是否有导出任务正在运行
         
@@ -88,6 +91,16 @@ class CameraExportWindow(QMainWindow):
         output_path_layout.addWidget(self.output_input)
         output_path_layout.addWidget(output_btn)
         
+        # 镜头列表：按场景名匹配剪辑帧范围
+        shot_list_layout = QHBoxLayout()
+        self.shot_list_input = QLineEdit()
+        self.shot_list_input.setPlaceholderText("可选，CSV或JSON；不设置时导出场景时间轴的完整范围")
+        shot_list_btn = QPushButton("选择镜头列表")
+        shot_list_btn.clicked.connect(self.select_shot_list)
+        shot_list_layout.addWidget(QLabel("镜头列表:"))
+        shot_list_layout.addWidget(self.shot_list_input)
+        shot_list_layout.addWidget(shot_list_btn)
+        
         # 添加文件夹分隔设置选项
         folder_option_layout = QHBoxLayout()
         folder_option_layout.addWidget(QLabel("子文件夹命名方式:"))
@@ -114,6 +127,7 @@ class CameraExportWindow(QMainWindow):
         reference_option_layout.addStretch()
         
         output_layout.addLayout(output_path_layout)
+        output_layout.addLayout(shot_list_layout)
         output_layout.addLayout(folder_option_layout)
         output_layout.addLayout(reference_option_layout)  # 添加引用选项布局
         output_group.setLayout(output_layout)
@@ -300,6 +314,16 @@ class CameraExportWindow(QMainWindow):
         if dir_name:
             self.output_input.setText(dir_name)
     
+    def select_shot_list(self):
+        file_name, _ = QFileDialog.getOpenFileName(
+            self,
+            "选择镜头列表",
+            "",
+            "镜头列表 (*.csv *.json)"
+        )
+        if file_name:
+            self.shot_list_input.setText(file_name)
+    
     def start_batch_export(self):
         output_path = self.output_input.text()
         
@@ -320,6 +344,17 @@ class CameraExportWindow(QMainWindow):
                 QMessageBox.critical(self, "错误", f"无法创建输出目录: {str(e)}")
                 return
         
+        # 读取镜头列表
+        self.shot_entries = None
+        shot_list_path = self.shot_list_input.text().strip()
+        if shot_list_path:
+            try:
+                self.shot_entries = shotList.load_shot_list(shot_list_path)
+            except (IOError, OSError, ValueError) as e:
+                QMessageBox.critical(self, "错误", f"无法读取镜头列表: {str(e)}")
+                return
+            self.log(f"已读取镜头列表: {shot_list_path} ({len(self.shot_entries)} 个镜头)")
+        
         # 更新UI状态
         self.export_running = True
         self.export_btn.setEnabled(False)
@@ -475,6 +510,15 @@ class CameraExportWindow(QMainWindow):
         temp_script = None
         progress_file = os.path.join(output_path, "export_progress.txt")
         
+        # 镜头列表中的剪辑范围（含手柄帧）
+        frame_range = None
+        if self.shot_entries:
+            frame_range = shotList.match_range(self.shot_entries, maya_file)
+            if frame_range:
+                self.log(f"镜头列表帧范围: {frame_range[0]:g} - {frame_range[1]:g}")
+            else:
+                self.log(f"警告: 镜头列表中没有匹配 {os.path.basename(maya_file)} 的镜头，导出完整时间轴范围")
+        
         try:
             # 获取当前脚本所在目录
             current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -503,12 +547,11 @@ current_dir = r'%s'
 if current_dir not in sys.path:
     sys.path.append(current_dir)
 
-# 创建日志文件
+# 创建日志文件（缓冲写入，按阶段刷新）
+import workerLogger
 log_file = os.path.join(r'%s', 'export_log.txt')
-def write_log(message):
-    with open(log_file, 'a') as f:
-        current_time = time.strftime('%%Y-%%m-%%d %%H:%%M:%%S')
-        f.write('[' + current_time + '] ' + message + '\\n')
+logger = workerLogger.WorkerLogger(log_file)
+write_log = logger.info
 
 # 设置使用第几个下划线的选项
 use_underscore_index = %d
@@ -555,8 +598,12 @@ try:
     cmds.optionVar(intValue=['CIP', 0])  # 禁用客户参与计划
     cmds.optionVar(intValue=['CER', 0])  # 禁用崩溃报告
 
+    # 批量会话：导出期间的编辑不进入撤销队列，也不默认保留构造历史
+    import batchSession
+    batchSession.BatchSession(log=write_log).apply()
+
     # 打开Maya文件
-    write_log('打开Maya文件...')
+    logger.stage('打开Maya文件')
     # 禁用自动加载插件
     cmds.optionVar(intValue=['autoLoadPlugins', 0])
     
@@ -656,31 +703,33 @@ try:
             write_log('更新进度出错: ' + str(e))
     
     # 导出相机
-    write_log('开始导出相机...')
+    logger.stage('导出相机')
     update_progress(10, '开始导出相机...')
     export_all_cameras(fbx_directory=r'%s', add_border_keys=True, 
-                       maya_file_path=r'%s', use_underscore_index=use_underscore_index)
+                       maya_file_path=r'%s', use_underscore_index=use_underscore_index,
+                       frame_range=%r)
     update_progress(100, '导出完成')
     write_log('导出任务完成')
     
 except Exception as e:
     error_trace = traceback.format_exc()
-    write_log('发生错误: ' + str(e) + '\\n' + error_trace)
+    logger.error('发生错误: ' + str(e) + '\\n' + error_trace)
     sys.stderr.write('错误: ' + str(e) + '\\n' + error_trace + '\\n')
     sys.exit(1)
 finally:
-    write_log('关闭Maya独立模式...')
+    logger.stage('关闭Maya独立模式')
     # 关闭Maya
     try:
         maya.standalone.uninitialize()
         write_log('Maya独立模式已关闭')
     except:
         write_log('关闭Maya时出错')
+    logger.close()
 """ % (safe_current_dir, safe_output_path, use_underscore_index, 
        str(load_references), str(load_references),
        safe_maya_file, safe_maya_file,
        str(load_references), safe_maya_file, safe_maya_file,
-       safe_output_path, safe_output_path, safe_maya_file)
+       safe_output_path, safe_output_path, safe_maya_file, frame_range)
             
             temp_script = os.path.join(tempfile.gettempdir(), "temp_export_script.py")
             
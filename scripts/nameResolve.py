@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+#nameResolve.py
+
+"""
+去除命名空间后的重名节点处理。
+
+AbcExport使用-stripNamespaces时，去掉命名空间后同一层级出现相同的名称会导致导出失败
+（例如两个导出根节点都叫body，或同一父级下的 chr01:body 和 chr02:body）。
+这里一次遍历建立 去掉命名空间的短名称 -> 节点 的索引，对冲突的节点按完整路径的哈希
+追加后缀重命名：同一场景每次运行的结果相同，与节点遍历顺序无关。
+
+传入导出根节点时只检查根节点及其子级：根节点之间互相比较，子级只与同一父级下的节点比较；
+不传时检查场景中所有DAG节点的短名称（对应去除重命名.mel中模型/组和Shape节点的检查）。
+"""
+
+import hashlib
+import time
+
+import maya.cmds as cmds
+import maya.api.OpenMaya as om
+
+
+# 哈希后缀的初始长度，与已有名称冲突时加长
+HASH_SUFFIX_LENGTH = 6
+
+
+def _print_log(message):
+    print(message)
+
+
+def strip_namespace(name):
+    """去掉完整路径和命名空间，返回短名称。"""
+    return name.rsplit('|', 1)[-1].rsplit(':', 1)[-1]
+
+
+def _split_namespace(name):
+    """返回(命名空间, 短名称)，没有命名空间时命名空间为空字符串。"""
+    short_name = name.rsplit('|', 1)[-1]
+    if ':' in short_name:
+        return tuple(short_name.rsplit(':', 1))
+    return '', short_name
+
+
+def build_name_index(paths, roots=None, strip_namespaces=True):
+    """建立名称索引。
+
+    Args:
+        paths (str list): DAG节点完整路径
+        roots (str list): 导出根节点（完整路径），None表示按整个场景比较短名称
+        strip_namespaces (bool): 比较时是否去掉命名空间
+
+    Returns:
+        (dict): (输出层级, 短名称) -> 节点完整路径列表
+    """
+    root_set = set(roots) if roots is not None else None
+    index = {}
+    for path in paths:
+        if root_set is None or path in root_set:
+            # 导出时根节点都位于顶层
+            level = ''
+        else:
+            level = path.rsplit('|', 1)[0]
+        name = strip_namespace(path) if strip_namespaces else path.rsplit('|', 1)[-1]
+        index.setdefault((level, name), []).append(path)
+    return index
+
+
+def find_collisions(index):
+    """返回有冲突的索引项，每项的节点按层级深度和路径排序，第一个节点保留原名。"""
+    collisions = {}
+    for key, paths in index.items():
+        paths = sorted(set(paths), key=lambda path: (path.count('|'), path))
+        if len(paths) > 1:
+            collisions[key] = paths
+    return collisions
+
+
+def _hashed_name(path, base_name, taken):
+    digest = hashlib.md5(path.encode('utf-8')).hexdigest()
+    length = HASH_SUFFIX_LENGTH
+    while True:
+        candidate = '%s_%s' % (base_name, digest[:length])
+        if candidate not in taken or length >= len(digest):
+            return candidate
+        length += 2
+
+
+def resolve_duplicate_names(roots=None, strip_namespaces=True, log=None):
+    """重命名冲突的节点。
+
+    Args:
+        roots (str list): 导出根节点（完整路径），None表示处理整个场景
+        strip_namespaces (bool): 是否按去掉命名空间后的名称比较
+        log (callable): 日志函数
+
+    Returns:
+        (tuple): (重命名后的根节点路径列表, 重命名记录[(原路径, 新名称)])；roots为None时第一项为None
+    """
+    log = log or _print_log
+    start_time = time.time()
+
+    if roots is not None:
+        roots = cmds.ls(roots, long=True) or []
+        paths = cmds.ls(roots, dag=True, long=True) or []
+    else:
+        paths = cmds.ls(dag=True, long=True) or []
+
+    index = build_name_index(paths, roots, strip_namespaces)
+    collisions = find_collisions(index)
+    if not collisions:
+        log('重名检查: %d 个节点, 没有冲突, 耗时 %.2f 秒' % (len(paths), time.time() - start_time))
+        return roots, []
+
+    # 重命名父级后子级的路径会变化，用MDagPath记录根节点，结束后重新取路径
+    root_dag_paths = []
+    if roots:
+        selection = om.MSelectionList()
+        for root in roots:
+            selection.add(root)
+        root_dag_paths = [selection.getDagPath(i) for i in range(selection.length())]
+
+    taken = set(name for _, name in index)
+    renames = []
+    for (_, name), colliding in collisions.items():
+        for path in colliding[1:]:
+            new_name = _hashed_name(path, name, taken)
+            taken.add(new_name)
+            renames.append((path, new_name))
+
+    # 先重命名层级深的节点，尚未处理的父级路径保持有效
+    renames.sort(key=lambda item: item[0].count('|'), reverse=True)
+    renamed = []
+    for path, new_name in renames:
+        namespace = _split_namespace(path)[0]
+        full_name = ':%s:%s' % (namespace, new_name) if namespace else new_name
+        try:
+            # 同一命名空间中已有同名节点时Maya会自动加数字，记录实际的名称
+            result = cmds.rename(path, full_name, ignoreShape=True)
+            renamed.append((path, strip_namespace(result)))
+        except RuntimeError as e:
+            log('重命名失败: %s (%s)' % (path, str(e)))
+
+    log('重名检查: %d 个节点, %d 组冲突, 重命名 %d 个, 耗时 %.2f 秒' % (
+        len(paths), len(collisions), len(renamed), time.time() - start_time))
+
+    if roots is None:
+        return None, renamed
+    return [dag_path.fullPathName() for dag_path in root_dag_paths], renamed
@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+#outputUploader.py
+
+"""
+导出文件的后台上传。
+
+AbcExport先写入本地缓存目录，导出完成后由线程池把文件复制到输出共享目录：
+复制时计算SHA-256，写入临时文件后读回校验，校验通过再原子替换为目标文件，
+共享目录中不会出现写了一半的ABC。上传与下一个文件的导出同时进行。
+"""
+
+import hashlib
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from abcDedup import MANIFEST_SUFFIX, file_hash
+
+
+COPY_BLOCK_SIZE = 8 * 1024 * 1024
+TEMP_SUFFIX = '.uploading'
+
+
+def upload_file(source, destination):
+    """复制文件到目标路径，校验后原子替换，成功后删除源文件。
+
+    Returns:
+        (dict): file, size, digest, seconds
+
+    Raises:
+        IOError: 校验失败
+    """
+    start_time = time.time()
+    temp_path = destination + TEMP_SUFFIX
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        with open(source, 'rb') as src, open(temp_path, 'wb') as dst:
+            while True:
+                block = src.read(COPY_BLOCK_SIZE)
+                if not block:
+                    break
+                digest.update(block)
+                dst.write(block)
+                size += len(block)
+            dst.flush()
+            os.fsync(dst.fileno())
+
+        source_digest = digest.hexdigest()
+        if file_hash(temp_path) != source_digest:
+            raise IOError('上传校验失败: %s' % destination)
+    except Exception:
+        # 不在共享目录中留下不完整的文件
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+    # 替换而不是覆盖写入：旧文件可能是去重仓库的硬链接
+    os.replace(temp_path, destination)
+    # 去重留下的清单文件，上传新文件后需要删除
+    if os.path.exists(destination + MANIFEST_SUFFIX):
+        os.remove(destination + MANIFEST_SUFFIX)
+    os.remove(source)
+    return {'file': destination, 'size': size, 'digest': source_digest,
+            'seconds': time.time() - start_time}
+
+
+class OutputUploader(object):
+    """有并发上限的上传线程池。"""
+
+    def __init__(self, max_workers=2):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='AbcUpload')
+        self._lock = threading.Lock()
+        self._pending = 0
+
+    def pending(self):
+        """尚未上传完成的文件数。"""
+        with self._lock:
+            return self._pending
+
+    def submit_folder(self, local_folder, remote_folder, on_done):
+        """上传本地目录中的所有文件，全部结束后在上传线程中调用on_done(results, errors)。
+
+        Args:
+            local_folder (str): 本地缓存目录
+            remote_folder (str): 共享目录中的目标目录
+            on_done (callable): 回调，results为upload_file的返回值列表，errors为(文件, 错误信息)列表
+        """
+        files = [name for name in sorted(os.listdir(local_folder))
+                 if os.path.isfile(os.path.join(local_folder, name))]
+        if not files:
+            on_done([], [])
+            return
+
+        state = {'remaining': len(files), 'results': [], 'errors': []}
+        with self._lock:
+            self._pending += len(files)
+
+        def finished(future, name):
+            try:
+                result = future.result()
+                error = None
+            except Exception as e:
+                result = None
+                error = (name, str(e))
+            with self._lock:
+                self._pending -= 1
+                if result:
+                    state['results'].append(result)
+                else:
+                    state['errors'].append(error)
+                state['remaining'] -= 1
+                done = state['remaining'] == 0
+            if done:
+                on_done(state['results'], state['errors'])
+
+        if not os.path.exists(remote_folder):
+            os.makedirs(remote_folder)
+        for name in files:
+            future = self.executor.submit(upload_file, os.path.join(local_folder, name),
+                                          os.path.join(remote_folder, name))
+            future.add_done_callback(lambda f, name=name: finished(f, name))
+
+    def shutdown(self, wait=True):
+        self.executor.shutdown(wait=wait)
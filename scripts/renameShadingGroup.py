@@ -7,25 +7,127 @@ Renames the selected shading group to match the connected material.
 
 import maya.cmds as cmds
 
+# 不重命名的默认着色组
+DEFAULT_SHADING_GROUPS = {'initialShadingGroup', 'initialParticleSE'}
+# 互换名称时使用的临时名称，#由Maya替换为数字
+TEMP_NAME = 'renameShadingGroup_tmp#'
+
+
+def build_shading_graph(shading_engines=None):
+    """一次查询建立着色组 -> 材质的对应关系。
+
+    Args:
+        shading_engines (str list): 着色组，None表示场景中所有着色组
+
+    Returns:
+        (dict): 着色组 -> 材质，没有连接材质的着色组对应None
+    """
+    if shading_engines is None:
+        shading_engines = cmds.ls(type='shadingEngine') or []
+    graph = dict((sg, None) for sg in shading_engines if sg not in DEFAULT_SHADING_GROUPS)
+    if not graph:
+        return graph
+    # connections=True时返回[着色组属性, 材质, ...]
+    connections = cmds.listConnections([sg + '.surfaceShader' for sg in graph], source=True,
+                                       destination=False, connections=True) or []
+    for plug, material in zip(connections[::2], connections[1::2]):
+        graph[plug.split('.', 1)[0]] = material
+    return graph
+
+
+def plan_renames(graph, existing_names):
+    """计算没有冲突的重命名方案。
+
+    同一个材质连接多个着色组时，已经叫<材质>_SG的保留，其余依次命名为<材质>_SG1、<材质>_SG2...；
+    目标名称被其它节点占用时同样递增编号。
+
+    Args:
+        graph (dict): build_shading_graph的返回值
+        existing_names (iterable): 场景中所有节点的名称
+
+    Returns:
+        (list): [(着色组, 新名称), ...]，只包含名称需要改变的着色组
+    """
+    by_material = {}
+    for sg, material in graph.items():
+        if material:
+            by_material.setdefault(material, []).append(sg)
+    renamed = set(sg for sgs in by_material.values() for sg in sgs)
+    # 不参与重命名的节点保持原名称
+    taken = set(name for name in existing_names if name not in renamed)
+
+    plan = []
+    for material in sorted(by_material):
+        base = '{0}_SG'.format(material)
+        for sg in sorted(by_material[material], key=lambda sg: (sg != base, sg)):
+            name = base
+            index = 0
+            while name in taken:
+                index += 1
+                name = '{0}{1}'.format(base, index)
+            taken.add(name)
+            if name != sg:
+                plan.append((sg, name))
+    return plan
+
+
+def apply_renames(plan):
+    """按方案重命名着色组。
+
+    当前名称是其它着色组目标名称的先改为临时名称，互换名称时不会冲突。
+
+    Returns:
+        (list): 重命名后的着色组名称
+    """
+    targets = set(name for _, name in plan)
+    staged = []
+    for sg, name in plan:
+        if sg in targets:
+            sg = cmds.rename(sg, TEMP_NAME)
+        staged.append((sg, name))
+    shading_groups = []
+    for sg, name in staged:
+        try:
+            shading_groups.append(cmds.rename(sg, name))
+        except RuntimeError as e:
+            # 锁定的节点无法重命名
+            print('Failed to rename {0}: {1}'.format(sg, str(e)))
+    return shading_groups
+
+
+def rename_all_shading_groups(log=None):
+    """把场景中所有着色组重命名为<材质>_SG，不需要交互，可以在导出worker中调用。
+
+    Returns:
+        (list): 重命名后的着色组名称
+    """
+    graph = build_shading_graph()
+    plan = plan_renames(graph, cmds.ls() or [])
+    shading_groups = apply_renames(plan)
+    if log:
+        log('着色组重命名: %d 个着色组, 重命名 %d 个' % (len(graph), len(shading_groups)))
+    return shading_groups
+
+
 def getSelection():
     """Finds the connected materials.
     The user may select the materials directly, or select any objects with the desired materials.
-    
+
     Returns:
         selection : a list of the materials selected directly and/or thru mesh objects"""
     selection = []
     meshSelection = cmds.ls(sl=1, transforms=1)
     materialSelection = cmds.ls(sl=1, materials=1)
-    
+
     if materialSelection:
         selection = materialSelection
 
     if meshSelection:
-        for mesh in meshSelection:
-            history = cmds.listHistory(mesh)
-            shadingEngines = cmds.listConnections(history, type='shadingEngine')
-            for shadingEngine in shadingEngines:
-                selection = selection + cmds.listConnections(shadingEngine+'.surfaceShader')
+        # 所有选中模型的历史和着色组各一次查询
+        history = cmds.listHistory(meshSelection) or []
+        shadingEngines = list(set(cmds.listConnections(history, type='shadingEngine') or []))
+        graph = build_shading_graph(shadingEngines)
+        selection = selection + [material for material in set(graph.values()) if material]
 
     if not meshSelection and not materialSelection:
         answer = cmds.confirmDialog(message='No objects or material nodes selected, rename ALL shading groups in the scene?',button=['Yes','No'])
@@ -37,17 +139,19 @@ def getSelection():
             selection = list(allMaterials.difference(undeletableMaterials))
 
     return selection
-        
+
 
 def renameShadingGroup(materials):
     """Renames the shading groups to their respective materials.
     Args:
         materials : a list of materials"""
-    editedShadingGroups = []
-    for m in materials:
-        shadingGroup = cmds.listConnections(m,type='shadingEngine')
-        editedShadingGroups.append(cmds.rename(shadingGroup,'{0}_SG'.format(m)))
-    return editedShadingGroups
+    materials = set(materials)
+    shadingEngines = cmds.listConnections(list(materials), type='shadingEngine') or []
+    graph = build_shading_graph(list(set(shadingEngines)))
+    # 只重命名所选材质的着色组
+    graph = dict((sg, material) for sg, material in graph.items() if material in materials)
+    plan = plan_renames(graph, cmds.ls() or [])
+    return apply_renames(plan)
 
 def run():
     """A convenience function to run thru the tool.
@@ -58,6 +162,3 @@ def run():
     print('New shading groups:\n','\n'.join(shadingGroups))
     print('Successfully renamed {0} shading group(s)!'.format(len(shadingGroups)))
     cmds.undoInfo(closeChunk=1)
-
-    
-
@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+#scenePrescan.py
+
+"""
+不启动Maya的场景文件预扫描。
+
+直接按字节流读取.ma/.mb文件，提取批量导出调度需要的少量信息（如时间轴范围），
+读取过程中不加载任何引用，速度远快于在mayapy中打开场景。
+.ma文件的引用列表也可以直接从文件头部读取，.mb文件需要由mayapy读取。
+"""
+
+import re
+
+
+# sceneConfigurationScriptNode中保存的时间轴设置，.ma和.mb中都以明文形式存在
+PLAYBACK_PATTERN = re.compile(br'playbackOptions -min (-?[0-9.]+) -max (-?[0-9.]+)')
+
+BLOCK_SIZE = 8 * 1024 * 1024
+BLOCK_OVERLAP = 1024
+
+
+def _iter_blocks(file_path):
+    """按块读取文件，相邻块之间保留少量重叠，避免匹配内容被截断。"""
+    tail = b''
+    with open(file_path, 'rb') as f:
+        while True:
+            block = f.read(BLOCK_SIZE)
+            if not block:
+                break
+            yield tail + block
+            tail = block[-BLOCK_OVERLAP:]
+
+
+def read_playback_range(file_path):
+    """读取场景保存的时间轴范围。
+
+    Args:
+        file_path (str): Maya文件路径
+
+    Returns:
+        (tuple): (起始帧, 结束帧)，找不到时返回None
+    """
+    found = None
+    try:
+        for block in _iter_blocks(file_path):
+            for match in PLAYBACK_PATTERN.finditer(block):
+                found = (float(match.group(1)), float(match.group(2)))
+    except (IOError, OSError, ValueError):
+        return None
+    return found
+
+
+# .ma文件头部的引用语句: file -r -ns "命名空间" [-dr 1] -rfn "引用节点" ... "文件路径";
+# -rdi开头的是嵌套引用的加载信息，不是顶层引用
+REFERENCE_NAMESPACE_PATTERN = re.compile(r'-ns "([^"]*)"')
+REFERENCE_NODE_PATTERN = re.compile(r'-rfn "([^"]*)"')
+REFERENCE_PATH_PATTERN = re.compile(r'"([^"]*)"\s*;\s*$')
+
+
+def read_reference_namespaces(file_path):
+    """读取.ma文件中的顶层引用列表。
+
+    引用语句都位于文件头部，读到第一个requires/createNode语句即停止。
+
+    Args:
+        file_path (str): Maya文件路径
+
+    Returns:
+        (list): [{'namespace': 命名空间, 'ref_node': 引用节点, 'path': 引用文件路径,
+                  'deferred': 是否保存为卸载状态}, ...]，
+                .mb文件或无法读取时返回None
+    """
+    if not file_path.lower().endswith('.ma'):
+        return None
+
+    references = []
+    statement = ''
+    try:
+        with open(file_path, 'rb') as f:
+            for raw_line in f:
+                line = raw_line.decode('utf-8', 'replace').strip()
+                if not statement and (line.startswith('requires ') or line.startswith('createNode ')):
+                    break
+                if not statement and not line.startswith('file '):
+                    continue
+                statement += ' ' + line if statement else line
+                if not statement.endswith(';'):
+                    continue
+                if statement.startswith('file -r '):
+                    namespace = REFERENCE_NAMESPACE_PATTERN.search(statement)
+                    ref_node = REFERENCE_NODE_PATTERN.search(statement)
+                    path = REFERENCE_PATH_PATTERN.search(statement)
+                    if namespace and ref_node and path:
+                        references.append({
+                            'namespace': namespace.group(1),
+                            'ref_node': ref_node.group(1),
+                            'path': path.group(1),
+                            'deferred': ' -dr 1 ' in statement,
+                        })
+                statement = ''
+    except (IOError, OSError):
+        return None
+    return references
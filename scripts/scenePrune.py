@@ -0,0 +1,198 @@
+# -*- coding: utf-8 -*-
+#scenePrune.py
+
+"""
+导出前的场景精简。
+
+找出所有为导出模型提供数据的节点（模型自身、父级层级、变形器链、驱动骨骼及其父级、
+约束和动画曲线等），其余的DAG分支和变形器链在导出期间不需要计算：
+    freeze  设置frozen属性，Evaluation Manager（串行/并行模式）会跳过这些节点；
+    delete  删除无关的DAG分支，剩余的无关DG节点设置frozen属性。
+"""
+
+import time
+
+import maya.cmds as cmds
+import maya.api.OpenMaya as om
+
+
+PRUNE_MODES = ['off', 'freeze', 'delete']
+
+# 无关的DG节点只在这些形状节点的上游中查找，避免误冻结场景级节点
+GEOMETRY_SHAPE_TYPES = ['mesh', 'nurbsCurve', 'nurbsSurface', 'subdiv', 'lattice']
+
+# 驱动骨骼但没有连接到骨骼输入的节点：IK手柄通过startJoint/endEffector的message连接关联骨骼，
+# IK解算器由ikSolvers计算后直接写入骨骼的旋转，上游遍历找不到
+IK_NODE_TYPES = ['ikHandle', 'ikEffector']
+
+
+def _print_log(message):
+    print(message)
+
+
+def _long_names(nodes):
+    return set(cmds.ls(nodes, long=True) or []) if nodes else set()
+
+
+def _ancestors(dag_path):
+    """完整路径的所有父级路径。"""
+    parts = dag_path.split('|')
+    return ['|'.join(parts[:i]) for i in range(2, len(parts))]
+
+
+def _ik_nodes(nodes):
+    """与骨骼和效应器相连的IK手柄和效应器，它们的解算器等输入在下一轮遍历中找到。"""
+    joints = cmds.ls(nodes, type=['joint', 'ikEffector'], long=True) or []
+    if not joints:
+        return set()
+    found = []
+    for node_type in IK_NODE_TYPES:
+        found.extend(cmds.listConnections(joints, type=node_type, source=True, destination=True) or [])
+    return _long_names(found)
+
+
+def collect_needed_nodes(export_objects):
+    """找出导出模型需要的所有节点。
+
+    从导出模型出发反复查找上游历史和输入连接，遇到DAG节点时加入其所有父级，
+    遇到骨骼时加入驱动它的IK手柄和效应器（继续遍历会找到解算器、极向量约束和手柄动画），
+    直到没有新节点为止（例如蒙皮骨骼的父级、约束目标及其动画）。
+
+    Args:
+        export_objects (str list): 要导出的模型transform节点（完整路径）
+
+    Returns:
+        (set): 需要保留的节点（DAG节点为完整路径）
+    """
+    needed = set()
+    shapes = cmds.listRelatives(export_objects, shapes=True, fullPath=True) or []
+    frontier = _long_names(list(export_objects) + shapes)
+    while frontier:
+        # DAG节点的父级决定世界坐标，也必须保留
+        for node in list(frontier):
+            if node.startswith('|'):
+                frontier.update(parent for parent in _ancestors(node) if parent not in needed)
+        needed.update(frontier)
+        nodes = list(frontier)
+        history = cmds.listHistory(nodes, pruneDagObjects=False) or []
+        inputs = cmds.listConnections(nodes, source=True, destination=False, skipConversionNodes=False) or []
+        frontier = (_long_names(history + inputs) | _ik_nodes(nodes)) - needed
+    return needed
+
+
+def _unneeded_dag_roots(needed):
+    """不包含任何需要节点的最上层DAG分支（不含默认相机）。"""
+    startup_cameras = set()
+    for camera in cmds.ls(cameras=True, long=True) or []:
+        if cmds.camera(camera, query=True, startupCamera=True):
+            startup_cameras.update(cmds.listRelatives(camera, parent=True, fullPath=True) or [])
+
+    roots = []
+    pending = cmds.ls(assemblies=True, long=True) or []
+    while pending:
+        node = pending.pop()
+        if node in startup_cameras:
+            continue
+        if node not in needed:
+            roots.append(node)
+            continue
+        # 需要的节点下面可能还有无关的子分支（例如cache组外的代理模型）
+        pending.extend(cmds.listRelatives(node, children=True, type='transform', fullPath=True) or [])
+    return roots
+
+
+def _unneeded_dg_nodes(needed):
+    """无关几何体上游的DG节点（变形器、动画曲线等）。"""
+    unneeded_shapes = [shape for shape in cmds.ls(type=GEOMETRY_SHAPE_TYPES, long=True) or []
+                       if shape not in needed]
+    if not unneeded_shapes:
+        return []
+    history = cmds.listHistory(unneeded_shapes, pruneDagObjects=True) or []
+    default_nodes = set(cmds.ls(defaultNodes=True) or [])
+    return [node for node in _long_names(history)
+            if node not in needed and node not in default_nodes and not node.startswith('|')]
+
+
+def _freeze(nodes):
+    """设置frozen属性，返回成功冻结的节点数量。"""
+    if not nodes:
+        return 0
+    count = 0
+    selection = om.MSelectionList()
+    for node in nodes:
+        try:
+            selection.add(node)
+        except RuntimeError:
+            continue
+    for i in range(selection.length()):
+        fn_node = om.MFnDependencyNode(selection.getDependNode(i))
+        try:
+            plug = fn_node.findPlug('frozen', False)
+            if plug.isLocked or plug.isDestination:
+                continue
+            plug.setBool(True)
+            count += 1
+        except RuntimeError:
+            continue
+    return count
+
+
+def _delete(dag_roots, log):
+    """删除无关的DAG分支，无法删除的分支改为冻结。"""
+    deleted = 0
+    failed = []
+    for root in dag_roots:
+        try:
+            cmds.delete(root)
+            deleted += 1
+        except (RuntimeError, ValueError) as e:
+            failed.append(root)
+            log('无法删除 %s，改为冻结: %s' % (root, str(e)))
+    return deleted, failed
+
+
+def prune_scene(export_objects, mode='freeze', log=None):
+    """冻结或删除与导出模型无关的节点。
+
+    Args:
+        export_objects (str list): 要导出的模型transform节点（完整路径）
+        mode (str): 'off'、'freeze'或'delete'
+        log (callable): 日志函数
+
+    Returns:
+        (dict): 统计信息，包括需要保留的节点数、冻结/删除的数量和耗时
+    """
+    log = log or _print_log
+    stats = {'mode': mode, 'needed': 0, 'frozen': 0, 'deleted': 0, 'time': 0.0}
+    if mode not in PRUNE_MODES or mode == 'off' or not export_objects:
+        return stats
+
+    start_time = time.time()
+    needed = collect_needed_nodes(export_objects)
+    stats['needed'] = len(needed)
+    dag_roots = _unneeded_dag_roots(needed)
+    dg_nodes = _unneeded_dg_nodes(needed)
+    log('导出需要 %d 个节点, 无关DAG分支 %d 个, 无关DG节点 %d 个' % (
+        len(needed), len(dag_roots), len(dg_nodes)))
+
+    if mode == 'delete':
+        stats['deleted'], dag_roots = _delete(dag_roots, log)
+        # 删除几何体后其上游节点可能已随之删除
+        dg_nodes = [node for node in dg_nodes if cmds.objExists(node)]
+
+    if dag_roots:
+        # frozen只作用于节点自身，分支下的所有节点都要设置
+        branch_nodes = dag_roots + (cmds.listRelatives(dag_roots, allDescendents=True, fullPath=True) or [])
+        stats['frozen'] += _freeze(branch_nodes)
+    stats['frozen'] += _freeze(dg_nodes)
+
+    if stats['frozen']:
+        try:
+            cmds.evaluator(name='frozen', enable=True)
+        except RuntimeError as e:
+            log('启用frozen求值器失败: ' + str(e))
+        if cmds.evaluationManager(query=True, mode=True)[0] == 'off':
+            log('警告: DG求值模式下frozen属性不起作用，请使用串行或并行求值模式')
+
+    stats['time'] = time.time() - start_time
+    return stats
@@ -6,22 +6,112 @@ Sets shaders to objects' faces for the Unreal Alembic Cache.
 """
 
 import maya.cmds as cmds
+import maya.api.OpenMaya as om
 import traceback
 
+import batchSession
+
+
+# 材质预检查的分类
+STATUS_COMPLIANT = 'compliant'  # 所有面都已逐面指定材质，不需要处理
+STATUS_TWO_STEP = 'two_step'  # 物体级指定或只有一个材质，需要两步法
+STATUS_MULTI_MATERIAL = 'multi_material'  # 多个材质且不全是逐面指定，需要按材质拆分面
+
+# 没有材质时创建的默认材质和着色组
+DEFAULT_SHADER_NAME = 'SetShader_defaultShader'
+DEFAULT_SHADING_GROUP = DEFAULT_SHADER_NAME + '_SG'
+
+
+def compress_face_ranges(face_shaders):
+    """把逐面的着色组索引压缩为连续的面范围。
+
+    Args:
+        face_shaders (int list): 每个面的着色组索引，-1表示没有指定材质
+
+    Returns:
+        (dict): 着色组索引 -> [(起始面, 结束面), ...]
+    """
+    ranges = {}
+    count = len(face_shaders)
+    start = 0
+    while start < count:
+        index = face_shaders[start]
+        end = start
+        while end + 1 < count and face_shaders[end + 1] == index:
+            end += 1
+        ranges.setdefault(index, []).append((start, end))
+        start = end + 1
+    return ranges
+
+
+def is_object_level_assigned(dag_path):
+    """形状节点的当前实例是否在物体级（instObjGroups）连接到着色组。"""
+    node = om.MFnDependencyNode(dag_path.node())
+    plug = node.findPlug('instObjGroups', False).elementByLogicalIndex(dag_path.instanceNumber())
+    return any(dest.node().hasFn(om.MFn.kShadingEngine) for dest in plug.connectedTo(False, True))
+
+
+def classify_assignment(dag_path, shader_ranges):
+    """根据逐面的着色组判断模型需要的处理。
+
+    Args:
+        dag_path (MDagPath): mesh形状节点
+        shader_ranges (dict): 着色组 -> 面范围，没有指定材质的面的键为None
+
+    Returns:
+        (str): STATUS_COMPLIANT、STATUS_TWO_STEP或STATUS_MULTI_MATERIAL
+    """
+    engines = [shader for shader in shader_ranges if shader is not None]
+    if not engines:
+        return STATUS_TWO_STEP
+    if None not in shader_ranges and not is_object_level_assigned(dag_path):
+        return STATUS_COMPLIANT
+    return STATUS_MULTI_MATERIAL if len(engines) > 1 else STATUS_TWO_STEP
+
+
 class SetShader:
-    def __init__(self):
+    def __init__(self, createFaceSets=False, skipCompliant=True, planCache=None):
+        """Constructor.
+
+        Args:
+            createFaceSets (bool): 应用材质后是否为每个对象的每个材质创建命名面集
+            skipCompliant (bool): 跳过所有面都已逐面指定材质的模型
+            planCache (ShaderPlanCache): 按资产缓存的材质指定方案（shaderPlanCache.py），None表示不使用
+        """
         print('Setting shader to face components. . . ')
-        cmds.undoInfo(openChunk=1, chunkName='Shader_Set_Action')
+        # 场景中已有集合名称的索引，创建面集时才建立，每次运行只建立一次
+        self.setIndex = None
+        # 没有指定材质的面按形状节点查找一次材质，实例化和共用形状节点的模型共用结果
+        self.fallbackShaders = {}  # 形状节点UUID -> 没有指定材质的面使用的着色组
+        self.defaultShader = None  # 本次运行共用的默认材质
+        self.planCache = planCache
+        if planCache:
+            # 方案中使用的默认材质在本次运行中按需创建
+            planCache.node_factories[DEFAULT_SHADING_GROUP] = self._getDefaultShader
+        # 预检查分类统计
+        self.stats = {STATUS_COMPLIANT: 0, STATUS_TWO_STEP: 0, STATUS_MULTI_MATERIAL: 0}
+        # 批量会话中撤销队列已关闭，不需要撤销块
+        use_undo_chunk = not batchSession.is_active()
+        if use_undo_chunk:
+            cmds.undoInfo(openChunk=1, chunkName='Shader_Set_Action')
         self.getGeometry()
         
-        # 收集所有需要处理的几何体和材质
-        geometry_shader_pairs = []
+        # 收集所有需要处理的几何体和逐面的材质
+        geometry_shader_faces = []
+        compliant_shader_faces = []
         for self.geometry in self.selectedGeometry:
             try:
                 self.getShape()
-                self.getAssignedShader()
-                geometry_shader_pairs.append((self.geometry, self.shader))
-                print("成功获取对象 {0} 的材质: {1}".format(self.geometry, self.shader))
+                status, shader_faces = self.getFaceShaderMap()
+                if not shader_faces:
+                    print("警告: 对象 {0} 没有面组件".format(self.geometry))
+                    continue
+                self.stats[status] += 1
+                if status == STATUS_COMPLIANT and skipCompliant:
+                    compliant_shader_faces.append((self.geometry, shader_faces))
+                    continue
+                geometry_shader_faces.append((self.geometry, shader_faces))
+                print("成功获取对象 {0} 的材质({1}): {2}".format(self.geometry, status, ', '.join(sorted(shader_faces))))
             except RuntimeError as e:
                 print("警告: {0}".format(str(e)))
                 continue
@@ -30,13 +120,19 @@ class SetShader:
                 print(traceback.format_exc())
                 continue
         
-        # 批量应用材质
-        for geometry, shader in geometry_shader_pairs:
-            self.geometry = geometry
-            self.shader = shader
-            self.applyShaders()
+        if self.planCache:
+            print("材质方案缓存: 命中 {0} 个, 未命中 {1} 个".format(self.planCache.hits, self.planCache.misses))
+        print("材质预检查: 已符合要求(跳过) {0} 个, 两步法 {1} 个, 多材质拆分 {2} 个".format(
+            self.stats[STATUS_COMPLIANT], self.stats[STATUS_TWO_STEP], self.stats[STATUS_MULTI_MATERIAL]))
         
-        cmds.undoInfo(closeChunk=1, chunkName='Shader_Set_Action')
+        # 按着色组分组批量应用材质
+        self.applyShadersGrouped(geometry_shader_faces)
+        
+        if createFaceSets:
+            self.createNamedFaceSets(geometry_shader_faces + compliant_shader_faces)
+        
+        if use_undo_chunk:
+            cmds.undoInfo(closeChunk=1, chunkName='Shader_Set_Action')
         print('Shaders set successfully!')
 
 
@@ -51,12 +147,64 @@ class SetShader:
 
     def getShape(self):
         """Get the accompanying shape node to the selected transform."""
-        shapes = cmds.listRelatives(self.geometry, shapes=1)
+        shapes = cmds.listRelatives(self.geometry, shapes=1, noIntermediate=1, fullPath=1)
         if not shapes:
             raise RuntimeError("对象 {0} 没有形状节点".format(self.geometry))
         self.shape = shapes[0]
         print("对象 {0} 的形状节点: {1}".format(self.geometry, self.shape))
 
+    def getFaceShaderMap(self):
+        """返回对象逐面的着色组，多材质模型的面材质不会丢失。
+
+        Returns:
+            (tuple): (预检查分类, {着色组: 面范围组件列表})；没有面时第二项为空字典
+        """
+        selection = om.MSelectionList()
+        selection.add(self.shape)
+        dag_path = selection.getDagPath(0)
+        if not dag_path.hasFn(om.MFn.kMesh):
+            return None, {}
+        # 组件路径使用当前实例的路径
+        status, shader_ranges = self.getShaderRanges(dag_path)
+        shape_path = dag_path.fullPathName()
+        shader_faces = {}
+        for shader, ranges in shader_ranges.items():
+            shader_faces[shader] = ['{0}.f[{1}:{2}]'.format(shape_path, start, end) for start, end in ranges]
+        return status, shader_faces
+
+    def getShaderRanges(self, dag_path):
+        """用一次MFnMesh.getConnectedShaders取得逐面的着色组并压缩为面范围。
+
+        实例的材质可以不同，每个实例单独查询；没有指定材质的面使用的材质按形状节点只查找一次。
+
+        Returns:
+            (tuple): (预检查分类, {着色组: [(起始面, 结束面), ...]})
+        """
+        # 之前的镜头已经为同一资产计算过的方案
+        plan = self.planCache.lookup(dag_path) if self.planCache else None
+        if plan:
+            return plan
+
+        shape_id = om.MFnDependencyNode(dag_path.node()).uuid().asString()
+
+        shaders, face_shaders = om.MFnMesh(dag_path).getConnectedShaders(dag_path.instanceNumber())
+        shader_ranges = {}
+        for index, ranges in compress_face_ranges(list(face_shaders)).items():
+            shader = om.MFnDependencyNode(shaders[index]).name() if index >= 0 else None
+            shader_ranges.setdefault(shader, []).extend(ranges)
+        status = classify_assignment(dag_path, shader_ranges)
+
+        if None in shader_ranges:
+            # 没有指定材质的面按原来的顺序查找材质，同一形状节点只查找一次
+            if shape_id not in self.fallbackShaders:
+                self.getAssignedShader()
+                self.fallbackShaders[shape_id] = self.shader
+            shader_ranges.setdefault(self.fallbackShaders[shape_id], []).extend(shader_ranges.pop(None))
+
+        if self.planCache:
+            self.planCache.record(dag_path, status, shader_ranges)
+        return status, shader_ranges
+
     def getAssignedShader(self):
         """Get the shader assigned to the given objects using multiple methods."""
         # 尝试多种方法获取材质
@@ -78,12 +226,23 @@ class SetShader:
         
         raise RuntimeError("对象 {0} 没有关联的材质，且无法创建默认材质".format(self.geometry))
     
+    def getFaceCount(self):
+        """返回模型的面数，不是多边形模型时返回0"""
+        count = cmds.polyEvaluate(self.geometry, face=True)
+        # 不是多边形模型时polyEvaluate返回提示字符串
+        return count if isinstance(count, int) else 0
+
+    def getFaceRange(self, node=None):
+        """返回覆盖所有面的范围组件，例如 pCube1.f[0:5]，不逐个展开面"""
+        count = self.getFaceCount()
+        if not count:
+            return None
+        return '{0}.f[0:{1}]'.format(node or self.geometry, count - 1)
+
     def _getShaderFromFaces(self):
         """从面组件获取材质"""
-        faces = cmds.polyListComponentConversion(self.geometry, toFace=True)
-        if faces:
-            face = cmds.ls(faces, flatten=True)[0]
-            shadingEngines = cmds.listSets(object=face, type=1)
+        if self.getFaceCount():
+            shadingEngines = cmds.listSets(object='{0}.f[0]'.format(self.geometry), type=1)
             if shadingEngines:
                 return shadingEngines[0]
         return None
@@ -107,14 +266,17 @@ class SetShader:
         return None
     
     def _getDefaultShader(self):
-        """创建并返回默认材质"""
+        """创建并返回默认材质，同一次运行中所有对象共用一个"""
+        if self.defaultShader and cmds.objExists(self.defaultShader):
+            return self.defaultShader
         print("为对象 {0} 创建默认材质".format(self.geometry))
         # 创建标准表面材质
-        shader = cmds.shadingNode('standardSurface', asShader=True, name="{0}_defaultShader".format(self.geometry))
+        shader = cmds.shadingNode('standardSurface', asShader=True, name=DEFAULT_SHADER_NAME)
         # 创建着色引擎
         shadingEngine = cmds.sets(renderable=True, noSurfaceShader=True, empty=True, name="{0}_SG".format(shader))
         # 连接材质到着色引擎
         cmds.connectAttr('{0}.outColor'.format(shader), '{0}.surfaceShader'.format(shadingEngine), force=True)
+        self.defaultShader = shadingEngine
         return shadingEngine
 
     def setInitialShaderToMesh(self):
@@ -126,63 +288,114 @@ class SetShader:
 
     def setShaderToFaces(self):
         """Set a shader to the faces of a mesh object."""
-        # 确保转换为面组件
-        faces = cmds.polyListComponentConversion(self.geometry, toFace=True)
+        # 使用f[0:N]范围组件，内存占用与面数无关
+        faces = self.getFaceRange()
         if faces:
-            faces = cmds.ls(faces, flatten=True)
             cmds.select(faces, r=1)
             cmds.sets(e=1, forceElement=self.shader)
-            print('SET MATERIAL!\n' + str(faces))
+            print('SET MATERIAL!\n' + faces)
+
+    def getSetIndex(self):
+        """返回场景中已有集合名称的索引，每次运行只查询一次"""
+        if self.setIndex is None:
+            self.setIndex = set(cmds.ls(sets=True) or [])
+        return self.setIndex
+
+    def createNamedFaceSets(self, geometry_shader_faces):
+        """为每个对象的每个材质创建面集，面集只包含该材质的面。
 
-    def createNamedFaceSet(self):
-        """为对象创建命名面集"""
+        Args:
+            geometry_shader_faces (list): [(几何体, {着色组: 面范围组件列表}), ...]
+        """
+        for geometry, faces_by_shader in geometry_shader_faces:
+            self.geometry = geometry
+            for shader, faces in faces_by_shader.items():
+                self.shader = shader
+                self.createNamedFaceSet(faces)
+
+    def createNamedFaceSet(self, faces=None):
+        """为对象创建命名面集
+
+        Args:
+            faces (str list): 面范围组件，默认为对象的所有面
+        """
         try:
-            # 获取所有面
-            meshFaces = '{0}.f[*]'.format(self.geometry)
-            faces = cmds.ls(meshFaces, flatten=True)
+            # 获取短名称（不带命名空间）
+            geometry_short_name = cmds.ls(self.geometry, shortNames=True)[0]
             
+            # 默认使用所有面的范围组件
+            faces = faces or self.getFaceRange(geometry_short_name)
             if not faces:
                 print("警告: 对象 {0} 没有面组件，无法创建面集".format(self.geometry))
                 return
                 
             # 创建面集名称 - 使用材质名称，移除命名空间前缀
-            # 获取短名称（不带命名空间）
-            geometry_short_name = cmds.ls(self.geometry, shortNames=True)[0]
             shader_short_name = cmds.ls(self.shader, shortNames=True)[0]
             
             # 创建面集名称，使用短名称
             face_set_name = "{0}_{1}_faceSet".format(geometry_short_name, shader_short_name)
             
-            # 创建面集 - 使用Maya 2020兼容的方法
-            # 检查面集是否已存在
-            existing_sets = cmds.ls(sets=True)
-            if face_set_name not in existing_sets:
-                # 创建空面集
-                cmds.sets(name=face_set_name, empty=True)
-                
-            # 将面添加到面集 - 使用短名称
-            # 获取面的短名称
-            short_faces = []
-            for face in faces:
-                short_face = cmds.ls(face, shortNames=True)[0]
-                short_faces.append(short_face)
-                
-            # 使用短名称添加面到面集
-            cmds.sets(short_faces, edit=True, addElement=face_set_name)
+            # 通过索引检查面集是否已存在，每个面集只调用一次sets写入所有面
+            set_index = self.getSetIndex()
+            if face_set_name in set_index:
+                cmds.sets(faces, edit=True, addElement=face_set_name)
+            else:
+                face_set_name = cmds.sets(faces, name=face_set_name)
+                set_index.add(face_set_name)
             
             print("成功为对象 {0} 创建面集: {1}".format(self.geometry, face_set_name))
         except Exception as e:
             print("创建面集时出错: {0}".format(str(e)))
             print(traceback.format_exc())
 
+    def applyShadersGrouped(self, geometry_shader_faces):
+        """按着色组分组应用材质，两步法的每一步每个着色组只调用一次sets。
+
+        Args:
+            geometry_shader_faces (list): [(几何体, {着色组: 面范围组件列表}), ...]
+        """
+        geometries = []
+        shader_faces = {}
+        for geometry, faces_by_shader in geometry_shader_faces:
+            geometries.append(geometry)
+            for shader, faces in faces_by_shader.items():
+                shader_faces.setdefault(shader, []).extend(faces)
+        if not geometries:
+            return
+
+        # 1. 先将初始着色组一次应用到所有网格
+        try:
+            cmds.sets(geometries, e=1, forceElement='initialShadingGroup')
+            print('SET INITIAL! {0} 个对象'.format(len(geometries)))
+        except Exception as e:
+            print("应用初始着色组时出错: {0}".format(str(e)))
+            print(traceback.format_exc())
+            return
+
+        # 2. 然后每个着色组一次应用到它的所有面
+        for shader, faces in shader_faces.items():
+            try:
+                cmds.sets(faces, e=1, forceElement=shader)
+                # 验证材质应用：每个着色组检查一次
+                if not cmds.sets(faces, isMember=shader):
+                    print("警告: 材质 {0} 可能未正确应用到所有面".format(shader))
+                print("成功将材质 {0} 应用到 {1} 段面".format(shader, len(faces)))
+            except Exception as e:
+                print("应用材质 {0} 时出错: {1}".format(shader, str(e)))
+                print(traceback.format_exc())
+
+        # 只在所有对象处理完后刷新一次，批量会话中不刷新视口
+        if not batchSession.is_active():
+            cmds.refresh(force=True)
+            cmds.ogs(reset=1)
+
     def applyShaders(self):
         """Applies mesh and object shaders with validation and error handling."""
         try:
-            # 获取所有面
-            meshFaces = '{0}.f[*]'.format(self.geometry)
-            faces = cmds.ls(meshFaces, flatten=True)
+            # 只取面数，不展开面组件
+            face_count = self.getFaceCount()
             
-            if not faces:
+            if not face_count:
                 print("警告: 对象 {0} 没有面组件".format(self.geometry))
                 return
             
@@ -196,18 +409,18 @@ class SetShader:
             # 验证材质应用 - 改进的验证方法
             try:
                 # 使用listSets命令获取面所属的所有集合
-                applied_shaders = cmds.listSets(object=faces[0], type=1)
+                applied_shaders = cmds.listSets(object='{0}.f[0]'.format(self.geometry), type=1)
                 if applied_shaders and self.shader not in applied_shaders:
                     print("警告: 材质可能未正确应用到对象 {0} 的面".format(self.geometry))
             except Exception as e:
                 print("验证材质应用时出错: {0}".format(str(e)))
             
-            # 只在所有对象处理完后刷新一次
-            if self.geometry == self.selectedGeometry[-1]:
+            # 只在所有对象处理完后刷新一次，批量会话中不刷新视口
+            if self.geometry == self.selectedGeometry[-1] and not batchSession.is_active():
                 cmds.refresh(force=True)
                 cmds.ogs(reset=1)
                 
-            print("成功将材质 {0} 应用到对象 {1} 的 {2} 个面".format(self.shader, self.geometry, len(faces)))
+            print("成功将材质 {0} 应用到对象 {1} 的 {2} 个面".format(self.shader, self.geometry, face_count))
         except Exception as e:
             print("应用材质到对象 {0} 的面时出错: {1}".format(self.geometry, str(e)))
             print(traceback.format_exc())
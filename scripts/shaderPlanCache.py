@@ -0,0 +1,305 @@
+# -*- coding: utf-8 -*-
+#shaderPlanCache.py
+
+"""
+按资产缓存材质指定方案。
+
+同一个角色/道具资产会被很多镜头引用，每个镜头的SetShader都会重新计算完全相同的
+着色组 -> 面范围方案。这里把方案写入输出目录下的.shader_plans，键为引用文件的哈希
+（加上该引用中与材质相关的引用编辑的哈希）和模型在资产内的路径，之后的镜头直接使用。
+
+方案中的着色组名称去掉了引用的命名空间，应用时加上当前镜头的命名空间；
+面数不一致或着色组不存在时视为失效，重新计算。
+
+资产文件通常有几百MB且位于网络共享上，文件哈希按(路径, 大小, 修改时间)记录在
+.shader_plans/file_hashes.json中，只有文件变化后才重新计算。
+"""
+
+import hashlib
+import json
+import os
+
+import maya.cmds as cmds
+import maya.api.OpenMaya as om
+
+
+PLAN_DIR_NAME = '.shader_plans'
+PLAN_VERSION = 1
+FILE_HASHES_NAME = 'file_hashes.json'
+
+# 会改变材质指定的引用编辑
+SHADING_EDIT_COMMANDS = ['connectAttr', 'disconnectAttr', 'sets']
+
+HASH_BLOCK_SIZE = 8 * 1024 * 1024
+
+
+def _print_log(message):
+    print(message)
+
+
+def _file_hash(file_path):
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        while True:
+            block = f.read(HASH_BLOCK_SIZE)
+            if not block:
+                break
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _replace(source, destination):
+    """用source覆盖destination（Windows下os.rename不能覆盖已有文件）。"""
+    try:
+        os.replace(source, destination)
+    except AttributeError:
+        if os.path.exists(destination):
+            os.remove(destination)
+        os.rename(source, destination)
+
+
+def _file_signature(file_path):
+    """文件的(大小, 修改时间)，用于判断文件哈希记录是否仍然有效。"""
+    stat = os.stat(file_path)
+    return [stat.st_size, stat.st_mtime]
+
+
+def _write_json(file_path, data):
+    """先写临时文件再替换，并行导出的进程不会读到写了一半的文件。"""
+    folder = os.path.dirname(file_path)
+    if not os.path.exists(folder):
+        os.makedirs(folder)
+    temp_file = '%s.%d.tmp' % (file_path, os.getpid())
+    with open(temp_file, 'w') as f:
+        json.dump(data, f)
+    _replace(temp_file, file_path)
+
+
+def reference_edit_hash(ref_node):
+    """引用中与材质相关的引用编辑的哈希，镜头中修改了资产材质时方案不会被复用。"""
+    edits = []
+    for command in SHADING_EDIT_COMMANDS:
+        edits.extend(cmds.referenceQuery(ref_node, editStrings=True, editCommand=command) or [])
+    digest = hashlib.sha256()
+    for edit in sorted(edits):
+        digest.update(edit.encode('utf-8'))
+    return digest.hexdigest()
+
+
+def _nested_references(ref_node):
+    """引用中（递归）嵌套的已加载引用的文件和引用编辑，按文件路径排序。"""
+    nested = []
+    for child in cmds.referenceQuery(ref_node, child=True, referenceNode=True) or []:
+        if not cmds.referenceQuery(child, isLoaded=True):
+            continue
+        nested.append({
+            'path': cmds.referenceQuery(child, filename=True, withoutCopyNumber=True),
+            'edits': reference_edit_hash(child),
+        })
+        nested.extend(_nested_references(child))
+    return sorted(nested, key=lambda ref: (ref['path'], ref['edits']))
+
+
+def collect_reference_assets():
+    """在导入引用之前记录每个顶层引用的资产文件和引用编辑，包括其中嵌套的引用。
+
+    Returns:
+        (dict): 命名空间 -> {'path': 引用文件, 'edits': 引用编辑哈希,
+                'nested': [{'path': 嵌套引用文件, 'edits': 引用编辑哈希}, ...]}
+    """
+    assets = {}
+    for ref in cmds.file(query=True, reference=True) or []:
+        ref_node = cmds.referenceQuery(ref, referenceNode=True)
+        if not cmds.referenceQuery(ref_node, isLoaded=True):
+            continue
+        namespace = cmds.file(ref, query=True, namespace=True).lstrip(':')
+        assets[namespace] = {
+            'path': cmds.referenceQuery(ref_node, filename=True, withoutCopyNumber=True),
+            'edits': reference_edit_hash(ref_node),
+            'nested': _nested_references(ref_node),
+        }
+    return assets
+
+
+def relative_path(path, namespace):
+    """模型在资产内的路径：只保留属于该命名空间的层级并去掉命名空间。"""
+    prefix = namespace + ':'
+    return '|'.join(part[len(prefix):] for part in path.split('|') if part.startswith(prefix))
+
+
+class ShaderPlanCache(object):
+    """材质指定方案的磁盘缓存，由SetShader查询和记录。"""
+
+    def __init__(self, cache_dir, reference_assets, log=None):
+        """Constructor.
+
+        Args:
+            cache_dir (str): 缓存目录（通常为输出目录下的.shader_plans）
+            reference_assets (dict): collect_reference_assets的返回值
+            log (callable): 日志函数
+        """
+        self.cache_dir = cache_dir
+        self.reference_assets = reference_assets
+        self.log = log or _print_log
+
+        self._file_hashes = None  # 路径 -> {'signature': [大小, 修改时间], 'hash': 哈希}
+        self._new_file_hashes = {}
+        self._asset_keys = {}
+        self._plans = {}
+        self._recorded = {}  # 资产键 -> 本次新记录的模型路径
+        self._existing_nodes = {}
+        # 节点名称 -> 创建函数（返回创建的节点名称），方案引用的节点由本次运行按需创建时使用
+        self.node_factories = {}
+        self.hits = 0
+        self.misses = 0
+
+    def _hashes_file(self):
+        return os.path.join(self.cache_dir, FILE_HASHES_NAME)
+
+    def _read_file_hashes(self):
+        hashes_file = self._hashes_file()
+        if os.path.exists(hashes_file):
+            try:
+                with open(hashes_file, 'r') as f:
+                    return json.load(f)
+            except (IOError, OSError, ValueError) as e:
+                self.log('读取文件哈希记录失败: %s (%s)' % (hashes_file, str(e)))
+        return {}
+
+    def _cached_file_hash(self, path):
+        """文件大小和修改时间没有变化时使用记录的哈希，否则重新计算。"""
+        if self._file_hashes is None:
+            self._file_hashes = self._read_file_hashes()
+        signature = _file_signature(path)
+        entry = self._file_hashes.get(path)
+        if entry and entry.get('signature') == signature:
+            return entry['hash']
+        entry = {'signature': signature, 'hash': _file_hash(path)}
+        self._file_hashes[path] = entry
+        self._new_file_hashes[path] = entry
+        return entry['hash']
+
+    def _asset_key(self, namespace):
+        if namespace not in self._asset_keys:
+            asset = self.reference_assets.get(namespace)
+            key = None
+            # 嵌套引用的文件或引用编辑变化时资产键也会变化；有文件找不到时不使用缓存
+            refs = [asset] + asset.get('nested', []) if asset else []
+            if refs and all(os.path.isfile(ref['path']) for ref in refs):
+                digest = hashlib.sha256()
+                for ref in refs:
+                    digest.update((self._cached_file_hash(ref['path']) + ref['edits']).encode('utf-8'))
+                key = digest.hexdigest()
+            self._asset_keys[namespace] = key
+        return self._asset_keys[namespace]
+
+    def _plan_file(self, asset_key):
+        return os.path.join(self.cache_dir, asset_key[:2], asset_key + '.json')
+
+    def _read_plans(self, asset_key):
+        plan_file = self._plan_file(asset_key)
+        if os.path.exists(plan_file):
+            try:
+                with open(plan_file, 'r') as f:
+                    data = json.load(f)
+                if data.get('version') == PLAN_VERSION:
+                    return data.get('meshes', {})
+            except (IOError, OSError, ValueError) as e:
+                self.log('读取材质方案缓存失败: %s (%s)' % (plan_file, str(e)))
+        return {}
+
+    def _asset_plans(self, asset_key):
+        if asset_key not in self._plans:
+            self._plans[asset_key] = self._read_plans(asset_key)
+        return self._plans[asset_key]
+
+    def _locate(self, dag_path):
+        """返回(资产键, 命名空间, 资产内路径)，不属于任何引用资产时返回None。"""
+        path = dag_path.fullPathName()
+        short_name = path.rsplit('|', 1)[-1]
+        if ':' not in short_name:
+            return None
+        namespace = short_name.split(':')[0]
+        asset_key = self._asset_key(namespace)
+        if not asset_key:
+            return None
+        return asset_key, namespace, relative_path(path, namespace)
+
+    def _node_exists(self, node):
+        # 只记录存在的节点：默认材质等节点可能在本次运行中稍后才创建
+        if node in self._existing_nodes:
+            return True
+        if cmds.objExists(node) or (node in self.node_factories and self.node_factories[node]() == node):
+            self._existing_nodes[node] = True
+            return True
+        return False
+
+    def lookup(self, dag_path):
+        """查询模型的方案。
+
+        Returns:
+            (tuple): (预检查分类, {着色组: [(起始面, 结束面), ...]})，没有可用的方案时返回None
+        """
+        location = self._locate(dag_path)
+        if not location:
+            return None
+        asset_key, namespace, mesh_path = location
+        plan = self._asset_plans(asset_key).get(mesh_path)
+        if not plan or plan['faces'] != om.MFnMesh(dag_path).numPolygons:
+            self.misses += 1
+            return None
+
+        shader_ranges = {}
+        for name, in_namespace, ranges in plan['shaders']:
+            shader = namespace + ':' + name if in_namespace else name
+            if not self._node_exists(shader):
+                self.misses += 1
+                return None
+            shader_ranges[shader] = [tuple(face_range) for face_range in ranges]
+        self.hits += 1
+        return plan['status'], shader_ranges
+
+    def record(self, dag_path, status, shader_ranges):
+        """记录新计算的方案，flush时写入磁盘。"""
+        location = self._locate(dag_path)
+        if not location:
+            return
+        asset_key, namespace, mesh_path = location
+        prefix = namespace + ':'
+        shaders = []
+        for shader, ranges in sorted(shader_ranges.items()):
+            in_namespace = shader.startswith(prefix)
+            shaders.append([shader[len(prefix):] if in_namespace else shader, in_namespace,
+                            [list(face_range) for face_range in ranges]])
+        self._asset_plans(asset_key)[mesh_path] = {
+            'faces': om.MFnMesh(dag_path).numPolygons,
+            'status': status,
+            'shaders': shaders,
+        }
+        self._recorded.setdefault(asset_key, set()).add(mesh_path)
+
+    def flush(self):
+        """把新记录的方案和文件哈希写入缓存目录。
+
+        写入前重新读取磁盘上的文件并合并，保留并行导出的其它进程在此期间记录的内容。
+        """
+        for asset_key in sorted(self._recorded):
+            plan_file = self._plan_file(asset_key)
+            plans = self._read_plans(asset_key)
+            for mesh_path in self._recorded[asset_key]:
+                plans[mesh_path] = self._plans[asset_key][mesh_path]
+            self._plans[asset_key] = plans
+            try:
+                _write_json(plan_file, {'version': PLAN_VERSION, 'meshes': plans})
+            except (IOError, OSError) as e:
+                self.log('写入材质方案缓存失败: %s (%s)' % (plan_file, str(e)))
+        self._recorded = {}
+
+        if self._new_file_hashes:
+            file_hashes = self._read_file_hashes()
+            file_hashes.update(self._new_file_hashes)
+            try:
+                _write_json(self._hashes_file(), file_hashes)
+            except (IOError, OSError) as e:
+                self.log('写入文件哈希记录失败: %s (%s)' % (self._hashes_file(), str(e)))
+            self._new_file_hashes = {}
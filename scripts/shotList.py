@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+#shotList.py
+
+"""
+镜头列表：按场景文件名匹配剪辑帧范围。
+
+批量导出默认使用场景时间轴的完整范围，场景中经常带有很长的预卷或停放帧。
+镜头列表把场景名匹配规则映射到剪辑范围（加手柄帧），导出工具把精确范围传给worker。
+
+支持的格式:
+    CSV:  pattern,start,end[,handles]    （第一行可以是表头）
+    JSON: [{"pattern": "ep01_sc010*", "start": 1001, "end": 1096, "handles": 8}, ...]
+          或 {"handles": 8, "shots": {"ep01_sc010*": [1001, 1096], ...}}
+
+pattern使用通配符（fnmatch，不区分大小写）；不含通配符时按前缀匹配。先匹配的条目优先。
+"""
+
+import csv
+import fnmatch
+import io
+import json
+import os
+
+
+def _entry(pattern, start, end, handles=0):
+    return {
+        'pattern': str(pattern).strip(),
+        'start': float(start),
+        'end': float(end),
+        'handles': float(handles or 0),
+    }
+
+
+def _load_json(path):
+    with io.open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    if isinstance(data, list):
+        return [_entry(item['pattern'], item['start'], item['end'], item.get('handles', 0)) for item in data]
+
+    default_handles = data.get('handles', 0)
+    entries = []
+    for pattern, value in data.get('shots', {}).items():
+        if isinstance(value, dict):
+            entries.append(_entry(pattern, value['start'], value['end'], value.get('handles', default_handles)))
+        else:
+            entries.append(_entry(pattern, value[0], value[1], default_handles))
+    return entries
+
+
+def _load_csv(path):
+    entries = []
+    with io.open(path, 'r', encoding='utf-8-sig') as f:
+        for row in csv.reader(f):
+            row = [cell.strip() for cell in row]
+            if not row or not row[0] or row[0].startswith('#'):
+                continue
+            try:
+                entries.append(_entry(row[0], row[1], row[2], row[3] if len(row) > 3 and row[3] else 0))
+            except (IndexError, ValueError):
+                # 表头或格式错误的行
+                continue
+    return entries
+
+
+def load_shot_list(path):
+    """读取镜头列表。
+
+    Args:
+        path (str): CSV或JSON文件路径
+
+    Returns:
+        (list): [{'pattern', 'start', 'end', 'handles'}, ...]
+
+    Raises:
+        ValueError: 文件格式不支持或内容无法解析
+    """
+    extension = os.path.splitext(path)[1].lower()
+    try:
+        if extension == '.json':
+            return _load_json(path)
+        if extension == '.csv':
+            return _load_csv(path)
+    except (KeyError, TypeError, IndexError, ValueError) as e:
+        raise ValueError('镜头列表格式错误: %s: %s' % (path, str(e)))
+    raise ValueError('不支持的镜头列表格式: %s' % path)
+
+
+def match_range(entries, maya_file):
+    """查找场景对应的帧范围（包含手柄帧）。
+
+    Args:
+        entries (list): load_shot_list的返回值
+        maya_file (str): Maya文件路径或场景名
+
+    Returns:
+        (tuple): (起始帧, 结束帧)，没有匹配的条目时返回None
+    """
+    scene_name = os.path.splitext(os.path.basename(maya_file))[0].lower()
+    for entry in entries:
+        pattern = entry['pattern'].lower()
+        if not any(char in pattern for char in '*?['):
+            pattern += '*'
+        if fnmatch.fnmatchcase(scene_name, pattern):
+            return (entry['start'] - entry['handles'], entry['end'] + entry['handles'])
+    return None
@@ -194,12 +194,11 @@ current_dir = r'%s'
 if current_dir not in sys.path:
     sys.path.append(current_dir)
 
-# 创建日志文件
+# 创建日志文件（缓冲写入，按阶段刷新）
+import workerLogger
 log_file = os.path.join(r'%s', 'export_log.txt')
-def write_log(message):
-    with open(log_file, 'a') as f:
-        current_time = time.strftime('%%Y-%%m-%%d %%H:%%M:%%S')
-        f.write('[' + current_time + '] ' + message + '\\n')
+logger = workerLogger.WorkerLogger(log_file)
+write_log = logger.info
 
 # 设置使用第几个下划线的选项
 use_underscore_index = %d
@@ -246,8 +245,12 @@ try:
     cmds.optionVar(intValue=['CIP', 0])  # 禁用客户参与计划
     cmds.optionVar(intValue=['CER', 0])  # 禁用崩溃报告
 
+    # 批量会话：导出期间的编辑不进入撤销队列，也不默认保留构造历史
+    import batchSession
+    batchSession.BatchSession(log=write_log).apply()
+
     # 打开Maya文件
-    write_log('打开Maya文件...')
+    logger.stage('打开Maya文件')
     # 禁用自动加载插件
     cmds.optionVar(intValue=['autoLoadPlugins', 0])
     
@@ -344,7 +347,7 @@ try:
             write_log('更新进度出错: ' + str(e))
     
     # 导出相机
-    write_log('开始导出相机...')
+    logger.stage('导出相机')
     update_progress(10, '开始导出相机...')
     export_all_cameras(fbx_directory=r'%s', add_border_keys=True, 
                        maya_file_path=r'%s', use_underscore_index=use_underscore_index)
@@ -353,17 +356,18 @@ try:
     
 except Exception as e:
     error_trace = traceback.format_exc()
-    write_log('发生错误: ' + str(e) + '\\n' + error_trace)
+    logger.error('发生错误: ' + str(e) + '\\n' + error_trace)
     sys.stderr.write('错误: ' + str(e) + '\\n' + error_trace + '\\n')
     sys.exit(1)
 finally:
-    write_log('关闭Maya独立模式...')
+    logger.stage('关闭Maya独立模式')
     # 关闭Maya
     try:
         maya.standalone.uninitialize()
         write_log('Maya独立模式已关闭')
     except:
         write_log('关闭Maya时出错')
+    logger.close()
 """ % (safe_current_dir, safe_output_path, use_underscore_index, 
        safe_maya_file, safe_maya_file, safe_maya_file.replace('\\', '\\\\'),
        safe_output_path, safe_output_path, safe_maya_file)
@@ -19,6 +19,8 @@ class SingleExport(alembicExport.BaseExport):
     def __init__(self):
         # 修改super调用方式，适配Python 2.7
         alembicExport.BaseExport.__init__(self)
+        self.perFrameCallback = None
+        self.preRollStartFrame = None
     
     def setFramerange(self, min=None, max=None):
         """Sets and returns the framerange."""
@@ -63,8 +65,17 @@ class SingleExport(alembicExport.BaseExport):
         objects = ['-root {0}'.format(obj) for obj in self.exportObjects]
         root = ' '.join(objects)
         job = '{0} -framerange {1} {2} -file {3}'.format(root, self.framerange, DEFAULT_ABC_ARGS, self.filepath)
-        
-        exportCommand = 'AbcExport -j "{0}"'.format(job)
+        if self.perFrameCallback:
+            # 回调命令中不能包含空格，AbcExport按空格拆分job参数
+            job += ' -pythonPerFrameCallback {0}'.format(self.perFrameCallback)
+
+        flags = ''
+        if self.preRollStartFrame is not None:
+            # 预卷帧只计算不写入；preRollStartFrame是命令级参数，不能放在-j中。
+            # 默认会跳过预卷起始帧到导出范围之间未写入的帧，需要逐帧计算模拟等依赖前一帧的节点
+            flags = '-preRollStartFrame {0} -dontSkipUnwrittenFrames '.format(self.preRollStartFrame)
+
+        exportCommand = 'AbcExport {0}-j "{1}"'.format(flags, job)
         mel.eval(exportCommand)
         
     def deleteDuplicateObjects(self):
@@ -77,10 +88,14 @@ class SingleExport(alembicExport.BaseExport):
         super(SingleExport, self).addFrameData()
     
     @classmethod
-    def exportSelection(cls, filepath, startFrame=None, endFrame=None):
-        """Exports all selected objects to given filepath."""
+    def exportSelection(cls, filepath, startFrame=None, endFrame=None, perFrameCallback=None, preRollStartFrame=None):
+        """Exports all selected objects to given filepath.
+        perFrameCallback is a python command run by AbcExport after each frame (#FRAME# is replaced).
+        preRollStartFrame evaluates the scene from that frame without writing samples before startFrame."""
         try:
             exporter = cls()
+            exporter.perFrameCallback = perFrameCallback
+            exporter.preRollStartFrame = preRollStartFrame
             exporter.setFramerange(startFrame, endFrame)
             exporter.getSelected()
             exporter.setFilepath(filepath)
@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+#staticDetect.py
+
+"""
+静态模型检测。
+
+道具cache组里的很多模型在整个帧范围内完全不动，但AbcExport只要发现模型有动画输入
+（绑定、约束、表达式等）就会逐帧写入采样。这里在帧范围内抽取少量帧，比较模型的
+世界矩阵、可见性和顶点位置，完全不变的模型可以只导出一帧（单采样的静态对象）。
+"""
+
+import time
+
+import maya.cmds as cmds
+import maya.api.OpenMaya as om
+
+
+# 顶点位置的比较误差（场景单位）
+POINT_TOLERANCE = 1e-5
+# 世界矩阵的比较误差
+MATRIX_TOLERANCE = 1e-6
+
+
+def _print_log(message):
+    print(message)
+
+
+def _mesh_points(shape):
+    """形状节点所有顶点的物体空间坐标，扁平的浮点列表（在C++中一次取得）。"""
+    return cmds.xform(shape + '.vtx[*]', query=True, translation=True, objectSpace=True) or []
+
+
+def _points_changed(current, previous):
+    """比较两组顶点坐标：完全相同时直接返回，只有不相同时才逐个比较误差。"""
+    if current == previous:
+        return False
+    if len(current) != len(previous):
+        return True
+    return any(abs(a - b) > POINT_TOLERANCE for a, b in zip(current, previous))
+
+
+def _hierarchy_root(path, paths):
+    """path所在层级中位于paths内的最上层节点（包括path自身）。"""
+    parts = path.split('|')
+    for i in range(2, len(parts)):
+        ancestor = '|'.join(parts[:i])
+        if ancestor in paths:
+            return ancestor
+    return path
+
+
+def sample_frames(start_frame, end_frame, samples):
+    """在帧范围内均匀抽取帧（包含起始帧和结束帧）。"""
+    samples = max(2, int(samples))
+    if end_frame <= start_frame:
+        return [start_frame]
+    step = float(end_frame - start_frame) / (samples - 1)
+    frames = [start_frame + step * i for i in range(samples - 1)]
+    frames.append(end_frame)
+    return frames
+
+
+class _MeshState(object):
+    """一个模型在某一帧的状态：世界矩阵、可见性以及有变形历史的形状节点的顶点。"""
+
+    def __init__(self, transform, shapes):
+        self.transform = transform
+        selection = om.MSelectionList()
+        selection.add(transform)
+        self.dag_path = selection.getDagPath(0)
+        self.shapes = []
+        for shape in shapes:
+            selection.add(shape)
+            shape_path = selection.getDagPath(selection.length() - 1)
+            in_mesh = om.MFnDependencyNode(shape_path.node()).findPlug('inMesh', False)
+            # 没有上游历史的形状节点顶点不会变化，只需要比较矩阵
+            if in_mesh.isDestination:
+                self.shapes.append(shape_path.fullPathName())
+
+        self.matrix = None
+        self.visible = None
+        self.points = None
+
+    def capture(self):
+        self.matrix = self.dag_path.inclusiveMatrix()
+        self.visible = self.dag_path.isVisible()
+        self.points = [_mesh_points(shape) for shape in self.shapes]
+
+    def changed(self):
+        """与上次capture的状态比较。"""
+        matrix = self.dag_path.inclusiveMatrix()
+        if not matrix.isEquivalent(self.matrix, MATRIX_TOLERANCE):
+            return True
+        if self.dag_path.isVisible() != self.visible:
+            return True
+        for shape, points in zip(self.shapes, self.points):
+            if _points_changed(_mesh_points(shape), points):
+                return True
+        return False
+
+
+def split_static_meshes(mesh_objects, start_frame, end_frame, samples=5, log=None):
+    """把模型分为静态和有动画两组。
+
+    Args:
+        mesh_objects (str list): 模型transform节点（完整路径）
+        start_frame (float): 起始帧
+        end_frame (float): 结束帧
+        samples (int): 抽样帧数
+        log (callable): 日志函数
+
+    Returns:
+        (tuple): (静态模型列表, 有动画的模型列表)，保持输入顺序
+    """
+    log = log or _print_log
+    if not mesh_objects:
+        return [], []
+
+    start_time = time.time()
+    frames = sample_frames(start_frame, end_frame, samples)
+    original_time = cmds.currentTime(query=True)
+
+    states = []
+    animated = set()
+    for obj in mesh_objects:
+        shapes = cmds.listRelatives(obj, shapes=True, fullPath=True, noIntermediate=True) or []
+        if any(cmds.nodeType(shape) != 'mesh' for shape in shapes):
+            # 只比较mesh顶点，其他类型的形状节点按有动画处理
+            animated.add(obj)
+            continue
+        states.append(_MeshState(obj, shapes))
+
+    try:
+        cmds.currentTime(frames[0], update=True)
+        for state in states:
+            state.capture()
+        for frame in frames[1:]:
+            cmds.currentTime(frame, update=True)
+            for state in states:
+                if state.transform not in animated and state.changed():
+                    animated.add(state.transform)
+            if len(animated) == len(mesh_objects):
+                break
+    finally:
+        cmds.currentTime(original_time, update=True)
+
+    # 导出时父级会带上子级，有父子关系的模型只要一个有动画就都按有动画处理：
+    # 按层级中最上层的导出模型分组，组内有动画模型时整组按有动画处理
+    mesh_set = set(mesh_objects)
+    roots = dict((obj, _hierarchy_root(obj, mesh_set)) for obj in mesh_objects)
+    animated_roots = set(roots[obj] for obj in animated)
+    animated = set(obj for obj in mesh_objects if roots[obj] in animated_roots)
+
+    static_objects = [obj for obj in mesh_objects if obj not in animated]
+    animated_objects = [obj for obj in mesh_objects if obj in animated]
+    log('静态模型检测: 抽样 %d 帧, 静态 %d 个, 有动画 %d 个, 耗时 %.2f 秒' % (
+        len(frames), len(static_objects), len(animated_objects), time.time() - start_time))
+    return static_objects, animated_objects
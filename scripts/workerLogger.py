@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+#workerLogger.py
+
+"""
+mayapy导出进程共用的日志工具。
+
+日志先写入内存缓冲区，由后台线程定时刷新到文件，并在每个阶段切换时立即刷新，
+避免每条消息都打开/关闭一次日志文件（日志经常位于网络共享目录上）。
+逐对象的明细消息默认只计数，在阶段结束时输出汇总；开启verbose后才逐条写入。
+"""
+
+import threading
+import time
+
+
+LEVELS = {'DEBUG': 10, 'INFO': 20, 'WARNING': 30, 'ERROR': 40}
+
+
+class WorkerLogger(object):
+    """带级别、缓冲写入和明细汇总的日志对象。
+
+    实例可以直接当作函数调用（等同于info），方便替换原来的write_log。
+    """
+
+    def __init__(self, log_file, verbose=False, level='INFO', flush_interval=2.0, max_buffer=200):
+        """Constructor.
+
+        Args:
+            log_file (str): 日志文件路径
+            verbose (bool): 是否逐条写入对象明细和DEBUG消息
+            level (str): 最低写入级别
+            flush_interval (float): 定时刷新间隔（秒）
+            max_buffer (int): 缓冲区达到该行数时立即刷新
+        """
+        self.log_file = log_file
+        self.verbose = verbose
+        self.level = LEVELS['DEBUG'] if verbose else LEVELS.get(level, LEVELS['INFO'])
+        self.flush_interval = flush_interval
+        self.max_buffer = max_buffer
+
+        self._buffer = []
+        self._details = {}
+        self._detail_order = []
+        self._lock = threading.Lock()
+        self._stage_name = None
+        self._stage_start = None
+
+        self._stop_event = threading.Event()
+        self._flush_thread = threading.Thread(target=self._flush_loop, name='WorkerLoggerFlush')
+        self._flush_thread.daemon = True
+        self._flush_thread.start()
+
+    def __call__(self, message):
+        self.info(message)
+
+    def log(self, level, message):
+        """写入一条指定级别的日志。"""
+        if LEVELS.get(level, LEVELS['INFO']) < self.level:
+            return
+        current_time = time.strftime('%Y-%m-%d %H:%M:%S')
+        if level == 'INFO':
+            line = '[' + current_time + '] ' + message + '\n'
+        else:
+            line = '[' + current_time + '] [' + level + '] ' + message + '\n'
+        with self._lock:
+            self._buffer.append(line)
+            need_flush = len(self._buffer) >= self.max_buffer
+        if need_flush:
+            self.flush()
+
+    def debug(self, message):
+        self.log('DEBUG', message)
+
+    def info(self, message):
+        self.log('INFO', message)
+
+    def warning(self, message):
+        self.log('WARNING', message)
+
+    def error(self, message):
+        self.log('ERROR', message)
+
+    def detail(self, category, message):
+        """记录逐对象的明细消息。
+
+        verbose模式下逐条写入，否则只按类别计数，调用summarize时输出汇总。
+
+        Args:
+            category (str): 明细类别，同时作为汇总时的标题
+            message (str): 明细内容
+        """
+        if self.verbose:
+            self.info(message)
+            return
+        with self._lock:
+            if category not in self._details:
+                self._details[category] = 0
+                self._detail_order.append(category)
+            self._details[category] += 1
+
+    def summarize(self):
+        """输出并清空已计数的明细汇总。"""
+        with self._lock:
+            summary = [(category, self._details[category]) for category in self._detail_order]
+            self._details = {}
+            self._detail_order = []
+        for category, count in summary:
+            self.info('%s: 共 %d 条 (明细已省略，开启详细日志可查看)' % (category, count))
+
+    def stage(self, name):
+        """标记新阶段开始：汇总上一阶段的明细、记录耗时并立即刷新。"""
+        now = time.time()
+        self.summarize()
+        if self._stage_name is not None:
+            self.info('阶段完成: %s, 耗时 %.2f 秒' % (self._stage_name, now - self._stage_start))
+        self._stage_name = name
+        self._stage_start = now
+        if name:
+            self.info('阶段开始: ' + name)
+        self.flush()
+
+    def flush(self):
+        """将缓冲区写入日志文件。"""
+        with self._lock:
+            if not self._buffer:
+                return
+            lines = self._buffer
+            self._buffer = []
+            try:
+                with open(self.log_file, 'a') as f:
+                    f.write(''.join(lines))
+            except (IOError, OSError):
+                # 写入失败时保留内容，下次刷新重试
+                self._buffer = lines + self._buffer
+
+    def close(self):
+        """结束当前阶段，停止后台刷新线程并写入所有剩余内容。"""
+        if self._stage_name is not None:
+            self.stage(None)
+        else:
+            self.summarize()
+        self._stop_event.set()
+        self.flush()
+
+    def _flush_loop(self):
+        while not self._stop_event.wait(self.flush_interval):
+            self.flush()